@@ -1,12 +1,24 @@
 
+from w2f_lazy import end_profile, profile_imports
+profile_imports()  # times the imports below when WTF_IMPORT_PROFILE is set
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import io
 
+from w2f_analysis import render_bulk_analyze
+from w2f_calc import SAMPLE_ADDR, SAMPLE_DATA, analyze_property
+from w2f_kpi import money, summarize
+from w2f_lazy import lazy
+from w2f_matching import BuyerIndex
+from w2f_ui import import_profile_panel
+
+# Loaded on the first chart, not at startup
+px = lazy("plotly.express")
+go = lazy("plotly.graph_objects")
+end_profile()
+
 # -----------------------------
 # App Config & Theming
 # -----------------------------
@@ -51,6 +63,7 @@ def init_state():
     ss.setdefault("leads", [])
     ss.setdefault("deals", [])
     ss.setdefault("buyers", init_buyers())
+    if "buyer_index" not in ss: ss.buyer_index = BuyerIndex.from_records(ss.buyers)
     ss.setdefault("current_property", None)
     ss.setdefault("campaigns", [])
     ss.setdefault("recent_actions", [])
@@ -90,63 +103,14 @@ def login_ui():
         st.markdown("</div>", unsafe_allow_html=True)
 
 # -----------------------------
-# Utility: Sample Property Data & Calculations
+# Utility: Buyer Matching (sample data & analyze_property live in w2f_calc)
 # -----------------------------
-SAMPLE_ADDR = "21372 W Memorial Dr, Porter, TX 77365"
-SAMPLE_DATA = {
-    "address": SAMPLE_ADDR,
-    "owner": "EDGAR LORI G",
-    "est_value": 267000,
-    "sqft": 1643,
-    "beds": 3,
-    "baths": 2,
-    "year_built": 1969,
-    "lot_sqft": 24300,
-    "rent": 1973,
-    "mortgage_balance": 27986,
-    "equity": 239014,
-    "taxes": 1497,
-    "condition": "Good",
-    "market_price_change": 0.0437,
-    "market_rent_change": 0.0169,
-    "state": "TX", "city": "Porter", "type": "SFR"
-}
-
-def analyze_property(addr: str, arv: float=None, rehab: float=0.0):
-    # If matches sample, load it; else create a basic record using inputs
-    base = SAMPLE_DATA.copy() if addr.strip().lower() == SAMPLE_ADDR.lower() else {
-        "address": addr.strip(),
-        "owner": "Unknown",
-        "est_value": float(arv) if arv else 200000.0,
-        "sqft": None, "beds": None, "baths": None, "year_built": None, "lot_sqft": None,
-        "rent": None, "mortgage_balance": None, "equity": None, "taxes": None,
-        "condition": "Unknown",
-        "market_price_change": 0.02, "market_rent_change": 0.01,
-        "state": "TX", "city": "", "type": "SFR"
-    }
-    est_arv = float(arv) if arv else base["est_value"]
-    mao70 = 0.70 * est_arv - float(rehab or 0)
-    mao75 = 0.75 * est_arv - float(rehab or 0)
-    # simple profit calc assuming buyer pays mao70 and rehab occurs
-    profit_wholesale = max(0, (mao75 - mao70))  # spread between 70/75 anchors
-    grade = "A" if mao70/est_arv >= 0.60 else ("B" if mao70/est_arv >= 0.55 else ("C" if mao70/est_arv >= 0.50 else "D"))
-    base.update({
-        "arv": est_arv, "rehab": float(rehab or 0),
-        "mao70": round(mao70, 2), "mao75": round(mao75, 2),
-        "profit_est": round(profit_wholesale, 2), "grade": grade
-    })
-    return base
-
 def match_buyers(prop, buyers):
-    matches = []
-    for b in buyers:
-        in_state = prop.get("state") in b["states"]
-        price_ok = b["min_price"] <= prop.get("mao70", 0) <= b["max_price"]
-        type_ok = prop.get("type", "SFR") in b["types"]
-        if in_state and price_ok and type_ok:
-            offer = round(prop["mao75"], 2)  # simple suggested offer anchor
-            matches.append({**b, "offer": offer})
-    return matches
+    # `buyers` is a BuyerIndex (preferred) or a plain list of buyer dicts
+    index = buyers if isinstance(buyers, BuyerIndex) else BuyerIndex.from_records(buyers)
+    offer = round(prop["mao75"], 2)  # simple suggested offer anchor
+    hits = index.match(prop.get("state") or "", price=prop.get("mao70", 0), property_type=prop.get("type", "SFR"))
+    return [{**b, "offer": offer} for b in hits]
 
 # -----------------------------
 # Pages
@@ -175,12 +139,12 @@ def page_landing():
 def page_dashboard():
     user = st.session_state.auth["user"]["name"]
     st.markdown(f"### Welcome back, **{user}** 👋")
-    k1,k2,k3,k4,k5 = st.columns(5)
-    k1.markdown('<div class="metric"><div class="sub">Revenue</div><div class="kpi">$125K</div></div>', unsafe_allow_html=True)
-    k2.markdown('<div class="metric"><div class="sub">Pipeline</div><div class="kpi">$485K</div></div>', unsafe_allow_html=True)
-    k3.markdown('<div class="metric"><div class="sub">Hot Leads</div><div class="kpi">28</div></div>', unsafe_allow_html=True)
-    k4.markdown('<div class="metric"><div class="sub">Grade A Deals</div><div class="kpi">67</div></div>', unsafe_allow_html=True)
-    k5.markdown('<div class="metric"><div class="sub">Conversion</div><div class="kpi">18.5%</div></div>', unsafe_allow_html=True)
+    k = summarize(st.session_state.deals, st.session_state.leads,
+                  revenue=lambda d: d.get("mao75", 0) - d.get("mao70", 0), pipeline=lambda d: d.get("mao70", 0))
+    tiles = [("Revenue", money(k["revenue"])), ("Pipeline", money(k["pipeline_value"])), ("Hot Leads", k["hot_leads"]),
+             ("Grade A Deals", k["grade_a"]), ("Conversion", f"{k['conversion']:.1f}%" if k["conversion"] is not None else "—")]
+    for col, (label, value) in zip(st.columns(5), tiles):
+        col.markdown(f'<div class="metric"><div class="sub">{label}</div><div class="kpi">{value}</div></div>', unsafe_allow_html=True)
 
     st.write("")
     qa1, qa2, qa3, qa4 = st.columns(4)
@@ -234,7 +198,7 @@ def page_deal_analyzer():
         st.markdown("- **Wholesale**: Lock near MAO 70% and dispo to matched buyer.\n- **Fix & Flip**: Consider if rehab < 20% ARV and DOM low.\n- **BRRRR**: If rent supports DSCR ≥ 1.2 at 75% LTV.")
         st.write("")
         st.markdown("#### Buyer Matches")
-        matches = match_buyers(prop, st.session_state.buyers)
+        matches = match_buyers(prop, st.session_state.buyer_index)
         if matches:
             for m in matches:
                 col1, col2, col3, col4 = st.columns([2,1,1,1])
@@ -423,7 +387,7 @@ def main():
     if st.session_state.auth["ok"]:
         with st.sidebar:
             st.markdown("### WTF — Navigation")
-            choice = st.radio("Go to", ["Dashboard","Deal Analyzer","Lead Manager","Deal Pipeline","Buyer Network","Contracts","LOI Generator","RVM Campaigns","Analytics"])
+            choice = st.radio("Go to", ["Dashboard","Deal Analyzer","Bulk Analyze","Lead Manager","Deal Pipeline","Buyer Network","Contracts","LOI Generator","RVM Campaigns","Analytics"])
             st.session_state.page = choice
             if st.button("Sign Out", type="primary"):
                 st.session_state.auth = {"ok": False, "user": None}
@@ -437,6 +401,7 @@ def main():
         page = st.session_state.page
         if page == "Dashboard": page_dashboard()
         elif page == "Deal Analyzer": page_deal_analyzer()
+        elif page == "Bulk Analyze": render_bulk_analyze()
         elif page == "Lead Manager": page_lead_manager()
         elif page == "Deal Pipeline": page_pipeline()
         elif page == "Buyer Network": page_buyer_network()
@@ -445,6 +410,7 @@ def main():
         elif page == "RVM Campaigns": page_rvm()
         elif page == "Analytics": page_analytics()
         else: page_dashboard()
+    import_profile_panel()
 
 if __name__ == "__main__":
     main()
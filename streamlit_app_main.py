@@ -5,6 +5,8 @@ WTF (Wholesale2Flip) - Complete Real Estate Investment Platform
 Fixed version with proper dependencies and error handling
 """
 
+from w2f_lazy import end_profile, profile_imports
+profile_imports()  # times the imports below when WTF_IMPORT_PROFILE is set
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -18,13 +20,21 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Any
 
-# Try to import plotly, fallback to basic charts if not available
-try:
-    import plotly.express as px
-    import plotly.graph_objects as go
-    PLOTLY_AVAILABLE = True
-except ImportError:
-    PLOTLY_AVAILABLE = False
+from w2f_analysis import render_bulk_analyze
+from w2f_cache import get_property_cache
+from w2f_calc import calculate_grade
+from w2f_datagen import MARKET_DATA, generate_property, normalize_address
+from w2f_kpi import money, summarize
+from w2f_lookup import StubLookupProvider, cached_lookups, get_provider, set_provider
+from w2f_lazy import available, lazy
+from w2f_ui import fragment, import_profile_panel
+
+# Plotly loads on the first chart; fallback to basic charts if not installed
+px = lazy("plotly.express")
+go = lazy("plotly.graph_objects")
+PLOTLY_AVAILABLE = available("plotly")
+end_profile()
+if not PLOTLY_AVAILABLE:
     st.warning("Plotly not available - using basic charts")
 
 # Page configuration
@@ -243,8 +253,6 @@ if 'user_data' not in st.session_state:
     st.session_state.user_data = {}
 if 'current_page' not in st.session_state:
     st.session_state.current_page = 'landing'
-if 'property_lookup_cache' not in st.session_state:
-    st.session_state.property_lookup_cache = {}
 if 'deals' not in st.session_state:
     st.session_state.deals = []
 if 'leads' not in st.session_state:
@@ -254,157 +262,44 @@ if 'leads' not in st.session_state:
 class ProfessionalPropertyDataService:
     """Real estate data service with market data"""
     
-    MARKET_DATA = {
-        'tx': {
-            'dallas': {'median_price': 425000, 'rent_psf': 1.2, 'appreciation': 0.045, 'tax_rate': 0.022},
-            'houston': {'median_price': 380000, 'rent_psf': 1.1, 'appreciation': 0.042, 'tax_rate': 0.021},
-            'austin': {'median_price': 550000, 'rent_psf': 1.4, 'appreciation': 0.055, 'tax_rate': 0.019},
-            'porter': {'median_price': 285000, 'rent_psf': 1.15, 'appreciation': 0.041, 'tax_rate': 0.022}
-        },
-        'ca': {
-            'los angeles': {'median_price': 950000, 'rent_psf': 2.8, 'appreciation': 0.065, 'tax_rate': 0.015}
-        },
-        'fl': {
-            'miami': {'median_price': 485000, 'rent_psf': 1.8, 'appreciation': 0.055, 'tax_rate': 0.018}
-        }
-    }
+    MARKET_DATA = MARKET_DATA
+    
+    @staticmethod
+    def _cache_key(address, city, state):
+        return normalize_address(address, city, state)
+    
+    @staticmethod
+    def is_cached(address, city, state):
+        return ProfessionalPropertyDataService._cache_key(address, city, state) in get_property_cache()
     
     @staticmethod
     def lookup_property_by_address(address, city, state):
         """Professional property lookup"""
-        cache_key = f"{address}, {city}, {state}".lower()
-        
-        if cache_key in st.session_state.property_lookup_cache:
-            return st.session_state.property_lookup_cache[cache_key]
-        
-        time.sleep(1.0)  # Simulate API call
-        
-        property_data = ProfessionalPropertyDataService._generate_property_data(address, city, state)
-        st.session_state.property_lookup_cache[cache_key] = property_data
-        
-        return property_data
+        return ProfessionalPropertyDataService.lookup_properties([(address, city, state)])[0]
+    
+    @staticmethod
+    def lookup_properties(requests, on_progress=None):
+        """Batch lookup: hits in the shared cache return immediately, misses fan out concurrently through the provider
+        (an address another session is already fetching is waited on, not fetched twice)"""
+        return cached_lookups(get_property_cache(), requests, ProfessionalPropertyDataService._cache_key,
+                              on_progress=on_progress)
     
     @staticmethod
     def _generate_property_data(address, city, state):
-        """Generate realistic property data"""
-        state_data = ProfessionalPropertyDataService.MARKET_DATA.get(state.lower(), {})
-        city_data = state_data.get(city.lower().replace(',', '').strip())
-        
-        if not city_data:
-            city_data = {'median_price': 350000, 'rent_psf': 1.2, 'appreciation': 0.045, 'tax_rate': 0.022}
-        
-        # Generate property details
-        square_feet = np.random.randint(1200, 4500)
-        bedrooms = np.random.randint(2, 6)
-        bathrooms = np.random.choice([1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0])
-        year_built = np.random.randint(1970, 2023)
-        
-        list_price = int(city_data['median_price'] * np.random.uniform(0.7, 1.4))
-        arv = int(list_price * np.random.uniform(1.05, 1.25))
-        
-        # Condition
-        age = 2024 - year_built
-        if age < 10:
-            condition = np.random.choice(['excellent', 'good'], p=[0.8, 0.2])
-            condition_score = np.random.randint(85, 100)
-        elif age < 30:
-            condition = np.random.choice(['good', 'fair'], p=[0.6, 0.4])
-            condition_score = np.random.randint(65, 85)
-        else:
-            condition = np.random.choice(['fair', 'poor'], p=[0.7, 0.3])
-            condition_score = np.random.randint(45, 75)
-        
-        # Rehab costs
-        rehab_multipliers = {'excellent': 0.02, 'good': 0.05, 'fair': 0.12, 'poor': 0.25}
-        base_rehab = square_feet * 25 * rehab_multipliers.get(condition, 0.12)
-        rehab_cost = int(base_rehab)
-        
-        # Investment calculations
-        mao_70 = max(0, int((arv * 0.70) - rehab_cost))
-        mao_75 = max(0, int((arv * 0.75) - rehab_cost))
-        
-        # Rental analysis
-        base_rent = square_feet * city_data['rent_psf']
-        condition_multipliers = {'excellent': 1.2, 'good': 1.0, 'fair': 0.85, 'poor': 0.7}
-        monthly_rent = int(base_rent * condition_multipliers.get(condition, 1.0))
-        
-        # Owner data
-        owner_data = {
-            'name': f"{np.random.choice(['Michael', 'Sarah', 'David', 'Maria'])} {np.random.choice(['Rodriguez', 'Johnson', 'Wilson', 'Garcia'])}",
-            'phone': f"({np.random.choice(['214', '713', '512'])}) {np.random.randint(100,999)}-{np.random.randint(1000,9999)}",
-            'ownership_length': np.random.randint(2, 25),
-            'motivation': np.random.choice(['Divorce', 'Foreclosure', 'Job Relocation', 'Inheritance', 'Financial Hardship']),
-            'motivation_score': np.random.randint(60, 95)
-        }
-        
-        return {
-            'found': True,
-            'address': address,
-            'city': city,
-            'state': state,
-            'list_price': list_price,
-            'arv': arv,
-            'square_feet': square_feet,
-            'bedrooms': bedrooms,
-            'bathrooms': bathrooms,
-            'year_built': year_built,
-            'condition': condition,
-            'condition_score': condition_score,
-            'rehab_cost': rehab_cost,
-            'mao_70': mao_70,
-            'mao_75': mao_75,
-            'monthly_rent': monthly_rent,
-            'owner_data': owner_data,
-            'data_confidence': 95,
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
+        """Generate realistic property data (deterministic per normalized address)"""
+        return generate_property(address, city, state)
+
+if get_provider() is None:
+    set_provider(StubLookupProvider(ProfessionalPropertyDataService._generate_property_data))
 
 # Deal Grading Engine
 class DealGradingEngine:
     @staticmethod
     def calculate_grade(property_data):
-        """Calculate deal grade A-D"""
-        arv = property_data['arv']
-        mao_70 = property_data['mao_70']
-        
-        if mao_70 <= 0:
-            return {'grade': 'D', 'score': 0, 'strategy': 'Pass on this deal'}
-        
-        profit_margin = ((arv - mao_70) / arv) * 100
-        
-        score = 50  # Base score
-        
-        # Profit margin scoring
-        if profit_margin >= 35: score += 40
-        elif profit_margin >= 25: score += 30
-        elif profit_margin >= 20: score += 20
-        elif profit_margin >= 15: score += 10
-        
-        # Condition scoring
-        if property_data['condition_score'] >= 80: score += 10
-        elif property_data['condition_score'] >= 60: score += 5
-        
-        score = min(100, score)
-        
-        if score >= 85:
-            grade = 'A'
-            strategy = 'Excellent deal - Multiple strategies viable'
-        elif score >= 70:
-            grade = 'B'
-            strategy = 'Good deal - Fix & flip or wholesale'
-        elif score >= 55:
-            grade = 'C'
-            strategy = 'Marginal deal - Wholesale only'
-        else:
-            grade = 'D'
-            strategy = 'Pass - Insufficient margins'
-        
-        return {
-            'grade': grade,
-            'score': score,
-            'strategy': strategy,
-            'confidence': min(95, max(65, score + np.random.randint(-5, 10)))
-        }
+        """Calculate deal grade A-D (memoized in w2f_calc; only the confidence jitter is per call)"""
+        result = calculate_grade(property_data)
+        result['confidence'] = min(95, max(65, result['score'] + np.random.randint(-5, 10)))
+        return result
 
 # Authentication Service
 class AuthenticationService:
@@ -640,6 +535,7 @@ def render_sidebar():
     pages = {
         "🏠 Dashboard": "dashboard",
         "🔍 Deal Analyzer": "deal_analyzer", 
+        "📑 Bulk Analyze": "bulk_analyze",
         "📞 Lead Manager": "lead_manager",
         "📋 Deal Pipeline": "deal_pipeline",
         "👥 Buyer Network": "buyer_network",
@@ -687,52 +583,27 @@ def render_dashboard():
     """, unsafe_allow_html=True)
     
     # KPIs
-    col1, col2, col3, col4, col5 = st.columns(5)
-    
-    with col1:
-        st.markdown("""
-        <div class='metric-card success-metric'>
-            <h3 style='color: #10B981; margin: 0; font-size: 2rem;'>$125K</h3>
-            <p style='margin: 0; font-weight: bold;'>YTD Revenue</p>
-            <small style='color: #9CA3AF;'>8 deals closed</small>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class='metric-card'>
-            <h3 style='color: #8B5CF6; margin: 0; font-size: 2rem;'>$485K</h3>
-            <p style='margin: 0; font-weight: bold;'>Pipeline Value</p>
-            <small style='color: #9CA3AF;'>12 active deals</small>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div class='metric-card warning-metric'>
-            <h3 style='color: #F59E0B; margin: 0; font-size: 2rem;'>28</h3>
-            <p style='margin: 0; font-weight: bold;'>Hot Leads</p>
-            <small style='color: #9CA3AF;'>92 avg score</small>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown("""
-        <div class='metric-card'>
-            <h3 style='color: #8B5CF6; margin: 0; font-size: 2rem;'>67</h3>
-            <p style='margin: 0; font-weight: bold;'>Grade A Deals</p>
-            <small style='color: #9CA3AF;'>234 analyzed</small>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col5:
-        st.markdown("""
-        <div class='metric-card'>
-            <h3 style='color: #3B82F6; margin: 0; font-size: 2rem;'>18.5%</h3>
-            <p style='margin: 0; font-weight: bold;'>Conversion Rate</p>
-            <small style='color: #9CA3AF;'>Industry: 12%</small>
-        </div>
-        """, unsafe_allow_html=True)
+    k = summarize(MockDataService.get_deals() + st.session_state.deals,
+                  MockDataService.get_leads() + st.session_state.leads,
+                  revenue=lambda d: d.get('profit', 0), pipeline=lambda d: d.get('list_price', 0))
+    conversion = f"{k['conversion']:.1f}%" if k['conversion'] is not None else "—"
+    hot_avg = f"{k['hot_avg_score']:.0f} avg score" if k['hot_avg_score'] else "no hot leads yet"
+    tiles = [
+        ('success-metric', '#10B981', money(k['revenue']), 'YTD Revenue', f"{k['closed']} deals closed"),
+        ('', '#8B5CF6', money(k['pipeline_value']), 'Pipeline Value', f"{k['active']} active deals"),
+        ('warning-metric', '#F59E0B', k['hot_leads'], 'Hot Leads', hot_avg),
+        ('', '#8B5CF6', k['grade_a'], 'Grade A Deals', f"{k['deals']} analyzed"),
+        ('', '#3B82F6', conversion, 'Conversion Rate', 'Industry: 12%'),
+    ]
+    for col, (css, color, value, label, sub) in zip(st.columns(5), tiles):
+        with col:
+            st.markdown(f"""
+            <div class='metric-card {css}'>
+                <h3 style='color: {color}; margin: 0; font-size: 2rem;'>{value}</h3>
+                <p style='margin: 0; font-weight: bold;'>{label}</p>
+                <small style='color: #9CA3AF;'>{sub}</small>
+            </div>
+            """, unsafe_allow_html=True)
     
     # Quick actions
     st.markdown("## ⚡ Quick Actions")
@@ -870,8 +741,12 @@ def render_deal_analyzer():
         </p>
     </div>
     """, unsafe_allow_html=True)
-    
-    # Property lookup
+    _deal_analyzer_panel()
+
+@fragment
+def _deal_analyzer_panel():
+    # Reruns on its own (typing an address or clicking an action does not re-run the page CSS or other panels);
+    # the last analysis lives in session state so the action buttons below work on their own rerun
     st.markdown("### 📍 Property Address Lookup")
     
     col1, col2, col3, col4 = st.columns([4, 2, 1, 1])
@@ -893,158 +768,150 @@ def render_deal_analyzer():
     
     # Property analysis
     if lookup_btn and lookup_address and lookup_city and lookup_state:
-        with st.spinner("🔍 Performing professional property analysis..."):
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            status_text.text("📡 Connecting to property databases...")
-            progress_bar.progress(15)
-            time.sleep(0.4)
-            
-            status_text.text("🏠 Pulling comprehensive property data...")
-            progress_bar.progress(50)
-            time.sleep(0.3)
-            
-            status_text.text("💰 Calculating investment metrics...")
-            progress_bar.progress(75)
-            time.sleep(0.3)
-            
-            status_text.text("✅ Analysis complete!")
-            progress_bar.progress(100)
-            time.sleep(0.2)
-            
-            # Get property data
+        # Only show a spinner when the lookup actually goes out to the provider
+        if ProfessionalPropertyDataService.is_cached(lookup_address, lookup_city, lookup_state):
             property_data = ProfessionalPropertyDataService.lookup_property_by_address(
                 lookup_address, lookup_city, lookup_state
             )
-            
-            progress_bar.empty()
-            status_text.empty()
-            
-            if property_data['found']:
-                # Calculate deal grade
-                deal_analysis = DealGradingEngine.calculate_grade(property_data)
-                
-                st.success(f"✅ Property analysis complete! Data confidence: {property_data['data_confidence']}%")
-                
-                # Deal grade display
-                grade_colors = {'A': '#10B981', 'B': '#8B5CF6', 'C': '#F59E0B', 'D': '#EF4444'}
-                grade_color = grade_colors.get(deal_analysis['grade'], '#6B7280')
-                
-                st.markdown(f"""
-                <div class='feature-card' style='background: linear-gradient(135deg, rgba(16, 185, 129, 0.15) 0%, rgba(16, 185, 129, 0.08) 100%); 
-                            border: 3px solid {grade_color}; text-align: center;'>
-                    <h2 style='color: {grade_color}; margin: 0; font-size: 3.5rem;'>Deal Grade: {deal_analysis['grade']}</h2>
-                    <div style='display: flex; justify-content: center; gap: 3rem; margin: 1.5rem 0;'>
-                        <div>
-                            <p style='margin: 0; font-size: 1.3rem; color: white; font-weight: bold;'>
-                                Score: {deal_analysis['score']}/100
-                            </p>
-                        </div>
-                        <div>
-                            <p style='margin: 0; font-size: 1.3rem; color: white; font-weight: bold;'>
-                                Confidence: {deal_analysis['confidence']}%
-                            </p>
-                        </div>
-                        <div>
-                            <p style='margin: 0; font-size: 1.3rem; color: white; font-weight: bold;'>
-                                Profit: ${property_data['mao_70']:,}
-                            </p>
-                        </div>
-                    </div>
-                    <p style='margin: 1rem 0; font-size: 1.4rem; color: white; font-weight: bold;'>
-                        💡 Strategy: {deal_analysis['strategy']}
-                    </p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Property overview
-                st.markdown("### 📊 Professional Property Analysis")
-                
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.markdown(f"""
-                    <div style='background: rgba(16, 185, 129, 0.1); padding: 1rem; border-radius: 10px; border: 1px solid rgba(16, 185, 129, 0.3);'>
-                        <strong style='color: #10B981;'>🏠 Property Details</strong><br>
-                        Address: {property_data['address']}<br>
-                        List Price: ${property_data['list_price']:,}<br>
-                        ARV: ${property_data['arv']:,}<br>
-                        Square Feet: {property_data['square_feet']:,}<br>
-                        Bedrooms: {property_data['bedrooms']} | Bathrooms: {property_data['bathrooms']}<br>
-                        Year Built: {property_data['year_built']}<br>
-                        Condition: {property_data['condition'].title()} ({property_data['condition_score']}/100)
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col2:
-                    st.markdown(f"""
-                    <div style='background: rgba(139, 92, 246, 0.1); padding: 1rem; border-radius: 10px; border: 1px solid rgba(139, 92, 246, 0.3);'>
-                        <strong style='color: #8B5CF6;'>💰 Investment Analysis</strong><br>
-                        Max Offer (70%): ${property_data['mao_70']:,}<br>
-                        Max Offer (75%): ${property_data['mao_75']:,}<br>
-                        Rehab Cost: ${property_data['rehab_cost']:,}<br>
-                        Monthly Rent: ${property_data['monthly_rent']:,}<br>
-                        ROI Potential: {((property_data['arv'] - property_data['mao_70']) / property_data['mao_70'] * 100) if property_data['mao_70'] > 0 else 0:.1f}%
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col3:
-                    st.markdown(f"""
-                    <div style='background: rgba(245, 158, 11, 0.1); padding: 1rem; border-radius: 10px; border: 1px solid rgba(245, 158, 11, 0.3);'>
-                        <strong style='color: #F59E0B;'>📞 Owner Info</strong><br>
-                        Owner: {property_data['owner_data']['name']}<br>
-                        Phone: {property_data['owner_data']['phone']}<br>
-                        Ownership: {property_data['owner_data']['ownership_length']} years<br>
-                        Motivation: {property_data['owner_data']['motivation']}<br>
-                        Score: {property_data['owner_data']['motivation_score']}/100
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                # Action buttons
-                st.markdown("### 🎯 Take Professional Action")
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    if st.button("📝 Generate LOI", key="pro_action_loi", use_container_width=True):
-                        st.session_state.current_page = 'contract_generator'
-                        st.success("LOI generator ready!")
-                        st.rerun()
-                
-                with col2:
-                    if st.button("📄 Create Contract", key="pro_action_contract", use_container_width=True):
-                        st.session_state.current_page = 'contract_generator'
-                        st.success("Contract generator ready!")
-                        st.rerun()
-                
-                with col3:
-                    if st.button("👥 Find Buyers", key="pro_action_buyers", use_container_width=True):
-                        st.session_state.current_page = 'buyer_network'
-                        st.rerun()
-                
-                with col4:
-                    if st.button("📋 Add to Pipeline", key="pro_action_pipeline", use_container_width=True):
-                        # Add to deals
-                        new_deal = {
-                            'id': str(len(st.session_state.deals) + 1),
-                            'title': f"{lookup_address} Deal",
-                            'address': f"{lookup_address}, {lookup_city}, {lookup_state}",
-                            'status': 'New Lead',
-                            'profit': property_data['mao_70'],
-                            'arv': property_data['arv'],
-                            'list_price': property_data['list_price'],
-                            'grade': deal_analysis['grade'],
-                            'roi': ((property_data['arv'] - property_data['mao_70']) / property_data['mao_70'] * 100) if property_data['mao_70'] > 0 else 0
-                        }
-                        st.session_state.deals.append(new_deal)
-                        st.success("Deal added to pipeline!")
-            else:
-                st.error("❌ Property not found. Please verify the address and try again.")
-    
+        else:
+            with st.spinner("🔍 Pulling property data..."):
+                property_data = ProfessionalPropertyDataService.lookup_property_by_address(
+                    lookup_address, lookup_city, lookup_state
+                )
+        
+        if property_data['found']:
+            st.session_state.pro_analysis = {
+                'property': property_data, 'grade': DealGradingEngine.calculate_grade(property_data),
+                'address': lookup_address, 'city': lookup_city, 'state': lookup_state}
+        else:
+            st.session_state.pop('pro_analysis', None)
+            st.error("❌ Property not found. Please verify the address and try again.")
+
     elif lookup_btn:
         st.error("Please enter address, city, and state")
 
+    if st.session_state.get('pro_analysis'):
+        _render_pro_analysis(st.session_state.pro_analysis)
+
+def _render_pro_analysis(result):
+    property_data, deal_analysis = result['property'], result['grade']
+    lookup_address, lookup_city, lookup_state = result['address'], result['city'], result['state']
+
+    st.success(f"✅ Property analysis complete! Data confidence: {property_data['data_confidence']}%")
+    
+    # Deal grade display
+    grade_colors = {'A': '#10B981', 'B': '#8B5CF6', 'C': '#F59E0B', 'D': '#EF4444'}
+    grade_color = grade_colors.get(deal_analysis['grade'], '#6B7280')
+    
+    st.markdown(f"""
+    <div class='feature-card' style='background: linear-gradient(135deg, rgba(16, 185, 129, 0.15) 0%, rgba(16, 185, 129, 0.08) 100%); 
+                border: 3px solid {grade_color}; text-align: center;'>
+        <h2 style='color: {grade_color}; margin: 0; font-size: 3.5rem;'>Deal Grade: {deal_analysis['grade']}</h2>
+        <div style='display: flex; justify-content: center; gap: 3rem; margin: 1.5rem 0;'>
+            <div>
+                <p style='margin: 0; font-size: 1.3rem; color: white; font-weight: bold;'>
+                    Score: {deal_analysis['score']}/100
+                </p>
+            </div>
+            <div>
+                <p style='margin: 0; font-size: 1.3rem; color: white; font-weight: bold;'>
+                    Confidence: {deal_analysis['confidence']}%
+                </p>
+            </div>
+            <div>
+                <p style='margin: 0; font-size: 1.3rem; color: white; font-weight: bold;'>
+                    Profit: ${property_data['mao_70']:,}
+                </p>
+            </div>
+        </div>
+        <p style='margin: 1rem 0; font-size: 1.4rem; color: white; font-weight: bold;'>
+            💡 Strategy: {deal_analysis['strategy']}
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Property overview
+    st.markdown("### 📊 Professional Property Analysis")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown(f"""
+        <div style='background: rgba(16, 185, 129, 0.1); padding: 1rem; border-radius: 10px; border: 1px solid rgba(16, 185, 129, 0.3);'>
+            <strong style='color: #10B981;'>🏠 Property Details</strong><br>
+            Address: {property_data['address']}<br>
+            List Price: ${property_data['list_price']:,}<br>
+            ARV: ${property_data['arv']:,}<br>
+            Square Feet: {property_data['square_feet']:,}<br>
+            Bedrooms: {property_data['bedrooms']} | Bathrooms: {property_data['bathrooms']}<br>
+            Year Built: {property_data['year_built']}<br>
+            Condition: {property_data['condition'].title()} ({property_data['condition_score']}/100)
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div style='background: rgba(139, 92, 246, 0.1); padding: 1rem; border-radius: 10px; border: 1px solid rgba(139, 92, 246, 0.3);'>
+            <strong style='color: #8B5CF6;'>💰 Investment Analysis</strong><br>
+            Max Offer (70%): ${property_data['mao_70']:,}<br>
+            Max Offer (75%): ${property_data['mao_75']:,}<br>
+            Rehab Cost: ${property_data['rehab_cost']:,}<br>
+            Monthly Rent: ${property_data['monthly_rent']:,}<br>
+            ROI Potential: {((property_data['arv'] - property_data['mao_70']) / property_data['mao_70'] * 100) if property_data['mao_70'] > 0 else 0:.1f}%
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+        <div style='background: rgba(245, 158, 11, 0.1); padding: 1rem; border-radius: 10px; border: 1px solid rgba(245, 158, 11, 0.3);'>
+            <strong style='color: #F59E0B;'>📞 Owner Info</strong><br>
+            Owner: {property_data['owner_data']['name']}<br>
+            Phone: {property_data['owner_data']['phone']}<br>
+            Ownership: {property_data['owner_data']['ownership_length']} years<br>
+            Motivation: {property_data['owner_data']['motivation']}<br>
+            Score: {property_data['owner_data']['motivation_score']}/100
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Action buttons
+    st.markdown("### 🎯 Take Professional Action")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        if st.button("📝 Generate LOI", key="pro_action_loi", use_container_width=True):
+            st.session_state.current_page = 'contract_generator'
+            st.success("LOI generator ready!")
+            st.rerun()
+    
+    with col2:
+        if st.button("📄 Create Contract", key="pro_action_contract", use_container_width=True):
+            st.session_state.current_page = 'contract_generator'
+            st.success("Contract generator ready!")
+            st.rerun()
+    
+    with col3:
+        if st.button("👥 Find Buyers", key="pro_action_buyers", use_container_width=True):
+            st.session_state.current_page = 'buyer_network'
+            st.rerun()
+    
+    with col4:
+        if st.button("📋 Add to Pipeline", key="pro_action_pipeline", use_container_width=True):
+            # Add to deals
+            new_deal = {
+                'id': str(len(st.session_state.deals) + 1),
+                'title': f"{lookup_address} Deal",
+                'address': f"{lookup_address}, {lookup_city}, {lookup_state}",
+                'status': 'New Lead',
+                'profit': property_data['mao_70'],
+                'arv': property_data['arv'],
+                'list_price': property_data['list_price'],
+                'grade': deal_analysis['grade'],
+                'roi': ((property_data['arv'] - property_data['mao_70']) / property_data['mao_70'] * 100) if property_data['mao_70'] > 0 else 0
+            }
+            st.session_state.deals.append(new_deal)
+            st.success("Deal added to pipeline!")
+
 # Placeholder functions for other pages
 def render_placeholder_page(title):
     """Render placeholder pages"""
@@ -1075,6 +942,8 @@ def main():
             render_dashboard()
         elif current_page == 'deal_analyzer':
             render_deal_analyzer()
+        elif current_page == 'bulk_analyze':
+            render_bulk_analyze()
         elif current_page == 'lead_manager':
             render_placeholder_page("📞 Lead Manager")
         elif current_page == 'deal_pipeline':
@@ -1087,6 +956,7 @@ def main():
             render_placeholder_page("📊 Analytics")
         else:
             render_dashboard()
+    import_profile_panel()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
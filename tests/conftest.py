@@ -0,0 +1,37 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from w2f_migrations import FIXED_MIGRATIONS, PLATFORM_MIGRATIONS, migrate  # noqa: E402
+
+
+@pytest.fixture
+def platform_db():
+    """In-memory wtf_platform.db at the latest schema."""
+    conn = sqlite3.connect(":memory:")
+    migrate(conn, PLATFORM_MIGRATIONS)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def fixed_db():
+    """In-memory wtf.db (wtf_app_fixed) at the latest schema."""
+    conn = sqlite3.connect(":memory:")
+    migrate(conn, FIXED_MIGRATIONS)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def platform_path(tmp_path):
+    """Path of an on-disk wtf_platform.db at the latest schema, for code that opens pooled connections by path."""
+    from w2f_db import get_pool
+    path = str(tmp_path / "wtf_platform.db")
+    with get_pool(path).connection() as conn:
+        migrate(conn, PLATFORM_MIGRATIONS)
+    return path
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from w2f_cache import TTLCache
+from w2f_lookup import LookupProvider, cached_lookups
+
+REQUESTS = [(f"{i} Main St", "Dallas", "TX") for i in range(10)]
+
+
+def _key(address, city, state):
+    return f"{address}|{city}|{state}".lower()
+
+
+class CountingProvider(LookupProvider):
+    """Slow stub that counts fetches per address; addresses in `missing` come back not found."""
+
+    def __init__(self, latency=0.05, missing=()):
+        self.latency = latency
+        self.missing = set(missing)
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    async def fetch(self, address, city, state):
+        with self._lock: self.calls[address] = self.calls.get(address, 0) + 1
+        time.sleep(self.latency)  # block the loop thread so callers overlap for the whole fetch
+        return {"found": address not in self.missing, "address": address, "city": city, "state": state}
+
+
+def _concurrently(n, fn):
+    barrier = threading.Barrier(n)
+    out, errors = [None] * n, []
+
+    def run(i):
+        barrier.wait()
+        try: out[i] = fn(i)
+        except Exception as e: errors.append(e)
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert not errors
+    return out
+
+
+def test_concurrent_misses_fetch_each_address_once():
+    cache, provider = TTLCache(), CountingProvider()
+    # overlapping batches: caller i asks for addresses i..i+5
+    out = _concurrently(5, lambda i: cached_lookups(cache, REQUESTS[i:i + 6], _key, provider))
+    assert provider.calls == {r[0]: 1 for r in REQUESTS}
+    for i, res in enumerate(out):
+        assert [p["address"] for p in res] == [r[0] for r in REQUESTS[i:i + 6]]
+    assert cache.stats()["coalesced"] > 0
+    cached_lookups(cache, REQUESTS, _key, provider)
+    assert sum(provider.calls.values()) == len(REQUESTS)
+
+
+def test_not_found_is_shared_but_not_cached():
+    cache, provider = TTLCache(), CountingProvider(missing={REQUESTS[0][0]})
+    out = _concurrently(4, lambda i: cached_lookups(cache, REQUESTS[:1], _key, provider))
+    assert provider.calls == {REQUESTS[0][0]: 1}
+    assert all(res[0]["found"] is False for res in out)
+    assert _key(*REQUESTS[0]) not in cache
+    cached_lookups(cache, REQUESTS[:1], _key, provider)
+    assert provider.calls == {REQUESTS[0][0]: 2}
+
+
+def test_waiters_get_the_loader_error_and_the_key_can_be_retried():
+    cache, started, release = TTLCache(), threading.Event(), threading.Event()
+
+    def failing(keys):
+        started.set(); release.wait(5)
+        raise ConnectionError("vendor down")
+    leader = threading.Thread(target=lambda: pytest.raises(ConnectionError, cache.get_or_load, ["k"], failing))
+    leader.start()
+    started.wait(5)
+    waiter_errors = []
+    waiter = threading.Thread(target=lambda: waiter_errors.append(
+        pytest.raises(ConnectionError, cache.get_or_load, ["k"], lambda keys: ["unused"])))
+    waiter.start()
+    while cache.stats()["coalesced"] == 0: time.sleep(0.001)
+    release.set()
+    leader.join(); waiter.join()
+    assert len(waiter_errors) == 1
+    assert cache.get_or_load(["k"], lambda keys: ["ok"]) == ["ok"]
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from w2f_import import BUYER_IMPORT, ImportReport, import_frame
+
+
+def _import(conn, *rows):
+    frame = pd.DataFrame([{k: str(v) for k, v in r.items()} for r in rows]).fillna("")
+    return import_frame(conn, frame, BUYER_IMPORT, ImportReport())
+
+
+def _buyers(conn):
+    return pd.read_sql_query("SELECT id, name, email, phone, cash_available, dedupe_key FROM buyers", conn)
+
+
+def test_phone_then_email_merges(platform_db):
+    _import(platform_db, {"name": "Acme Homes", "phone": "(214) 555-0100", "cash": "50000"})
+    _import(platform_db, {"name": "Acme Homes", "email": "Deals@Acme.com", "phone": "214-555-0100"})
+    rows = _buyers(platform_db)
+    assert len(rows) == 1
+    assert rows.loc[0, "email"] == "Deals@Acme.com"
+    assert rows.loc[0, "cash_available"] == 50000       # merged, not overwritten
+    assert rows.loc[0, "dedupe_key"] == "e:deals@acme.com"  # upgraded to the strongest key
+
+
+def test_email_then_phone_only_merges(platform_db):
+    _import(platform_db, {"name": "Acme Homes", "email": "deals@acme.com", "phone": "2145550100"})
+    _import(platform_db, {"name": "Acme Homes LLC", "phone": "+1 214 555 0100", "cash": "75000"})
+    rows = _buyers(platform_db)
+    assert len(rows) == 1
+    assert rows.loc[0, "cash_available"] == 75000
+    assert rows.loc[0, "dedupe_key"] == "e:deals@acme.com"
+
+
+def test_changed_key_class_in_one_chunk(platform_db):
+    _import(platform_db, {"name": "Acme", "phone": "2145550100"},
+            {"name": "Acme", "email": "deals@acme.com", "phone": "2145550100"})
+    assert len(_buyers(platform_db)) == 1
+
+
+def test_name_only_does_not_merge_distinct_contacts(platform_db):
+    _import(platform_db, {"name": "John Smith", "email": "john@a.com"})
+    _import(platform_db, {"name": "John Smith", "email": "john@b.com"})
+    assert len(_buyers(platform_db)) == 2
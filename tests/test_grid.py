@@ -0,0 +1,51 @@
+import pytest
+
+from w2f_grid import GridSpec, _keyset, _where
+from w2f_pipeline import BOARD_GRID, KANBAN_STAGES
+
+# sortable columns and filters of the app grids (wtf_app.py / wtf_app_fixed.py import streamlit at module level)
+PLATFORM_GRIDS = [
+    GridSpec("buyers", ["id"], sortable=["created_at", "cash_available", "name", "min_price", "max_price"],
+             equals={"verified": [1, 0]}),
+    BOARD_GRID,
+]
+FIXED_GRIDS = [
+    GridSpec("leads", ["id"], sortable=["created_at", "score", "name"], equals={"status": ["New"]}),
+    GridSpec("deals", ["id"], sortable=["created_at", "arv", "grade"], equals={"grade": ["A"]}),
+    GridSpec("buyers", ["id"], sortable=["created_at", "cash_available", "name"], equals={"verified": [1, 0]}),
+]
+
+
+def _plans(conn, spec, filters=()):
+    for sort in spec.sortable:
+        for desc in (True, False):
+            clauses, params = _where(spec, filters, "")
+            c, p = _keyset(sort, desc, (1, 1))
+            d = "DESC" if desc else "ASC"
+            sql = (f"SELECT rowid, {sort} FROM {spec.table} WHERE {' AND '.join(clauses + [c])}"
+                   f" ORDER BY {sort} {d}, rowid {d} LIMIT 51")
+            plan = " | ".join(r[-1] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params + p))
+            yield sort, desc, plan
+
+
+@pytest.mark.parametrize("spec", PLATFORM_GRIDS, ids=lambda s: s.table)
+def test_platform_grid_sorts_use_an_index(platform_db, spec):
+    for sort, desc, plan in _plans(platform_db, spec):
+        assert "TEMP B-TREE" not in plan and "INDEX" in plan, (sort, desc, plan)
+
+
+@pytest.mark.parametrize("spec", FIXED_GRIDS, ids=lambda s: s.table)
+def test_fixed_grid_sorts_use_an_index(fixed_db, spec):
+    for sort, desc, plan in _plans(fixed_db, spec):
+        assert "TEMP B-TREE" not in plan and "INDEX" in plan, (sort, desc, plan)
+
+
+def test_grade_filter_sorted_by_created_at_uses_an_index(fixed_db):
+    spec = FIXED_GRIDS[1]
+    plans = [p for sort, _, p in _plans(fixed_db, spec, [("grade", "=", "A")]) if sort == "created_at"]
+    assert plans and all("ix_deals_grade_created" in p and "TEMP B-TREE" not in p for p in plans), plans
+
+
+def test_board_stage_filter_uses_an_index(platform_db):
+    plans = list(_plans(platform_db, BOARD_GRID, [("stage", "=", KANBAN_STAGES[0])]))
+    assert all("ix_deals_stage_created" in p and "TEMP B-TREE" not in p for _, _, p in plans), plans
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from w2f_lookup import LookupProvider, StubLookupProvider, lookup_many, run_lookups
+
+REQUESTS = [(f"{i} Main St", "Dallas", "TX") for i in range(20)]
+
+
+def _generate(address, city, state):
+    return {"found": True, "address": address, "city": city, "state": state}
+
+
+class CountingProvider(LookupProvider):
+    """Stub with latency that records the peak number of fetches in flight."""
+
+    def __init__(self, latency=0.01):
+        self.latency = latency
+        self.active = self.peak = 0
+
+    async def fetch(self, address, city, state):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            return _generate(address, city, state)
+        finally:
+            self.active -= 1
+
+
+class FlakyProvider(LookupProvider):
+    """Raises on the first call per address, then hangs past any timeout."""
+
+    def __init__(self):
+        self.calls = {}
+
+    async def fetch(self, address, city, state):
+        n = self.calls[address] = self.calls.get(address, 0) + 1
+        if n == 1: raise ConnectionError("vendor reset")
+        await asyncio.sleep(10)
+
+
+class RecoveringProvider(FlakyProvider):
+    async def fetch(self, address, city, state):
+        n = self.calls[address] = self.calls.get(address, 0) + 1
+        if n == 1: raise ConnectionError("vendor reset")
+        return _generate(address, city, state)
+
+
+def test_stub_results_keep_input_order():
+    out = run_lookups(REQUESTS, StubLookupProvider(_generate))
+    assert [r["address"] for r in out] == [r[0] for r in REQUESTS]
+    assert all(r["found"] for r in out)
+
+
+def test_semaphore_bounds_concurrency():
+    provider = CountingProvider()
+    out = asyncio.run(lookup_many(provider, REQUESTS, concurrency=3))
+    assert len(out) == len(REQUESTS)
+    assert provider.peak == 3
+
+
+def test_retry_recovers_after_one_failure():
+    provider = RecoveringProvider()
+    out = run_lookups(REQUESTS[:3], provider, retries=1, backoff=0.0)
+    assert all(r["found"] for r in out)
+    assert set(provider.calls.values()) == {2}
+
+
+def test_failure_then_timeout_returns_not_found():
+    provider = FlakyProvider()
+    started = time.perf_counter()
+    out = run_lookups(REQUESTS[:2], provider, retries=1, timeout=0.05, backoff=0.1)
+    elapsed = time.perf_counter() - started
+    assert [r["found"] for r in out] == [False, False]
+    assert all(r["error"] == "TimeoutError" for r in out)
+    assert set(provider.calls.values()) == {2}      # the first error was retried once
+    assert 0.15 <= elapsed < 1.0                     # backoff (0.1s) + timeout (0.05s), run concurrently
+
+
+def test_progress_reports_every_lookup():
+    seen = []
+    run_lookups(REQUESTS, StubLookupProvider(_generate), on_progress=lambda done, total: seen.append((done, total)))
+    assert seen == [(i, len(REQUESTS)) for i in range(1, len(REQUESTS) + 1)]
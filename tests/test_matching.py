@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from w2f_matching import ANY, NO_MAX_PRICE, BuyerIndex, tokens
+
+STATES = ["TX", "FL", "GA"]
+CITIES = ["HOUSTON", "DALLAS", "MIAMI", "ATLANTA"]
+TYPES = ["SFR", "CONDO", "MULTI"]
+
+
+def _buyer(rng, bid):
+    lo = rng.choice([None, 0, 50000, 100000, 150000, 150000])
+    return {"id": bid, "name": f"Buyer {bid}",
+            "states": ",".join(rng.sample(STATES, rng.randint(1, 2))),
+            "cities": ",".join(rng.sample(CITIES, rng.randint(0, 2))),
+            "property_types": ",".join(rng.sample(TYPES, rng.randint(0, 2))),
+            "min_price": lo, "max_price": rng.choice([None, 200000, 300000, 500000]),
+            "verified": rng.choice([0, 1]), "cash_available": rng.choice([0, 100000, 250000, 250000, 1e6])}
+
+
+def _num(v, default):
+    return default if v is None else float(v)
+
+
+def _brute(records, state, city, price, ptype):
+    """The matching rule applied record by record; (rank key, id) pairs, best first."""
+    out = []
+    for r in records.values():
+        cities = tokens(r["cities"])
+        types = tokens(r["property_types"])
+        if state.upper() not in tokens(r["states"]): continue
+        if cities and city.upper() not in cities: continue
+        if price is not None and not (_num(r["min_price"], 0) <= price <= _num(r["max_price"], NO_MAX_PRICE)): continue
+        if ptype and types and ptype.upper() not in types: continue
+        out.append((-(r["verified"] * 1e15 + r["cash_available"]), r["id"]))
+    return sorted(out)
+
+
+def _queries(rng, n):
+    for _ in range(n):
+        yield (rng.choice(STATES), rng.choice(CITIES + ["", ANY]), rng.choice([None, 0, 100000, 150000, 250000]),
+               rng.choice([None, "SFR", "condo", "LAND"]))
+
+
+def _check(idx, records, rng):
+    for q in _queries(rng, 25):
+        expect = _brute(records, *q)
+        got = idx.match(*q)
+        assert sorted(r["id"] for r in got) == sorted(i for _, i in expect), q
+        ranks = [-(r["verified"] * 1e15 + r["cash_available"]) for r in got]
+        assert ranks == sorted(ranks), q
+        top, total = idx.match_top(*q, limit=5)
+        assert total == len(expect), q
+        assert [-(r["verified"] * 1e15 + r["cash_available"]) for r in top] == [k for k, _ in expect[:5]], q
+        assert {r["id"] for r in top} <= {i for _, i in expect}, q
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_match_tracks_brute_force_through_upserts_and_removes(seed):
+    rng = random.Random(seed)
+    records = {i: _buyer(rng, i) for i in range(150)}
+    idx = BuyerIndex.from_records(records.values())
+    _check(idx, records, rng)
+    next_id = len(records)
+    for _ in range(40):
+        # a few changes between queries, so buckets are patched rather than rebuilt
+        for _ in range(rng.randint(1, 4)):
+            op = rng.random()
+            if op < 0.4:
+                bid = rng.choice(list(records)); records[bid] = _buyer(rng, bid)
+                idx.upsert(records[bid])
+            elif op < 0.7:
+                records[next_id] = _buyer(rng, next_id); idx.upsert(records[next_id]); next_id += 1
+            elif records:
+                bid = rng.choice(list(records)); del records[bid]; idx.remove(bid)
+        _check(idx, records, rng)
+    assert len(idx) == len(records)
+
+
+def test_upsert_patches_built_buckets_instead_of_rebuilding(monkeypatch):
+    rng = random.Random(1)
+    records = [dict(_buyer(rng, i), states="TX", cities="") for i in range(200)]
+    idx = BuyerIndex.from_records(records)
+    idx.match("TX")
+    built = []
+    real = BuyerIndex._columns
+    monkeypatch.setattr(BuyerIndex, "_columns", lambda self, ids: built.append(len(ids)) or real(self, ids))
+    changed = dict(records[7], min_price=175000, max_price=None, verified=1, cash_available=5e6, property_types="")
+    idx.upsert(changed)
+    idx.remove(records[8]["id"])
+    ids = [r["id"] for r in idx.match("TX", price=180000)]
+    assert built == [1]  # only the changed buyer's row was computed
+    assert ids[0] == 7 and 8 not in ids
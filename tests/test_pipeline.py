@@ -0,0 +1,76 @@
+import random
+import uuid
+
+from w2f_db import get_pool
+from w2f_pipeline import KANBAN_STAGES, apply_board, board_moves, move_deals, stage_counts
+
+
+def _add_deals(path, *stages):
+    ids = [uuid.uuid4().hex for _ in stages]
+    with get_pool(path).connection() as conn:
+        conn.executemany("INSERT INTO deals (id, title, stage) VALUES (?,?,?)",
+                         [(i, f"Deal {n}", s) for n, (i, s) in enumerate(zip(ids, stages))])
+    return ids
+
+
+def _stage(path, deal_id):
+    with get_pool(path).connection() as conn:
+        return conn.execute("SELECT stage FROM deals WHERE id=?", (deal_id,)).fetchone()[0]
+
+
+def test_move_count_excludes_trigger_writes(platform_path):
+    stale, valid = _add_deals(platform_path, "Negotiating", "Prospecting")
+    moved = move_deals(platform_path, {stale: ("Prospecting", "Closed"),   # board showed it in the wrong column
+                                       valid: ("Prospecting", "Negotiating")})
+    assert moved == 1
+    assert _stage(platform_path, stale) == "Negotiating"
+    assert _stage(platform_path, valid) == "Negotiating"
+
+
+def test_board_submit_reports_applied_and_skipped(platform_path):
+    a, b, c = _add_deals(platform_path, "Prospecting", "Prospecting", "Negotiating")
+    ids = {"Prospecting": [a, b], "Negotiating": [c]}
+    move_deals(platform_path, {b: ("Prospecting", "Due Diligence")})  # another session, after this board rendered
+    edits = {"Prospecting": {0: {"stage": "Negotiating"}, 1: {"stage": "Closed"}, 5: {"stage": "Closed"}},
+             "Negotiating": {"0": {"stage": "Negotiating"}}}  # unchanged stage and unknown row are not moves
+    assert board_moves(edits, ids) == {a: ("Prospecting", "Negotiating"), b: ("Prospecting", "Closed")}
+    assert apply_board(platform_path, edits, ids) == (1, 2)
+    assert _stage(platform_path, a) == "Negotiating"
+    assert _stage(platform_path, b) == "Due Diligence"
+
+
+def _live_counts(conn):
+    return dict(conn.execute("SELECT stage, COUNT(*) FROM deals WHERE stage IS NOT NULL GROUP BY stage").fetchall())
+
+
+def _trigger_counts(conn):
+    return {s: n for s, n in conn.execute("SELECT stage, deals FROM deal_stage_counts").fetchall() if n}
+
+
+def test_stage_counts_track_inserts_moves_and_deletes(platform_db):
+    random.seed(7)
+    ids = []
+    for step in range(400):
+        op = random.random()
+        if op < 0.45 or not ids:
+            ids.append(uuid.uuid4().hex)
+            platform_db.execute("INSERT INTO deals (id, title, stage) VALUES (?,?,?)",
+                                (ids[-1], "Deal", random.choice(KANBAN_STAGES + [None])))
+        elif op < 0.85:
+            platform_db.execute("UPDATE deals SET stage=? WHERE id=?",
+                                (random.choice(KANBAN_STAGES + [None]), random.choice(ids)))
+        else:
+            platform_db.execute("DELETE FROM deals WHERE id=?", (ids.pop(random.randrange(len(ids))),))
+        if step % 50 == 0: assert _trigger_counts(platform_db) == _live_counts(platform_db)
+    assert _trigger_counts(platform_db) == _live_counts(platform_db)
+    events = platform_db.execute("SELECT COUNT(*) FROM deal_stage_events").fetchone()[0]
+    assert events > 0
+
+
+def test_stage_counts_reads_trigger_table(platform_path):
+    _add_deals(platform_path, "Prospecting", "Prospecting", "Closed")
+    a, = _add_deals(platform_path, "Negotiating")
+    move_deals(platform_path, {a: ("Negotiating", "Closed")})
+    with get_pool(platform_path).connection() as conn:
+        live = _live_counts(conn)
+    assert stage_counts(platform_path) == {s: live.get(s, 0) for s in KANBAN_STAGES}
@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+
+import pytest
+
+from w2f_sheets import StaticSheetClient, sync_sheet
+
+URL = "https://docs.google.com/spreadsheets/d/test"
+HEADER = ["Name", "Email", "Phone", "State", "City", "Cash"]
+ROWS = [[f"Buyer {i}", f"b{i}@example.com", f"214555{i:04d}", "TX", "Dallas", str(10000 * i)] for i in range(1, 26)]
+
+
+@pytest.fixture
+def connect(platform_db):
+    @contextmanager
+    def _connect():
+        yield platform_db
+        platform_db.commit()
+    return _connect
+
+
+def _count(conn):
+    return conn.execute("SELECT COUNT(*) FROM buyers").fetchone()[0]
+
+
+def test_unchanged_revision_skips_fetch(connect, platform_db):
+    client = StaticSheetClient([HEADER] + ROWS, revision="7")
+    first = sync_sheet(connect, URL, client=client, block=10)
+    assert first.imported == len(ROWS) and _count(platform_db) == len(ROWS)
+    fetched = client.fetched
+    again = sync_sheet(connect, URL, client=client, block=10)
+    assert client.fetched == fetched  # not a single row read
+    assert again.rows == again.imported == 0
+    assert again.seconds > 0
+
+
+def test_unchanged_rows_skipped_by_hash(connect, platform_db):
+    client = StaticSheetClient([HEADER] + ROWS, revision="1")
+    sync_sheet(connect, URL, client=client, block=10)
+    edited = [list(r) for r in ROWS]
+    edited[4][5] = "999999"
+    client.set_values([HEADER] + edited, revision="2")
+    report = sync_sheet(connect, URL, client=client, block=10)
+    assert report.rows == report.imported == 1
+    assert report.unchanged == len(ROWS) - 1
+    cash = platform_db.execute("SELECT cash_available FROM buyers WHERE email='b5@example.com'").fetchone()[0]
+    assert cash == 999999
+
+
+def test_empty_sheet_reports_elapsed_time(connect):
+    report = sync_sheet(connect, URL, client=StaticSheetClient([], revision="1"))
+    assert report.rows == 0
+    assert report.seconds > 0
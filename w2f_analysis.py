@@ -0,0 +1,129 @@
+"""
+WTF (Wholesale2Flip) — Batch Deal Analysis Engine
+- Scores whole lead lists (DataFrame / CSV / Parquet) in one vectorized pass
+- Mirrors `analyze_property` (app.py) and `DealGradingEngine.calculate_grade` (streamlit_app_main.py)
+- Headless: `analyze_frame(df)` / `analyze_file(path)`; UI: `render_bulk_analyze()`
+"""
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from w2f_calc import DEFAULT_ARV, GRADE_STRATEGIES, PASS_STRATEGY, SAMPLE_ADDR, SAMPLE_DATA
+from w2f_lazy import lazy
+
+st = lazy("streamlit")  # only render_bulk_analyze needs it; analyze_frame stays importable headless
+
+# Column aliases accepted from list-stacking / skip-trace exports
+COLUMN_ALIASES = {
+    "address": ["address", "property_address", "street", "site_address"],
+    "arv": ["arv", "after_repair_value", "est_value", "estimated_value", "value"],
+    "rehab": ["rehab", "rehab_cost", "repairs", "rehab_estimate"],
+    "condition_score": ["condition_score", "condition_rating"],
+    "mao_70": ["mao_70"],
+}
+
+
+def _standardize(df: pd.DataFrame) -> pd.DataFrame:
+    cols = {c.lower().strip(): c for c in df.columns}
+    std = pd.DataFrame(index=df.index)
+    for dst, aliases in COLUMN_ALIASES.items():
+        for a in aliases:
+            if a in cols: std[dst] = df[cols[a]]; break
+    return std
+
+
+def _num(std: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in std: return np.full(len(std), np.nan)
+    return pd.to_numeric(std[col], errors="coerce").to_numpy(dtype="float64")
+
+
+def _round2(a: np.ndarray) -> np.ndarray:
+    # Python's round() (correctly rounded on the exact double), as analyze_property does; np.round scales by 100
+    # first and can land on the other side of a half-cent
+    return np.array([round(v, 2) for v in a.tolist()], dtype="float64")
+
+
+def analyze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized `analyze_property` + `calculate_grade` over every row of `df`.
+
+    Adds mao70, mao75, profit_est and grade (70%-rule anchors from app.py) plus
+    score, deal_grade and strategy (DealGradingEngine). The random `confidence`
+    jitter of `calculate_grade` is not reproduced.
+    """
+    std = _standardize(df)
+    arv = _num(std, "arv")
+    # analyze_property: `float(arv) if arv else default` — NaN and 0 both fall back, to the sample's value
+    # for the sample address
+    default = np.full(len(std), DEFAULT_ARV)
+    if "address" in std:
+        sample = std["address"].astype("string").str.strip().str.lower().eq(SAMPLE_ADDR.lower())
+        default[sample.fillna(False).to_numpy(dtype=bool)] = SAMPLE_DATA["est_value"]
+    arv = np.where(np.isnan(arv) | (arv == 0), default, arv)
+    rehab = np.nan_to_num(_num(std, "rehab"), nan=0.0)
+
+    mao70 = 0.70 * arv - rehab
+    mao75 = 0.75 * arv - rehab
+    profit = np.maximum(0, mao75 - mao70)
+    ratio = mao70 / arv
+    grade = np.select([ratio >= 0.60, ratio >= 0.55, ratio >= 0.50], ["A", "B", "C"], "D")
+
+    # DealGradingEngine works off the clamped integer MAO from _generate_property_data
+    m70 = _num(std, "mao_70")
+    m70 = np.where(np.isnan(m70), np.maximum(0, np.trunc(mao70)), m70)
+    cond = np.nan_to_num(_num(std, "condition_score"), nan=0.0)
+    margin = (arv - m70) / arv * 100
+    score = 50 + np.select([margin >= 35, margin >= 25, margin >= 20, margin >= 15], [40, 30, 20, 10], 0)
+    score = score + np.select([cond >= 80, cond >= 60], [10, 5], 0)
+    score = np.minimum(100, score)
+    passed = m70 <= 0
+    score = np.where(passed, 0, score)
+    deal_grade = np.select([passed, score >= 85, score >= 70, score >= 55], ["D", "A", "B", "C"], "D")
+    strategy = pd.Series(deal_grade).map(GRADE_STRATEGIES).to_numpy(dtype=object)
+    strategy[passed] = PASS_STRATEGY
+
+    out = df.copy()
+    out["arv"] = arv
+    out["rehab"] = rehab
+    out["mao70"] = _round2(mao70)
+    out["mao75"] = _round2(mao75)
+    out["profit_est"] = _round2(profit)
+    out["grade"] = grade
+    out["score"] = score.astype("int64")
+    out["deal_grade"] = deal_grade
+    out["strategy"] = strategy
+    return out
+
+
+def read_properties(path: Union[str, Path]) -> pd.DataFrame:
+    p = Path(path)
+    if p.suffix.lower() in (".parquet", ".pq"): return pd.read_parquet(p)
+    return pd.read_csv(p)
+
+
+def analyze_file(path: Union[str, Path], out_path: Union[str, Path, None] = None) -> pd.DataFrame:
+    """Headless entry point: analyze a CSV/Parquet lead list, optionally writing the result."""
+    res = analyze_frame(read_properties(path))
+    if out_path:
+        out = Path(out_path)
+        if out.suffix.lower() in (".parquet", ".pq"): res.to_parquet(out, index=False)
+        else: res.to_csv(out, index=False)
+    return res
+
+
+def render_bulk_analyze():
+    st.subheader("Bulk Analyze")
+    st.caption("Upload a lead list (CSV or Parquet) with at least an ARV column; rehab and condition_score are optional.")
+    up = st.file_uploader("Lead list", type=["csv", "parquet"], key="bulk_analyze_upload")
+    if up is None: return
+    df = pd.read_parquet(up) if up.name.lower().endswith(".parquet") else pd.read_csv(up)
+    res = analyze_frame(df)
+    st.session_state.bulk_analysis = res
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Properties", f"{len(res):,}")
+    c2.metric("Grade A", f"{int((res['grade'] == 'A').sum()):,}")
+    c3.metric("Grade B", f"{int((res['grade'] == 'B').sum()):,}")
+    c4.metric("Avg MAO 70%", f"${res['mao70'].mean():,.0f}" if len(res) else "$0")
+    st.dataframe(res.head(1000), use_container_width=True)
+    st.download_button("Download results (.csv)", res.to_csv(index=False), file_name="bulk_analysis.csv")
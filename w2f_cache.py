@@ -0,0 +1,214 @@
+"""
+WTF (Wholesale2Flip) — Shared Caches
+- `TTLCache`: thread-safe in-memory LRU with max size, per-entry TTL and hit/miss counters; `get_or_load` is
+  single-flight, so concurrent sessions missing the same key share one load instead of each calling the vendor
+- `SqliteCacheTier`: optional persistent second tier (survives restarts, shared across processes)
+- `get_property_cache()`: process-wide property lookup cache shared by every browser session
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_TTL = 24 * 3600.0  # seconds a property lookup stays fresh after its `last_updated`
+
+
+def stamp_from_last_updated(value: Any) -> float:
+    """Epoch seconds from a lookup dict's `last_updated` ('%Y-%m-%d %H:%M:%S'); now if absent/unparseable."""
+    lu = value.get("last_updated") if isinstance(value, dict) else None
+    if lu:
+        try: return datetime.strptime(str(lu), "%Y-%m-%d %H:%M:%S").timestamp()
+        except ValueError: pass
+    return time.time()
+
+
+def _json_default(o):
+    return o.item() if hasattr(o, "item") else str(o)  # numpy scalars from the generators
+
+
+class SqliteCacheTier:
+    """Key/value tier stored in SQLite. Values are JSON; `stamp` is the freshness timestamp."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cache_entries (key TEXT PRIMARY KEY, value TEXT, stamp REAL)")
+        self._conn.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value, stamp FROM cache_entries WHERE key=?", (key,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def set(self, key: str, value: Any, stamp: float):
+        payload = json.dumps(value, default=_json_default)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO cache_entries (key, value, stamp) VALUES (?,?,?)", (key, payload, stamp))
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE key=?", (key,)); self._conn.commit()
+
+    def purge_older_than(self, cutoff: float) -> int:
+        with self._lock:
+            n = self._conn.execute("DELETE FROM cache_entries WHERE stamp < ?", (cutoff,)).rowcount
+            self._conn.commit()
+        return n
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries"); self._conn.commit()
+
+
+class TTLCache:
+    """Thread-safe LRU cache. `ttl=None` disables expiry; `stamp_fn(value)` sets an entry's age origin
+    (defaults to insert time). An optional `tier` is read through on miss and written through on set."""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, ttl: Optional[float] = DEFAULT_TTL,
+                 stamp_fn: Optional[Callable[[Any], float]] = None, tier: Optional[SqliteCacheTier] = None):
+        self.max_size = max(1, int(max_size))
+        self.ttl = ttl
+        self.stamp_fn = stamp_fn
+        self.tier = tier
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.RLock()
+        self.hits = self.misses = self.evictions = self.expirations = self.tier_hits = self.coalesced = 0
+
+    def _fresh(self, stamp: float) -> bool:
+        return self.ttl is None or (time.time() - stamp) <= self.ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, stamp = item
+                if self._fresh(stamp):
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+        if self.tier is not None:
+            row = self.tier.get(str(key))
+            if row is not None and self._fresh(row[1]):
+                with self._lock:
+                    self._store(key, row[0], row[1])
+                    self.hits += 1; self.tier_hits += 1
+                return row[0]
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self._fresh(item[1]): return True
+        if self.tier is not None:
+            row = self.tier.get(str(key))
+            return row is not None and self._fresh(row[1])
+        return False
+
+    def _store(self, key, value, stamp):
+        self._data[key] = (value, stamp)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key: Hashable, value: Any):
+        stamp = self.stamp_fn(value) if self.stamp_fn else time.time()
+        with self._lock:
+            self._store(key, value, stamp)
+        if self.tier is not None: self.tier.set(str(key), value, stamp)
+
+    def get_or_load(self, keys: Sequence[Hashable], load: Callable[[List[Hashable]], Sequence[Any]],
+                    store: Optional[Callable[[Any], bool]] = None) -> List[Any]:
+        """Values for `keys` in order. Misses go to one `load(missing_keys)` call (values in the same order) and
+        are cached when `store(value)` allows. A key another thread is already loading is waited on instead of
+        loaded again; if that load raises, every waiter gets the error."""
+        results: Dict[Hashable, Any] = {}
+        mine: Dict[Hashable, Future] = {}
+        waits: Dict[Hashable, Future] = {}
+        for k in dict.fromkeys(keys):
+            value = self.get(k)
+            if value is not None:
+                results[k] = value; continue
+            with self._lock:
+                item = self._data.get(k)  # a load may have finished since the miss above
+                if item is not None and self._fresh(item[1]):
+                    results[k] = item[0]
+                elif k in self._inflight:
+                    waits[k] = self._inflight[k]; self.coalesced += 1
+                else:
+                    mine[k] = self._inflight[k] = Future()
+        if mine:
+            try:
+                values = list(load(list(mine)))
+                if len(values) != len(mine): raise ValueError(f"load returned {len(values)} values for {len(mine)} keys")
+                for (k, fut), value in zip(mine.items(), values):
+                    if store is None or store(value): self.set(k, value)
+                    results[k] = value
+                    fut.set_result(value)
+            except BaseException as e:
+                for fut in mine.values():
+                    if not fut.done(): fut.set_exception(e)
+                raise
+            finally:
+                with self._lock:
+                    for k in mine: self._inflight.pop(k, None)
+        for k, fut in waits.items():
+            results[k] = fut.result()
+        return [results[k] for k in keys]
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+        if self.tier is not None: self.tier.delete(str(key))
+        return item[0] if item else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+        if self.tier is not None: self.tier.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"size": len(self._data), "max_size": self.max_size, "ttl": self.ttl,
+                    "hits": self.hits, "misses": self.misses, "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                    "evictions": self.evictions, "expirations": self.expirations, "tier_hits": self.tier_hits,
+                    "coalesced": self.coalesced}
+
+
+_property_cache: Optional[TTLCache] = None
+_property_cache_lock = threading.Lock()
+
+
+def get_property_cache() -> TTLCache:
+    """Process-wide property lookup cache. Configure with WTF_LOOKUP_CACHE_SIZE, WTF_LOOKUP_CACHE_TTL
+    (seconds) and WTF_LOOKUP_CACHE_DB (path to enable the SQLite tier)."""
+    global _property_cache
+    if _property_cache is None:
+        with _property_cache_lock:
+            if _property_cache is None:
+                db_path = os.environ.get("WTF_LOOKUP_CACHE_DB")
+                _property_cache = TTLCache(
+                    max_size=int(os.environ.get("WTF_LOOKUP_CACHE_SIZE", DEFAULT_MAX_SIZE)),
+                    ttl=float(os.environ.get("WTF_LOOKUP_CACHE_TTL", DEFAULT_TTL)),
+                    stamp_fn=stamp_from_last_updated,
+                    tier=SqliteCacheTier(db_path) if db_path else None,
+                )
+    return _property_cache
@@ -0,0 +1,158 @@
+"""
+WTF (Wholesale2Flip) — Deal Calculators
+- Pure calculators shared by the apps: `brrrr_calc` / `subto_calc` (wtf_app.py), `analyze_property` (app.py) and
+  `calculate_grade` (streamlit_app_main.py's DealGradingEngine); no Streamlit import, safe to import anywhere
+- `memoize`: process-wide LRU per calculator, keyed on normalized inputs (floats to `SIG_DIGITS` significant
+  digits, numpy scalars unwrapped, strings stripped); `memo_stats()` exports hits / misses / hit rate
+"""
+import functools
+import os
+from typing import Any, Dict
+
+import numpy as np
+
+from w2f_cache import TTLCache
+from w2f_finance import brrrr_grid, subto_grid
+
+MEMO_SIZE = int(os.environ.get("WTF_CALC_CACHE_SIZE", 4096))
+SIG_DIGITS = 10  # enough for cents on any price while absorbing float noise (0.1 + 0.2)
+
+DEFAULT_ARV = 200000.0  # analyze_property fallback when no ARV is supplied
+GRADE_STRATEGIES = {
+    "A": "Excellent deal - Multiple strategies viable",
+    "B": "Good deal - Fix & flip or wholesale",
+    "C": "Marginal deal - Wholesale only",
+    "D": "Pass - Insufficient margins",
+}
+PASS_STRATEGY = "Pass on this deal"
+
+SAMPLE_ADDR = "21372 W Memorial Dr, Porter, TX 77365"
+SAMPLE_DATA = {
+    "address": SAMPLE_ADDR,
+    "owner": "EDGAR LORI G",
+    "est_value": 267000,
+    "sqft": 1643,
+    "beds": 3,
+    "baths": 2,
+    "year_built": 1969,
+    "lot_sqft": 24300,
+    "rent": 1973,
+    "mortgage_balance": 27986,
+    "equity": 239014,
+    "taxes": 1497,
+    "condition": "Good",
+    "market_price_change": 0.0437,
+    "market_rent_change": 0.0169,
+    "state": "TX", "city": "Porter", "type": "SFR"
+}
+
+_memos: Dict[str, TTLCache] = {}
+
+
+def normalize(value: Any) -> Any:
+    """Hashable, rounding-stable form of a calculator argument."""
+    if isinstance(value, (bool, np.bool_)): return bool(value)
+    if isinstance(value, (int, np.integer)): return float(value)  # 1 and 1.0 share an entry
+    if isinstance(value, (float, np.floating)):
+        v = float(value)
+        return v if v != v else float(f"{v:.{SIG_DIGITS}g}")
+    if isinstance(value, str): return value.strip()
+    if isinstance(value, dict): return tuple(sorted((str(k), normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)): return tuple(normalize(v) for v in value)
+    return value
+
+
+def memoize(name: str, max_size: int = MEMO_SIZE):
+    """Cache a pure function's results in a bounded LRU registered as `name`, keyed on its normalized arguments.
+    Dict results are returned as copies so callers may mutate them."""
+    cache = _memos.setdefault(name, TTLCache(max_size=max_size, ttl=None))
+
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            k = (normalize(args), normalize(kwargs))
+            value = cache.get(k)
+            if value is None:
+                value = fn(*args, **kwargs)
+                cache.set(k, value)
+            return dict(value) if isinstance(value, dict) else value
+        inner.cache = cache
+        return inner
+    return wrap
+
+
+def memo_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _memos.items()}
+
+
+def clear_memos():
+    for cache in _memos.values(): cache.clear()
+
+
+def _scalars(r: Dict) -> Dict[str, float]:
+    return {k: float(v) for k, v in r.items()}
+
+
+@memoize("brrrr_calc")
+def brrrr_calc(purchase, rehab, arv, ltv=0.75, closing_costs=6000, rate=0.07, rent=0, taxes=0, ins=0, mgmt=0.08, maint=0.05):
+    return _scalars(brrrr_grid(purchase, rehab, arv, ltv, closing_costs, rate, rent, taxes, ins, mgmt, maint))
+
+
+@memoize("subto_calc")
+def subto_calc(arv, balance, existing_rate, piti, arrears=0, down=10000, assign_fee=0, wrap_rate=0.085, exit_rent=0):
+    return _scalars(subto_grid(arv, balance, existing_rate, piti, arrears, down, assign_fee, wrap_rate, exit_rent))
+
+
+@memoize("analyze_property")
+def analyze_property(addr: str, arv: float = None, rehab: float = 0.0):
+    # If matches sample, load it; else create a basic record using inputs
+    base = SAMPLE_DATA.copy() if addr.strip().lower() == SAMPLE_ADDR.lower() else {
+        "address": addr.strip(),
+        "owner": "Unknown",
+        "est_value": float(arv) if arv else DEFAULT_ARV,
+        "sqft": None, "beds": None, "baths": None, "year_built": None, "lot_sqft": None,
+        "rent": None, "mortgage_balance": None, "equity": None, "taxes": None,
+        "condition": "Unknown",
+        "market_price_change": 0.02, "market_rent_change": 0.01,
+        "state": "TX", "city": "", "type": "SFR"
+    }
+    est_arv = float(arv) if arv else base["est_value"]
+    mao70 = 0.70 * est_arv - float(rehab or 0)
+    mao75 = 0.75 * est_arv - float(rehab or 0)
+    # simple profit calc assuming buyer pays mao70 and rehab occurs
+    profit_wholesale = max(0, (mao75 - mao70))  # spread between 70/75 anchors
+    grade = "A" if mao70/est_arv >= 0.60 else ("B" if mao70/est_arv >= 0.55 else ("C" if mao70/est_arv >= 0.50 else "D"))
+    base.update({
+        "arv": est_arv, "rehab": float(rehab or 0),
+        "mao70": round(mao70, 2), "mao75": round(mao75, 2),
+        "profit_est": round(profit_wholesale, 2), "grade": grade
+    })
+    return base
+
+
+@memoize("calculate_grade")
+def _grade(arv, mao_70, condition_score):
+    if mao_70 <= 0:
+        return {'grade': 'D', 'score': 0, 'strategy': PASS_STRATEGY}
+
+    profit_margin = ((arv - mao_70) / arv) * 100
+    score = 50  # Base score
+
+    # Profit margin scoring
+    if profit_margin >= 35: score += 40
+    elif profit_margin >= 25: score += 30
+    elif profit_margin >= 20: score += 20
+    elif profit_margin >= 15: score += 10
+
+    # Condition scoring
+    if condition_score >= 80: score += 10
+    elif condition_score >= 60: score += 5
+
+    score = min(100, score)
+    grade = 'A' if score >= 85 else 'B' if score >= 70 else 'C' if score >= 55 else 'D'
+    return {'grade': grade, 'score': score, 'strategy': GRADE_STRATEGIES[grade]}
+
+
+def calculate_grade(property_data: Dict) -> Dict:
+    """Deal grade A-D from `arv`, `mao_70` and `condition_score` (other keys do not affect the cache entry)."""
+    return _grade(property_data['arv'], property_data['mao_70'], property_data['condition_score'])
@@ -0,0 +1,156 @@
+"""
+WTF (Wholesale2Flip) — Deterministic Property Data Generator
+- Same address in => same property out: seeded from a stable hash of the normalized address
+- Uses a local `np.random.Generator` (never the global `np.random` state)
+- Bulk mode: `generate_properties(n, seed)` synthesizes N properties as arrays for load/regression tests
+"""
+import hashlib
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+MARKET_DATA = {
+    'tx': {
+        'dallas': {'median_price': 425000, 'rent_psf': 1.2, 'appreciation': 0.045, 'tax_rate': 0.022},
+        'houston': {'median_price': 380000, 'rent_psf': 1.1, 'appreciation': 0.042, 'tax_rate': 0.021},
+        'austin': {'median_price': 550000, 'rent_psf': 1.4, 'appreciation': 0.055, 'tax_rate': 0.019},
+        'porter': {'median_price': 285000, 'rent_psf': 1.15, 'appreciation': 0.041, 'tax_rate': 0.022}
+    },
+    'ca': {
+        'los angeles': {'median_price': 950000, 'rent_psf': 2.8, 'appreciation': 0.065, 'tax_rate': 0.015}
+    },
+    'fl': {
+        'miami': {'median_price': 485000, 'rent_psf': 1.8, 'appreciation': 0.055, 'tax_rate': 0.018}
+    }
+}
+DEFAULT_MARKET = {'median_price': 350000, 'rent_psf': 1.2, 'appreciation': 0.045, 'tax_rate': 0.022}
+
+BATHROOMS = np.array([1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0])
+CONDITIONS = np.array(['excellent', 'good', 'fair', 'poor'])
+REHAB_MULT = np.array([0.02, 0.05, 0.12, 0.25])   # per CONDITIONS
+RENT_MULT = np.array([1.2, 1.0, 0.85, 0.7])       # per CONDITIONS
+FIRST_NAMES = np.array(['Michael', 'Sarah', 'David', 'Maria'])
+LAST_NAMES = np.array(['Rodriguez', 'Johnson', 'Wilson', 'Garcia'])
+AREA_CODES = np.array(['214', '713', '512'])
+MOTIVATIONS = np.array(['Divorce', 'Foreclosure', 'Job Relocation', 'Inheritance', 'Financial Hardship'])
+STREETS = np.array(['Memorial', 'Oak', 'Elm', 'Main', 'Cedar', 'Pecan', 'Willow', 'Magnolia', 'Live Oak', 'Bluebonnet'])
+SUFFIXES = np.array(['Dr', 'Ave', 'St', 'Ln', 'Ct', 'Blvd'])
+REFERENCE_YEAR = 2024
+
+
+def normalize_address(address: str, city: str, state: str) -> str:
+    parts = (" ".join(str(x).lower().replace(".", "").replace(",", " ").split()) for x in (address, city, state))
+    return ", ".join(parts)
+
+
+def address_seed(address: str, city: str, state: str, salt: int = 0) -> int:
+    """Stable 64-bit seed (unlike `hash()`, identical across processes and runs)."""
+    digest = hashlib.blake2b(f"{salt}|{normalize_address(address, city, state)}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def market_for(city: str, state: str) -> Dict:
+    return MARKET_DATA.get(state.lower(), {}).get(city.lower().replace(',', '').strip()) or DEFAULT_MARKET
+
+
+def _synthesize(rng: np.random.Generator, median_price: np.ndarray, rent_psf: np.ndarray) -> Dict[str, np.ndarray]:
+    """Core draw shared by the single-address and bulk paths; every array has len(median_price) rows."""
+    n = len(median_price)
+    square_feet = rng.integers(1200, 4500, n)
+    bedrooms = rng.integers(2, 6, n)
+    bathrooms = rng.choice(BATHROOMS, n)
+    year_built = rng.integers(1970, 2023, n)
+
+    list_price = (median_price * rng.uniform(0.7, 1.4, n)).astype(np.int64)
+    arv = (list_price * rng.uniform(1.05, 1.25, n)).astype(np.int64)
+
+    # Condition by age bucket: <10y excellent/good (80/20), <30y good/fair (60/40), else fair/poor (70/30)
+    age = REFERENCE_YEAR - year_built
+    u = rng.random(n)
+    cond_idx = np.select([age < 10, age < 30], [np.where(u < 0.8, 0, 1), np.where(u < 0.6, 1, 2)], np.where(u < 0.7, 2, 3))
+    lo = np.select([age < 10, age < 30], [85, 65], 45)
+    hi = np.select([age < 10, age < 30], [100, 85], 75)
+    condition_score = rng.integers(lo, hi)
+
+    rehab_cost = (square_feet * 25 * REHAB_MULT[cond_idx]).astype(np.int64)
+    mao_70 = np.maximum(0, np.trunc(arv * 0.70 - rehab_cost)).astype(np.int64)
+    mao_75 = np.maximum(0, np.trunc(arv * 0.75 - rehab_cost)).astype(np.int64)
+    monthly_rent = (square_feet * rent_psf * RENT_MULT[cond_idx]).astype(np.int64)
+
+    return {
+        'list_price': list_price, 'arv': arv, 'square_feet': square_feet, 'bedrooms': bedrooms,
+        'bathrooms': bathrooms, 'year_built': year_built, 'condition': CONDITIONS[cond_idx],
+        'condition_score': condition_score, 'rehab_cost': rehab_cost, 'mao_70': mao_70, 'mao_75': mao_75,
+        'monthly_rent': monthly_rent,
+        'owner_first': rng.choice(FIRST_NAMES, n), 'owner_last': rng.choice(LAST_NAMES, n),
+        'owner_area_code': rng.choice(AREA_CODES, n), 'owner_prefix': rng.integers(100, 999, n),
+        'owner_line': rng.integers(1000, 9999, n), 'ownership_length': rng.integers(2, 25, n),
+        'motivation': rng.choice(MOTIVATIONS, n), 'motivation_score': rng.integers(60, 95, n),
+    }
+
+
+def generate_property(address: str, city: str, state: str, seed: Optional[int] = None,
+                      as_of: Optional[datetime] = None) -> Dict:
+    """Single lookup-shaped record (see `ProfessionalPropertyDataService`); deterministic per address."""
+    rng = np.random.default_rng(address_seed(address, city, state) if seed is None else seed)
+    m = market_for(city, state)
+    d = {k: v[0].item() for k, v in _synthesize(rng, np.array([m['median_price']]), np.array([m['rent_psf']])).items()}
+    return {
+        'found': True,
+        'address': address,
+        'city': city,
+        'state': state,
+        'list_price': d['list_price'],
+        'arv': d['arv'],
+        'square_feet': d['square_feet'],
+        'bedrooms': d['bedrooms'],
+        'bathrooms': d['bathrooms'],
+        'year_built': d['year_built'],
+        'condition': d['condition'],
+        'condition_score': d['condition_score'],
+        'rehab_cost': d['rehab_cost'],
+        'mao_70': d['mao_70'],
+        'mao_75': d['mao_75'],
+        'monthly_rent': d['monthly_rent'],
+        'owner_data': {
+            'name': f"{d['owner_first']} {d['owner_last']}",
+            'phone': f"({d['owner_area_code']}) {d['owner_prefix']}-{d['owner_line']}",
+            'ownership_length': d['ownership_length'],
+            'motivation': d['motivation'],
+            'motivation_score': d['motivation_score']
+        },
+        'data_confidence': 95,
+        'last_updated': (as_of or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def generate_properties(n: int, seed: int = 0) -> pd.DataFrame:
+    """Bulk mode: N synthetic properties across MARKET_DATA (plus the default market) as one flat frame.
+    Same (n, seed) always yields the same frame; columns feed straight into `w2f_analysis.analyze_frame`."""
+    rng = np.random.default_rng(seed)
+    markets = [(s, c, m) for s, cities in MARKET_DATA.items() for c, m in cities.items()] + [('tx', 'other', DEFAULT_MARKET)]
+    mi = rng.integers(0, len(markets), n)
+    states = np.array([s.upper() for s, _, _ in markets])[mi]
+    cities = np.array([c.title() for _, c, _ in markets])[mi]
+    median = np.array([m['median_price'] for _, _, m in markets], dtype="float64")[mi]
+    rent_psf = np.array([m['rent_psf'] for _, _, m in markets])[mi]
+
+    street_no = rng.integers(100, 99999, n)
+    street = rng.choice(STREETS, n)
+    suffix = rng.choice(SUFFIXES, n)
+    d = _synthesize(rng, median, rent_psf)
+
+    df = pd.DataFrame({
+        'address': [f"{a} {b} {c}" for a, b, c in zip(street_no.tolist(), street.tolist(), suffix.tolist())],
+        'city': cities, 'state': states,
+    })
+    for k in ('list_price', 'arv', 'square_feet', 'bedrooms', 'bathrooms', 'year_built', 'condition',
+              'condition_score', 'rehab_cost', 'mao_70', 'mao_75', 'monthly_rent', 'ownership_length',
+              'motivation', 'motivation_score'):
+        df[k] = d[k]
+    df['owner_name'] = [f"{a} {b}" for a, b in zip(d['owner_first'].tolist(), d['owner_last'].tolist())]
+    df['owner_phone'] = [f"({a}) {b}-{c}" for a, b, c in
+                         zip(d['owner_area_code'].tolist(), d['owner_prefix'].tolist(), d['owner_line'].tolist())]
+    return df
@@ -1 +1,210 @@
-# Placeholder for w2f_db.py
+"""
+WTF (Wholesale2Flip) — SQLite Access Layer
+- `ConnectionPool`: process-wide pool of tuned connections (WAL, synchronous=NORMAL, cache/mmap pragmas,
+  busy timeout, per-connection prepared-statement cache) shared by every session thread
+- `pool.connection()`: context manager — commit on success, rollback on error, connection back to the pool
+- `Repository`: small query helpers (`df`, `scalar`, `execute`, `executemany`) on top of the pool
+- Instrumentation: connections opened and statements run, process-wide and per rerun (`begin_rerun` / `rerun_stats`)
+- Per-table write versions (`pool.table_versions`) for cache invalidation: tables written by INSERT/UPDATE/DELETE are
+  recorded per connection and bumped only once the transaction commits (dropped on rollback), so a reader never
+  caches pre-commit data under the new version
+"""
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-20000",      # ~20 MB page cache per connection
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",    # 256 MB memory-mapped reads
+    "PRAGMA foreign_keys=ON",
+)
+DEFAULT_POOL_SIZE = int(os.environ.get("WTF_DB_POOL_SIZE", 8))
+BUSY_TIMEOUT = float(os.environ.get("WTF_DB_BUSY_TIMEOUT", 10.0))
+STATEMENT_CACHE = 256  # sqlite3 keeps this many compiled statements per connection
+
+_local = threading.local()  # per-thread (= per Streamlit script run) counters
+_WRITE_RE = re.compile(r"\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+[\"`\[]?(\w+)", re.I)
+
+
+@lru_cache(maxsize=4096)
+def _written_table(prefix: str) -> Optional[str]:
+    # The trace callback sees expanded SQL (one call per executemany row); the table name is always in the prefix
+    m = _WRITE_RE.match(prefix)
+    return m.group(1).lower() if m else None
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection that publishes the tables it wrote to its pool's versions when it commits."""
+    pool: "ConnectionPool" = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.written: set = set()
+
+    def commit(self):
+        super().commit()
+        self.pool.publish(self)
+
+    def rollback(self):
+        super().rollback()
+        self.written.clear()
+
+
+class ConnectionPool:
+    def __init__(self, path: str, size: int = DEFAULT_POOL_SIZE):
+        self.path = path
+        self.size = max(1, size)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.opened = self.closed = self.checkouts = self.statements = 0
+        self._versions: Dict[str, int] = {}
+
+    def _trace(self, conn: PooledConnection, sql):
+        self.statements += 1
+        _local.statements = getattr(_local, "statements", 0) + 1
+        if sql[:1] in "IiUuDdRr \n":
+            table = _written_table(sql[:96])
+            if table: conn.written.add(table)
+
+    def publish(self, conn: PooledConnection):
+        """Bump the versions of the tables `conn` wrote since its last commit (called after a commit)."""
+        if conn.written:
+            tables, conn.written = conn.written, set()
+            self.bump(*tables)
+
+    def bump(self, *tables: str):
+        """Mark `tables` as written. Pooled connections do this on commit; call it after writing by other means.
+        Under the lock: two writers must move a version twice, or a reader that cached between them keeps serving
+        stale data under the final version."""
+        with self._lock:
+            for t in tables:
+                t = t.lower()
+                self._versions[t] = self._versions.get(t, 0) + 1
+
+    def table_versions(self, *tables: str) -> tuple:
+        return tuple(self._versions.get(t.lower(), 0) for t in tables)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE, factory=PooledConnection)
+        conn.pool = self
+        for p in PRAGMAS: conn.execute(p)
+        conn.set_trace_callback(lambda sql: self._trace(conn, sql))
+        with self._lock: self.opened += 1
+        _local.opened = getattr(_local, "opened", 0) + 1
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try: conn = self._idle.get_nowait()
+        except queue.Empty: conn = self._open()
+        with self._lock: self.checkouts += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        if self._idle.qsize() < self.size:
+            self._idle.put(conn)
+        else:
+            conn.close()
+            with self._lock: self.closed += 1
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+            if conn.in_transaction: conn.commit()
+            else: self.publish(conn)  # committed outside commit(), e.g. by an autocommit statement
+        except BaseException:
+            if conn.in_transaction: conn.rollback()
+            conn.written.clear()
+            raise
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        while True:
+            try: self._idle.get_nowait().close()
+            except queue.Empty: break
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "idle": self._idle.qsize(), "opened": self.opened, "closed": self.closed,
+                "checkouts": self.checkouts, "statements": self.statements}
+
+
+class Repository:
+    """Query helpers over a pool. Every call runs on its own pooled connection unless `conn` is given."""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    @contextmanager
+    def _conn(self, conn=None):
+        if conn is not None: yield conn
+        else:
+            with self.pool.connection() as c: yield c
+
+    def df(self, sql: str, params: Sequence = (), conn=None):
+        import pandas as pd
+        with self._conn(conn) as c:
+            return pd.read_sql_query(sql, c, params=tuple(params))
+
+    def rows(self, sql: str, params: Sequence = (), conn=None):
+        with self._conn(conn) as c:
+            return c.execute(sql, tuple(params)).fetchall()
+
+    def scalar(self, sql: str, params: Sequence = (), conn=None):
+        with self._conn(conn) as c:
+            row = c.execute(sql, tuple(params)).fetchone()
+        return row[0] if row else None
+
+    def execute(self, sql: str, params: Sequence = (), conn=None) -> int:
+        with self._conn(conn) as c:
+            return c.execute(sql, tuple(params)).rowcount
+
+    def executemany(self, sql: str, seq: Iterable[Sequence], conn=None) -> int:
+        with self._conn(conn) as c:
+            return c.executemany(sql, seq).rowcount
+
+    def transaction(self):
+        """`with repo.transaction() as conn:` — several statements, one commit."""
+        return self.pool.connection()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path: str, size: Optional[int] = None) -> ConnectionPool:
+    """Process-wide pool per database file (lives in this module, so it survives Streamlit reruns)."""
+    key = os.path.abspath(path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(path, size or DEFAULT_POOL_SIZE)
+    return pool
+
+
+def get_repository(path: str) -> Repository:
+    return Repository(get_pool(path))
+
+
+def begin_rerun():
+    """Reset this thread's counters; call at the top of each script run."""
+    _local.opened = 0; _local.statements = 0; _local.started = time.perf_counter()
+
+
+def rerun_stats() -> Dict[str, Any]:
+    started = getattr(_local, "started", None)
+    return {"connections_opened": getattr(_local, "opened", 0), "statements": getattr(_local, "statements", 0),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1) if started else None}
@@ -0,0 +1,161 @@
+"""
+WTF (Wholesale2Flip) — Buyer Deduplication
+- One buyer per normalized key: email, else last 10 phone digits, else name (`buyer_key`); the row id is a hash of
+  the key, so every import path lands on the same row
+- Every key a buyer was seen with (email and phone, or name when it had neither) is recorded in `buyer_keys`;
+  `resolve_buyers` points incoming rows at the buyer holding any of their keys, so a buyer first imported with only
+  a phone and later with email + phone is merged, not duplicated
+- `content_hash` over the normalized fields lets imports skip unchanged rows before writing (`skip_unchanged`)
+- Changed rows are merged, not overwritten: blank incoming fields keep the stored value, flags are sticky (`BUYER_MERGE`)
+- `compact_buyers`: one-time pass that folds existing duplicates (random uuid ids) into one row per key and
+  re-points deals.buyer_id; runs as a migration before the unique index on `dedupe_key` is created
+"""
+import json
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from w2f_migrations import sync_buyer_areas
+
+TEXT_FIELDS = ["name", "email", "phone"]
+LIST_FIELDS = ["property_types", "states", "cities", "deal_types"]
+PRICE_FIELDS = ["min_price", "max_price", "cash_available"]
+FLAG_FIELDS = ["verified", "proof_of_funds"]
+HASHED_FIELDS = TEXT_FIELDS + LIST_FIELDS + PRICE_FIELDS + FLAG_FIELDS
+
+BUYER_MERGE = "DO UPDATE SET " + ", ".join(
+    [f"{c}=COALESCE(NULLIF(excluded.{c}, ''), buyers.{c})" for c in TEXT_FIELDS + LIST_FIELDS]
+    + [f"{c}=CASE WHEN excluded.{c} > 0 THEN excluded.{c} ELSE buyers.{c} END" for c in PRICE_FIELDS]
+    + [f"{c}=MAX(excluded.{c}, COALESCE(buyers.{c}, 0))" for c in FLAG_FIELDS]
+    + ["dedupe_key=excluded.dedupe_key", "content_hash=excluded.content_hash"])
+
+
+KEY_RANK = {"e": 0, "p": 1, "n": 2, "i": 3}  # key classes, strongest first
+
+
+def _key_parts(std: pd.DataFrame) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    email = std["email"].str.strip().str.lower()
+    phone = std["phone"].str.replace(r"\D", "", regex=True).str[-10:]
+    name = std["name"].str.strip().str.lower().str.replace(r"\s+", " ", regex=True)
+    fallback = ("n:" + name).where(name != "", "i:" + std["id"].astype(str))  # nothing to match on: keep the row
+    return email, phone, fallback
+
+
+def buyer_key(std: pd.DataFrame) -> pd.Series:
+    email, phone, fallback = _key_parts(std)
+    return ("e:" + email).where(email != "", ("p:" + phone).where(phone != "", fallback))
+
+
+def buyer_keys(std: pd.DataFrame) -> List[List[str]]:
+    """All match keys per row, strongest first: email and phone when present, else the name (a name alone is too
+    ambiguous to merge a buyer that also has an email or phone)."""
+    email, phone, fallback = _key_parts(std)
+    return [[k for k in (e and "e:" + e, p and "p:" + p) if k] or [f]
+            for e, p, f in zip(email.tolist(), phone.tolist(), fallback.tolist())]
+
+
+def resolve_buyers(conn, std: pd.DataFrame) -> pd.DataFrame:
+    """Point each row (ids + dedupe_key set) at the stored buyer, or earlier row of `std`, that holds any of its
+    keys; the email wins over the phone when they point at different buyers. Rows of one buyer share its strongest
+    dedupe_key."""
+    if std.empty: return std
+    keys = buyer_keys(std)
+    owner = dict(conn.execute("SELECT key, buyer_id FROM buyer_keys WHERE key IN (SELECT value FROM json_each(?))",
+                              (json.dumps(sorted({k for ks in keys for k in ks})),)).fetchall())
+    best = dict(conn.execute("SELECT id, dedupe_key FROM buyers WHERE id IN (SELECT value FROM json_each(?))",
+                             (json.dumps(sorted(set(owner.values()))),)).fetchall()) if owner else {}
+    ids = []
+    for ks, own_id, own_key in zip(keys, std["id"].tolist(), std["dedupe_key"].tolist()):
+        bid = next((owner[k] for k in ks if k in owner), own_id)
+        for k in ks: owner.setdefault(k, bid)
+        if bid not in best or KEY_RANK[own_key[0]] < KEY_RANK[best[bid][0]]: best[bid] = own_key
+        ids.append(bid)
+    std = std.assign(id=ids)
+    std["dedupe_key"] = std["id"].map(best)
+    return std
+
+
+def record_keys(conn, std: pd.DataFrame):
+    """Remember every key of the written rows (first owner keeps a key) — call after writing buyers."""
+    conn.executemany("INSERT OR IGNORE INTO buyer_keys (key, buyer_id) VALUES (?,?)",
+                     [(k, bid) for bid, ks in zip(std["id"].tolist(), buyer_keys(std)) for k in ks])
+
+
+def buyer_ids(keys: pd.Series) -> pd.Series:
+    h = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    return pd.Series([f"{v:016x}" for v in h.tolist()], index=keys.index, dtype=object)
+
+
+def content_hash(std: pd.DataFrame) -> pd.Series:
+    """Signed 64-bit hash of the normalized buyer fields (dtypes pinned so every path hashes alike)."""
+    frame = pd.DataFrame({c: std[c].astype(object) for c in TEXT_FIELDS + LIST_FIELDS}, index=std.index)
+    for c in PRICE_FIELDS: frame[c] = std[c].astype("float64")
+    for c in FLAG_FIELDS: frame[c] = std[c].astype("int64")
+    return pd.Series(pd.util.hash_pandas_object(frame[HASHED_FIELDS], index=False).to_numpy().astype(np.int64),
+                     index=std.index)
+
+
+def skip_unchanged(conn, std: pd.DataFrame) -> pd.DataFrame:
+    """Rows of `std` (ids + content_hash set) that are new or differ from what is stored."""
+    if std.empty: return std
+    stored = dict(conn.execute("SELECT id, content_hash FROM buyers WHERE id IN (SELECT value FROM json_each(?))",
+                               (json.dumps(std["id"].tolist()),)).fetchall())
+    if not stored: return std
+    known = std["id"].map(stored)
+    return std[known.isna() | (known != std["content_hash"])]
+
+
+def sync_areas(conn, std: pd.DataFrame):
+    """Rebuild state/city join rows for the written ids from the merged values actually stored."""
+    rows = conn.execute("SELECT id, states, cities FROM buyers WHERE id IN (SELECT value FROM json_each(?))",
+                        (json.dumps(std["id"].tolist()),)).fetchall()
+    sync_buyer_areas(conn, rows)
+
+
+def _union(values) -> str:
+    out = []
+    for v in values:
+        for t in str(v).replace(";", ",").split(","):
+            t = t.strip()
+            if t and t not in out: out.append(t)
+    return ",".join(out)
+
+
+def compact_buyers(conn) -> Tuple[int, int]:
+    """Fold duplicate buyers into one row per `buyer_key` (best-ranked row first, blanks filled from the others,
+    lists unioned, widest price range, max cash, sticky flags) and re-key ids. Returns (rows before, rows after)."""
+    df = pd.read_sql_query("SELECT * FROM buyers", conn)
+    if df.empty: return 0, 0
+    for c in ["id"] + TEXT_FIELDS + LIST_FIELDS: df[c] = df[c].fillna("").astype(str).str.strip()
+    for c in PRICE_FIELDS: df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0.0)
+    for c in FLAG_FIELDS: df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(int).clip(0, 1)
+    df["dedupe_key"] = buyer_key(df)
+    df = df.sort_values(["verified", "cash_available", "created_at"], ascending=[False, False, True], kind="stable")
+
+    g = df.groupby("dedupe_key", sort=False)
+    merged = g[TEXT_FIELDS].agg(lambda s: next((v for v in s if v), ""))
+    for c in LIST_FIELDS: merged[c] = g[c].agg(_union)
+    merged["min_price"] = g["min_price"].agg(lambda s: s[s > 0].min() if (s > 0).any() else 0.0)
+    merged["max_price"] = g["max_price"].max()
+    merged["cash_available"] = g["cash_available"].max()
+    for c in FLAG_FIELDS: merged[c] = g[c].max()
+    merged["created_at"] = g["created_at"].min().fillna(pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"))
+    merged = merged.reset_index()
+    merged["id"] = buyer_ids(merged["dedupe_key"])
+    merged["content_hash"] = content_hash(merged)
+
+    remap = df[["id", "dedupe_key"]].merge(merged[["dedupe_key", "id"]], on="dedupe_key", suffixes=("", "_new"))
+    remap = remap[remap["id"] != remap["id_new"]]
+    has_deals = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='deals'").fetchone()
+    if has_deals and not remap.empty:
+        conn.executemany("UPDATE deals SET buyer_id=? WHERE buyer_id=?", zip(remap["id_new"], remap["id"]))
+
+    cols = ["id"] + HASHED_FIELDS + ["created_at", "dedupe_key", "content_hash"]
+    conn.execute("DELETE FROM buyers")  # trigger clears buyer_states / buyer_cities
+    conn.executemany(f"INSERT INTO buyers ({','.join(cols)}) VALUES ({','.join(['?'] * len(cols))})",
+                     zip(*(merged[c].tolist() for c in cols)))
+    sync_buyer_areas(conn, zip(merged["id"].tolist(), merged["states"].tolist(), merged["cities"].tolist()))
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='buyer_keys'").fetchone():
+        record_keys(conn, merged)
+    return len(df), len(merged)
@@ -1 +1,340 @@
-# Placeholder for w2f_docs.py
+"""
+WTF (Wholesale2Flip) — LOI / Contract Documents
+- `loi_lines` / `contract_lines`: document text from a payload dict (same fields as the wtf_app.py forms)
+- `render_pdf`: one document to PDF bytes with a shared layout (font set once per page, one text object per page);
+  plain text when reportlab is not installed
+- State templates (`templates/<kind>/<STATE>.pdf`) are parsed once per process and reused until the file's
+  mtime/size changes (`TemplateCache`); merging happens in memory, so a document costs no intermediate files
+- Documents are rendered to bytes and served by the caller (st.download_button); nothing is written to disk unless
+  a `DocumentStore` is configured (`WTF_DOC_STORE`): content-addressed, with max-age and max-size eviction
+- `render_batch(kind, payloads)`: many documents on the shared spawn process pool (w2f_procs), returned as a zip or
+  one combined PDF
+- `payloads_from_analysis`: LOI/contract payloads for the Grade A/B rows of a `w2f_analysis.analyze_frame` result
+"""
+import datetime as dt
+import hashlib
+import io
+import os
+import threading
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from w2f_lazy import available, lazy
+from w2f_procs import pool_map
+
+# Imported on first render, not when a page merely imports this module
+rl_canvas = lazy("reportlab.pdfgen.canvas")
+pypdf = lazy("PyPDF2")
+REPORTLAB_OK = available("reportlab")
+PYPDF2_OK = available("PyPDF2")
+LETTER = (612.0, 792.0)  # reportlab.lib.pagesizes.LETTER, in points
+
+POOL_THRESHOLD = 40  # below this many documents a process pool costs more than it saves
+MAX_WORKERS = int(os.environ.get("WTF_DOC_WORKERS", min(8, os.cpu_count() or 1)))
+STORE_DIR = os.environ.get("WTF_DOC_STORE", "")  # empty: documents are never persisted
+STORE_MAX_MB = float(os.environ.get("WTF_DOC_STORE_MAX_MB", 512))
+STORE_MAX_DAYS = float(os.environ.get("WTF_DOC_STORE_MAX_DAYS", 30))
+
+
+@dataclass(frozen=True)
+class Layout:
+    font: str = "Times-Roman"
+    size: int = 11
+    leading: int = 16
+    margin_x: int = 60
+    margin_y: int = 72
+    max_chars: int = 110
+
+
+LAYOUT = Layout()
+
+
+def loi_lines(payload: Dict) -> List[str]:
+    state = (payload.get("state") or "TX").upper()
+    return [
+        "LETTER OF INTENT (LOI)",
+        f"Date: {dt.date.today():%Y-%m-%d}",
+        f"Property: {payload.get('property_address','')}",
+        f"Offer Price: ${payload.get('offer_price',0):,.2f}",
+        f"Buyer: {payload.get('buyer_name','')}",
+        f"Seller: {payload.get('seller_name','')}",
+        f"Earnest Money: ${payload.get('earnest_money',0):,.2f}",
+        f"Inspection: {payload.get('inspection_days',7)} days",
+        f"Closing: on/before {payload.get('closing_date','TBD')}",
+        f"State: {state}",
+        "Terms:", payload.get("terms","(none)")
+    ]
+
+
+def contract_lines(payload: Dict) -> List[str]:
+    state = (payload.get("state") or "TX").upper()
+    return [
+        "PURCHASE & SALE AGREEMENT",
+        f"Date: {dt.date.today():%Y-%m-%d}",
+        f"Property: {payload.get('property_address','')}",
+        f"Purchase Price: ${payload.get('purchase_price',0):,.2f}",
+        f"Buyer: {payload.get('buyer_name','')}",
+        f"Seller: {payload.get('seller_name','')}",
+        f"Earnest: ${payload.get('earnest_money',0):,.2f}",
+        f"Closing: on/before {payload.get('closing_date','TBD')}",
+        f"State: {state}", "Terms:", payload.get("terms","(standard)")
+    ]
+
+
+# kind -> (lines fn, template dir, file prefix)
+DOC_KINDS: Dict[str, Tuple[Callable[[Dict], List[str]], str, str]] = {
+    "loi": (loi_lines, "templates/loi", "LOI"),
+    "contract": (contract_lines, "templates/contracts", "CONTRACT"),
+}
+
+
+def _draw(c, lines: Sequence, layout: Layout = LAYOUT):
+    width, height = LETTER
+    text = None
+    for line in lines:
+        if text is None:
+            text = c.beginText(layout.margin_x, height - layout.margin_y)
+            text.setFont(layout.font, layout.size, layout.leading)
+        text.textLine(str(line)[:layout.max_chars])
+        if text.getY() < layout.margin_y:
+            c.drawText(text); c.showPage(); text = None
+    if text is not None: c.drawText(text)
+    c.showPage()
+
+
+def render_pdf(lines: Sequence, layout: Layout = LAYOUT) -> bytes:
+    """One document as PDF bytes (UTF-8 text when reportlab is missing)."""
+    if not REPORTLAB_OK: return "\n".join(map(str, lines)).encode("utf-8")
+    buf = io.BytesIO()
+    c = rl_canvas.Canvas(buf, pagesize=LETTER)
+    _draw(c, lines, layout)
+    c.save()
+    return buf.getvalue()
+
+
+def _template_path(kind: str, payload: Dict) -> Path:
+    state = (payload.get("state") or "TX").upper()
+    return Path(DOC_KINDS[kind][1]) / f"{state}.pdf"
+
+
+class TemplateCache:
+    """Parsed template PDFs keyed by path. An entry is reused while the file's (mtime, size) is unchanged, so
+    editing or replacing a template takes effect on the next document. Unreadable templates cache as None."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Tuple[int, int], Optional[object], threading.Lock]] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+
+    def get(self, path: Path):
+        """(reader, lock) for `path`, or None when it is missing/unreadable. Hold the lock while copying pages:
+        PdfReader resolves objects lazily from one shared stream."""
+        key = str(path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            with self._lock: self._entries.pop(key, None)
+            return None
+        sig = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == sig:
+                self.hits += 1
+                return (entry[1], entry[2]) if entry[1] is not None else None
+        try:
+            with open(key, "rb") as f: reader = pypdf.PdfReader(io.BytesIO(f.read()))
+            if not len(reader.pages): reader = None  # also parses the page tree now rather than on first merge
+        except Exception:
+            reader = None
+        with self._lock:
+            self.loads += 1
+            self._entries[key] = (sig, reader, threading.Lock())
+            entry = self._entries[key]
+        return (reader, entry[2]) if reader is not None else None
+
+    def clear(self):
+        with self._lock: self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock: return {"templates": len(self._entries), "loads": self.loads, "hits": self.hits}
+
+
+_templates = TemplateCache()
+
+
+def get_template_cache() -> TemplateCache:
+    return _templates
+
+
+def _with_template(pdf: bytes, tmpl: Path) -> bytes:
+    """Generated pages followed by the state template's pages (unchanged when PyPDF2 or the template is missing)."""
+    if not (PYPDF2_OK and REPORTLAB_OK): return pdf
+    cached = _templates.get(tmpl)
+    if cached is None: return pdf
+    reader, lock = cached
+    w = pypdf.PdfWriter()
+    for page in pypdf.PdfReader(io.BytesIO(pdf)).pages: w.add_page(page)
+    with lock:
+        for page in reader.pages: w.add_page(page)
+    out = io.BytesIO(); w.write(out)
+    return out.getvalue()
+
+
+def render_document(kind: str, payload: Dict) -> bytes:
+    lines_fn = DOC_KINDS[kind][0]
+    return _with_template(render_pdf(lines_fn(payload)), _template_path(kind, payload))
+
+
+def document_name(kind: str, payload: Dict, i: Optional[int] = None) -> str:
+    slug = "".join(ch if ch.isalnum() else "_" for ch in str(payload.get("property_address", "")))[:60].strip("_")
+    ext = "pdf" if REPORTLAB_OK else "txt"
+    seq = "" if i is None else f"{i + 1:04d}_"
+    return f"{DOC_KINDS[kind][2]}_{seq}{slug or 'document'}.{ext}"
+
+
+def document_mime(name: str) -> str:
+    return {"pdf": "application/pdf", "zip": "application/zip"}.get(name.rsplit(".", 1)[-1], "text/plain")
+
+
+class DocumentStore:
+    """Content-addressed file store: `put` names a document by its SHA-256, so identical documents are stored once.
+    `evict` drops files older than `max_days`, then the least recently used until the store fits `max_mb`."""
+
+    def __init__(self, root: str, max_mb: float = STORE_MAX_MB, max_days: float = STORE_MAX_DAYS):
+        self.root = Path(root)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age = max_days * 86400
+        self._lock = threading.Lock()
+        self._puts = 0
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        """Store `data`; returns its key ("sha256:<hex>")."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if path.exists():
+            os.utime(path)  # refresh recency
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data); os.replace(tmp, path)
+        with self._lock:
+            self._puts += 1
+            due = self._puts % 50 == 1  # amortize the directory scan
+        if due: self.evict()
+        return f"sha256:{digest}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key.split(":", 1)[-1])
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        os.utime(path)
+        return data
+
+    def evict(self) -> int:
+        """Apply the retention policy; returns the number of files removed."""
+        with self._lock:
+            files = []
+            for p in self.root.glob("??/*"):
+                try: st = p.stat()
+                except OSError: continue
+                files.append((st.st_mtime, st.st_size, p))
+            files.sort()
+            cutoff = time.time() - self.max_age
+            total = sum(f[1] for f in files)
+            removed = 0
+            for mtime, size, p in files:
+                if mtime >= cutoff and total <= self.max_bytes: break
+                try: p.unlink()
+                except OSError: continue
+                total -= size; removed += 1
+            return removed
+
+
+_store: Optional[DocumentStore] = DocumentStore(STORE_DIR) if STORE_DIR else None
+
+
+def set_document_store(store: Optional[DocumentStore]):
+    global _store
+    _store = store
+
+
+def get_document_store() -> Optional[DocumentStore]:
+    return _store
+
+
+def persist(data: bytes) -> str:
+    """Store key for `data` when a document store is configured, else ""."""
+    return _store.put(data) if _store else ""
+
+
+def _render_chunk(args) -> List[bytes]:
+    kind, payloads = args
+    return [render_document(kind, p) for p in payloads]
+
+
+def _render_all(kind: str, payloads: List[Dict], workers: Optional[int],
+                on_progress: Optional[Callable[[int, int], None]]) -> List[bytes]:
+    n = len(payloads)
+    workers = MAX_WORKERS if workers is None else workers
+    if n < POOL_THRESHOLD or workers <= 1:
+        out = []
+        for p in payloads:
+            out.append(render_document(kind, p))
+            if on_progress and len(out) % 25 == 0: on_progress(len(out), n)
+        if on_progress: on_progress(n, n)
+        return out
+    size = max(10, -(-n // (workers * 4)))  # ~4 chunks per worker keeps the pool busy to the end
+    chunks = [(kind, payloads[i:i + size]) for i in range(0, n, size)]
+    out: List[bytes] = []
+    for docs in pool_map(_render_chunk, chunks, workers):
+        out += docs
+        if on_progress: on_progress(len(out), n)
+    return out
+
+
+def render_batch(kind: str, payloads: Sequence[Dict], fmt: str = "zip", workers: Optional[int] = None,
+                 on_progress: Optional[Callable[[int, int], None]] = None) -> Tuple[bytes, str]:
+    """Render every payload; returns (bytes, file name). `fmt` is "zip" (one file per document) or "pdf" (one
+    combined PDF; needs PyPDF2, otherwise falls back to zip)."""
+    payloads = list(payloads)
+    docs = _render_all(kind, payloads, workers, on_progress)
+    stamp = dt.datetime.now().strftime("%Y%m%d_%H%M")
+    prefix = DOC_KINDS[kind][2]
+    if fmt == "pdf" and PYPDF2_OK and REPORTLAB_OK:
+        w = pypdf.PdfWriter()
+        for d in docs:
+            for page in pypdf.PdfReader(io.BytesIO(d)).pages: w.add_page(page)
+        out = io.BytesIO(); w.write(out)
+        return out.getvalue(), f"{prefix}_batch_{stamp}.pdf"
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, (p, d) in enumerate(zip(payloads, docs)):
+            zf.writestr(document_name(kind, p, i), d)
+    return buf.getvalue(), f"{prefix}_batch_{stamp}.zip"
+
+
+def payloads_from_analysis(df, kind: str = "loi", grades: Sequence[str] = ("A", "B"), **defaults) -> List[Dict]:
+    """Payloads for rows of an analyzed frame whose `grade` is in `grades`; offer/purchase price = MAO 70%.
+    `defaults` (buyer_name, earnest_money, terms, ...) are applied to every payload."""
+    rows = df[df["grade"].isin(list(grades))]
+    price_key = "offer_price" if kind == "loi" else "purchase_price"
+    cols = {c.lower(): c for c in rows.columns}
+    addr, city, state = (cols.get(k) for k in ("address", "city", "state"))
+    out = []
+    for rec in rows.to_dict(orient="records"):
+        parts = [str(rec[c]) for c in (addr, city) if c and rec.get(c) not in (None, "")]
+        p = dict(defaults)
+        p["property_address"] = ", ".join(parts)
+        if state and rec.get(state): p["state"] = str(rec[state])
+        p[price_key] = float(rec["mao70"])
+        out.append(p)
+    return out
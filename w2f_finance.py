@@ -0,0 +1,176 @@
+"""
+WTF (Wholesale2Flip) — Finance Engine
+- Vectorized BRRRR / SubTo formulas (`brrrr_grid`, `subto_grid`): every argument may be a scalar or a NumPy array,
+  results broadcast, so one call evaluates a whole scenario grid (the scalar calculators in wtf_app.py call these)
+- `amortization_schedule`: full monthly schedule in closed form (no per-month loop)
+- `brrrr_hold_cashflows` + `npv` / `irr`: hold-period returns, IRR solved by bisection across the grid at once
+- `brrrr_sensitivity`: rate x LTV x rent x rehab sweep as a 4-D cube, e.g. 100x100x20x1 in well under a second
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+TERM_MONTHS = 360
+SWEEP_AXES = ("rate", "ltv", "rent", "rehab")
+SWEEP_METRICS = {
+    "cashflow": "Monthly Cashflow ($)",
+    "coc": "Cash-on-Cash (%)",
+    "dscr": "DSCR",
+    "cash_out": "Cash Out at Refi ($)",
+    "irr": "IRR over hold (%)",
+}
+
+
+def payment(principal, rate, n: int = TERM_MONTHS) -> np.ndarray:
+    """Monthly payment on `principal` at annual `rate` over `n` months (0 for non-positive principal)."""
+    principal = np.asarray(principal, dtype=float)
+    r = np.asarray(rate, dtype=float) / 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pmt = np.where(r == 0, principal / n, r * principal / (1 - (1 + r) ** -n))
+    return np.where(principal > 0, pmt, 0.0)
+
+
+def balance_after(principal, rate, k, n: int = TERM_MONTHS) -> np.ndarray:
+    """Remaining balance after `k` payments (closed form)."""
+    principal = np.asarray(principal, dtype=float)
+    r = np.asarray(rate, dtype=float) / 12
+    k = np.asarray(k, dtype=float)
+    growth = (1 + r) ** k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bal = np.where(r == 0, principal * (1 - k / n),
+                       principal * growth - payment(principal, rate, n) * (growth - 1) / r)
+    return np.where(principal > 0, np.maximum(bal, 0.0), 0.0)
+
+
+def amortization_schedule(principal: float, rate: float, n: int = TERM_MONTHS) -> pd.DataFrame:
+    """One row per month: payment, interest, principal and remaining balance."""
+    months = np.arange(1, n + 1)
+    pmt = float(payment(principal, rate, n))
+    opening = balance_after(principal, rate, months - 1, n)
+    interest = opening * rate / 12
+    return pd.DataFrame({"month": months, "payment": pmt, "interest": interest, "principal": pmt - interest,
+                         "balance": balance_after(principal, rate, months, n)})
+
+
+def yearly_schedule(schedule: pd.DataFrame) -> pd.DataFrame:
+    """Annual totals of an `amortization_schedule`, with the year-end balance."""
+    year = (schedule["month"] - 1) // 12 + 1
+    out = schedule.groupby(year).agg(payment=("payment", "sum"), interest=("interest", "sum"),
+                                     principal=("principal", "sum"), balance=("balance", "last"))
+    out.index.name = "year"
+    return out
+
+
+def dscr(noi, debt_service) -> np.ndarray:
+    """Debt service coverage ratio; inf when there is no debt service."""
+    noi = np.asarray(noi, dtype=float)
+    debt_service = np.asarray(debt_service, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(debt_service > 0, noi / debt_service, np.inf)
+
+
+def brrrr_grid(purchase, rehab, arv, ltv=0.75, closing_costs=6000, rate=0.07, rent=0, taxes=0, ins=0,
+               mgmt=0.08, maint=0.05) -> Dict[str, np.ndarray]:
+    """`brrrr_calc` over broadcast arrays, plus DSCR."""
+    total_cost = np.asarray(purchase, dtype=float) + rehab + closing_costs
+    new_loan = np.asarray(arv, dtype=float) * ltv
+    pmt = payment(new_loan, rate)
+    rent = np.asarray(rent, dtype=float)
+    noi = rent - rent * mgmt - rent * maint - np.asarray(taxes) / 12 - np.asarray(ins) / 12
+    cashflow = noi - pmt
+    return {"total_cost": total_cost, "new_loan": new_loan, "cash_out": np.maximum(0, new_loan - total_cost),
+            "monthly_pmt": pmt, "noi": noi, "cashflow": cashflow,
+            "coc": cashflow * 12 / np.maximum(1, total_cost - new_loan) * 100,
+            "equity": np.maximum(0, np.asarray(arv, dtype=float) - new_loan), "dscr": dscr(noi, pmt)}
+
+
+def subto_grid(arv, balance, existing_rate, piti, arrears=0, down=10000, assign_fee=0, wrap_rate=0.085,
+               exit_rent=0) -> Dict[str, np.ndarray]:
+    """`subto_calc` over broadcast arrays, plus DSCR against the payment actually owed."""
+    invest = np.asarray(down, dtype=float) + assign_fee + arrears
+    wrap_pmt = payment(balance, wrap_rate)
+    owed = np.maximum(piti, wrap_pmt)
+    monthly_cf = np.asarray(exit_rent, dtype=float) - owed
+    return {"buyer_investment": invest, "wrap_pmt": wrap_pmt, "monthly_cashflow": monthly_cf,
+            "equity": np.maximum(0, np.asarray(arv, dtype=float) - balance),
+            "roi": monthly_cf * 12 / np.maximum(1, invest) * 100, "dscr": dscr(exit_rent, owed)}
+
+
+def npv(rate, cashflows) -> np.ndarray:
+    """NPV of periodic `cashflows` (last axis, t=0 first) at `rate` per period; broadcasts over leading axes."""
+    cf = np.asarray(cashflows, dtype=float)
+    v = 1 / (1 + np.asarray(rate, dtype=float))
+    acc = np.zeros(np.broadcast_shapes(v.shape, cf.shape[:-1]))
+    for t in range(cf.shape[-1] - 1, -1, -1):  # Horner: no powers, one multiply-add per period
+        acc = acc * v + cf[..., t]
+    return acc
+
+
+def irr(cashflows, lo: float = -0.99, hi: float = 10.0, tol: float = 1e-7) -> np.ndarray:
+    """IRR per row of `cashflows` (last axis) by vectorized bisection; NaN where NPV does not change sign on
+    [lo, hi] (e.g. no cash left in the deal)."""
+    cf = np.asarray(cashflows, dtype=float)
+    shape = cf.shape[:-1]
+    a, b = np.full(shape, lo), np.full(shape, hi)
+    fa = npv(a, cf)
+    valid = np.sign(fa) != np.sign(npv(b, cf))
+    for _ in range(int(np.ceil(np.log2((hi - lo) / tol)))):
+        mid = (a + b) / 2
+        fm = npv(mid, cf)
+        left = np.sign(fm) == np.sign(fa)
+        a = np.where(left, mid, a); fa = np.where(left, fm, fa)
+        b = np.where(left, b, mid)
+    return np.where(valid, (a + b) / 2, np.nan)
+
+
+def brrrr_hold_cashflows(r: Dict[str, np.ndarray], arv, rate, hold_years: int = 5, appreciation: float = 0.03,
+                         rent_growth: float = 0.02, selling_cost: float = 0.06) -> np.ndarray:
+    """Annual investor cash flows for a `brrrr_grid` result: year 0 = cash left in the deal, then cashflow with
+    rent growth, plus sale proceeds net of selling costs and loan payoff in the last year. Shape (..., hold+1)."""
+    years = np.arange(1, hold_years + 1)
+    cash_in = r["total_cost"] - r["new_loan"]
+    growth = (1 + rent_growth) ** (years - 1)
+    noi = r["noi"][..., None] * growth
+    annual = (noi - r["monthly_pmt"][..., None]) * 12
+    sale = np.asarray(arv, dtype=float) * (1 + appreciation) ** hold_years * (1 - selling_cost)
+    payoff = balance_after(r["new_loan"], rate, hold_years * 12)
+    annual[..., -1] += sale - payoff
+    return np.concatenate([-cash_in[..., None], annual], axis=-1)
+
+
+def brrrr_sensitivity(base: Dict[str, float], rate: Optional[Sequence[float]] = None,
+                      ltv: Optional[Sequence[float]] = None, rent: Optional[Sequence[float]] = None,
+                      rehab: Optional[Sequence[float]] = None, metrics: Sequence[str] = ("cashflow", "coc", "dscr"),
+                      hold_years: int = 5) -> Dict[str, np.ndarray]:
+    """Sweep `base` (brrrr_grid keyword arguments) over the given axes; unspecified axes stay at the base value.
+    Returns {"axes": {name: values}, metric: array of shape (len(rate), len(ltv), len(rent), len(rehab))}."""
+    given = {"rate": rate, "ltv": ltv, "rent": rent, "rehab": rehab}
+    axes = {k: np.atleast_1d(np.asarray(v if v is not None else base.get(k, 0), dtype=float)) for k, v in given.items()}
+    kw = dict(base)
+    for i, k in enumerate(SWEEP_AXES):
+        shape = [1] * len(SWEEP_AXES); shape[i] = -1
+        kw[k] = axes[k].reshape(shape)
+    r = brrrr_grid(**kw)
+    full = np.broadcast_shapes(*(a.shape for a in (kw[k] for k in SWEEP_AXES)))
+    out: Dict[str, np.ndarray] = {"axes": axes}
+    for m in metrics:
+        if m == "irr":
+            flows = brrrr_hold_cashflows({k: np.broadcast_to(v, full) for k, v in r.items()}, kw["arv"],
+                                         np.broadcast_to(kw["rate"], full), hold_years)
+            out[m] = irr(flows) * 100
+        else:
+            out[m] = np.broadcast_to(r[m], full)
+    return out
+
+
+def heatmap_frame(sweep: Dict[str, np.ndarray], metric: str, x: str, y: str) -> pd.DataFrame:
+    """2-D slice of a sweep for plotting: rows = `y` values, columns = `x` values; the other axes are averaged
+    (they are length 1 when only two axes were swept)."""
+    cube = sweep[metric]
+    keep = (SWEEP_AXES.index(y), SWEEP_AXES.index(x))
+    other = tuple(i for i in range(len(SWEEP_AXES)) if i not in keep)
+    with np.errstate(invalid="ignore"):
+        plane = np.nanmean(cube, axis=other) if other else cube
+    if keep[0] > keep[1]: plane = plane.T
+    return pd.DataFrame(plane, index=pd.Index(sweep["axes"][y], name=y), columns=pd.Index(sweep["axes"][x], name=x))
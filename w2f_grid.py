@@ -0,0 +1,126 @@
+"""
+WTF (Wholesale2Flip) — Paginated, Server-Side Filtered Tables
+- `fetch_page`: keyset pagination on (sort column, rowid) with WHERE/ORDER BY/LIMIT done in SQLite
+- Column names are checked against a per-grid whitelist; every value is a bound parameter
+- `render_grid`: Streamlit grid (filters, sort, page size, prev/next) that only ships the visible page
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from w2f_lazy import lazy
+
+st = lazy("streamlit")  # only render_grid needs it; fetch_page stays importable headless (w2f_pipeline, tests)
+
+PAGE_SIZES = [25, 50, 100, 250]
+Cursor = Tuple[Any, int]  # (last sort value, last rowid)
+Filter = Tuple[str, str, Any]  # (column, op, value)
+OPS = {"=": "=", ">=": ">=", "<=": "<=", "like": "LIKE"}
+
+
+@dataclass
+class GridSpec:
+    table: str
+    columns: List[str]                                       # selected + displayed
+    sortable: List[str]                                      # first entry is the default sort
+    equals: Dict[str, List[Any]] = field(default_factory=dict)  # column -> choices for an equality filter
+    search: List[str] = field(default_factory=list)          # columns matched by the free-text box (LIKE)
+    min_filters: List[str] = field(default_factory=list)     # numeric columns with a ">=" filter
+
+
+def _check(spec: GridSpec, col: str) -> str:
+    allowed = set(spec.columns) | set(spec.sortable) | set(spec.equals) | set(spec.search) | set(spec.min_filters)
+    if col not in allowed: raise ValueError(f"column {col!r} not allowed for {spec.table}")
+    return col
+
+
+def _where(spec: GridSpec, filters: Sequence[Filter], search: str):
+    clauses, params = [], []
+    for col, op, val in filters:
+        clauses.append(f"{_check(spec, col)} {OPS[op.lower()]} ?"); params.append(val)
+    if search and spec.search:
+        clauses.append("(" + " OR ".join(f"{_check(spec, c)} LIKE ?" for c in spec.search) + ")")
+        params += [f"%{search}%"] * len(spec.search)
+    return clauses, params
+
+
+def _keyset(sort: str, desc: bool, cursor: Cursor):
+    """Rows strictly after `cursor` in ORDER BY sort, rowid (SQLite sorts NULLs first ascending, last descending)."""
+    val, rid = cursor
+    if desc:
+        if val is None: return f"({sort} IS NULL AND rowid < ?)", [rid]
+        return f"(({sort}, rowid) < (?, ?) OR {sort} IS NULL)", [val, rid]
+    if val is None: return f"(({sort} IS NULL AND rowid > ?) OR {sort} IS NOT NULL)", [rid]
+    return f"({sort}, rowid) > (?, ?)", [val, rid]
+
+
+def fetch_page(conn, spec: GridSpec, sort: Optional[str] = None, desc: bool = True,
+               filters: Sequence[Filter] = (), search: str = "", page_size: int = 50,
+               after: Optional[Cursor] = None) -> Tuple[pd.DataFrame, Optional[Cursor]]:
+    """One page of `spec.table`; returns (rows, cursor for the next page or None on the last page)."""
+    sort = _check(spec, sort or spec.sortable[0])
+    clauses, params = _where(spec, filters, search)
+    if after is not None:
+        c, p = _keyset(sort, desc, after); clauses.append(c); params += p
+    direction = "DESC" if desc else "ASC"
+    cols = ", ".join(_check(spec, c) for c in spec.columns)
+    sql = (f"SELECT rowid AS _rid, {sort} AS _sort, {cols} FROM {spec.table}"
+           + (f" WHERE {' AND '.join(clauses)}" if clauses else "")
+           + f" ORDER BY {sort} {direction}, rowid {direction} LIMIT ?")
+    df = pd.read_sql_query(sql, conn, params=tuple(params + [int(page_size) + 1]))
+    nxt = None
+    if len(df) > page_size:
+        df = df.iloc[:page_size]
+        last = df.iloc[-1]
+        nxt = (None if pd.isna(last["_sort"]) else last["_sort"].item() if hasattr(last["_sort"], "item") else last["_sort"],
+               int(last["_rid"]))
+    return df.drop(columns=["_rid", "_sort"]).reset_index(drop=True), nxt
+
+
+def _reset(key: str):
+    st.session_state[key] = {"stack": [None], "next": None}
+
+
+def _go_next(key: str):
+    state = st.session_state[key]
+    if state["next"] is not None: state["stack"].append(state["next"])
+
+
+def _go_prev(key: str):
+    state = st.session_state[key]
+    if len(state["stack"]) > 1: state["stack"].pop()
+
+
+def render_grid(key: str, connect: Callable, spec: GridSpec):
+    """Filter/sort/page controls + one page of rows. `connect()` must return a connection context manager."""
+    if key not in st.session_state: _reset(key)
+    c1, c2, c3, c4 = st.columns([3, 2, 1, 1])
+    search = c1.text_input("Search", key=f"{key}_search", on_change=_reset, args=(key,),
+                           placeholder=", ".join(spec.search)) if spec.search else ""
+    sort = c2.selectbox("Sort by", spec.sortable, key=f"{key}_sort", on_change=_reset, args=(key,))
+    desc = c3.toggle("Desc", value=True, key=f"{key}_desc", on_change=_reset, args=(key,))
+    page_size = c4.selectbox("Rows", PAGE_SIZES, index=1, key=f"{key}_size", on_change=_reset, args=(key,))
+
+    filters: List[Filter] = []
+    extra = list(spec.equals.items()) + [(c, None) for c in spec.min_filters]
+    if extra:
+        fcols = st.columns(len(extra))
+        for fc, (col, choices) in zip(fcols, extra):
+            if choices is None:
+                v = fc.number_input(f"Min {col}", value=0, step=1, key=f"{key}_min_{col}", on_change=_reset, args=(key,))
+                if v: filters.append((col, ">=", v))
+            else:
+                v = fc.selectbox(col.replace("_", " ").title(), ["All"] + list(choices), key=f"{key}_eq_{col}",
+                                 on_change=_reset, args=(key,))
+                if v != "All": filters.append((col, "=", v))
+
+    state = st.session_state[key]
+    with connect() as conn:
+        df, nxt = fetch_page(conn, spec, sort, desc, filters, search, page_size, after=state["stack"][-1])
+    state["next"] = nxt
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    p1, p2, p3 = st.columns([1, 2, 1])
+    p1.button("◀ Prev", key=f"{key}_prev", on_click=_go_prev, args=(key,), disabled=len(state["stack"]) <= 1)
+    p2.caption(f"Page {len(state['stack'])} · {len(df)} rows")
+    p3.button("Next ▶", key=f"{key}_next", on_click=_go_next, args=(key,), disabled=nxt is None)
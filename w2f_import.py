@@ -0,0 +1,305 @@
+"""
+WTF (Wholesale2Flip) — Streaming Bulk Import (buyers, leads)
+- `stream_import(connect, source, spec)`: reads CSV, gzip CSV or Parquet in fixed-size chunks, maps header aliases,
+  normalizes each chunk with vectorized pandas ops and writes it with `executemany` — peak memory is one chunk
+- Rows are deduplicated on the fly: ids are a content hash of each spec's natural key (email/phone/name for buyers,
+  normalized address for leads), so repeats collapse inside a chunk and upsert onto the same row across chunks,
+  files and re-runs without keeping a seen-set in memory; buyers also skip unchanged rows and merge changed ones
+  (see w2f_dedupe)
+- Uploads commit once (`commit_every=None`); `import_file` commits every `COMMIT_EVERY` chunks for multi-GB dumps
+  (safe to re-run after a failure: the ids are deterministic)
+- Rows that fail validation are skipped and returned in `ImportReport.errors` (line number + reason, capped)
+"""
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from w2f_db import get_pool
+from w2f_dedupe import BUYER_MERGE, buyer_key, content_hash, record_keys, resolve_buyers, skip_unchanged, sync_areas
+
+DEFAULT_CHUNKSIZE = 5000
+COMMIT_EVERY = 20   # chunks per transaction for import_file (bounds WAL growth on huge files)
+MAX_ERRORS = 10000  # error rows kept for the report; the rest are only counted
+TRUTHY = ["1", "1.0", "true", "yes", "y"]
+
+BUYER_ALIASES = {
+    "name": ["name", "buyer", "company", "buyer_name"], "email": ["email", "e-mail"], "phone": ["phone", "mobile", "cell"],
+    "min_price": ["min_price", "min", "minimum"], "max_price": ["max_price", "max", "maximum"],
+    "states": ["states", "state"], "cities": ["cities", "city", "markets"],
+    "property_types": ["property_types", "types", "asset_types"], "deal_types": ["deal_types", "strategy", "strategies"],
+    "verified": ["verified", "is_verified"], "proof_of_funds": ["proof_of_funds", "pof"],
+    "cash_available": ["cash", "cash_available", "capital"],
+}
+BUYER_WRITE_COLUMNS = ["id", "name", "email", "phone", "property_types", "min_price", "max_price", "states", "cities",
+                       "deal_types", "verified", "proof_of_funds", "cash_available", "dedupe_key", "content_hash"]
+
+# wtf_app_fixed.py / wtf.db leads table; skip-trace vendor headers included
+LEAD_ALIASES = {
+    "name": ["name", "full_name", "owner_name", "owner"], "first_name": ["first_name", "owner_first_name", "first"],
+    "last_name": ["last_name", "owner_last_name", "last"],
+    "phone": ["phone", "phone1", "phone_1", "mobile", "cell", "owner_phone"], "email": ["email", "email1", "e-mail"],
+    "address": ["address", "property_address", "site_address", "street"], "city": ["city", "property_city"],
+    "state": ["state", "property_state"], "zip": ["zip", "zip_code", "zipcode", "postal_code", "property_zip"],
+    "status": ["status"], "source": ["source", "list", "list_name"],
+    "score": ["score", "lead_score", "motivation_score"], "notes": ["notes", "motivation"],
+}
+LEAD_WRITE_COLUMNS = ["id", "name", "phone", "email", "address", "city", "state", "zip", "status", "source", "score",
+                      "notes", "created_at"]
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    imported: int = 0     # rows inserted or updated
+    duplicates: int = 0   # rows collapsed onto another row of the same chunk
+    unchanged: int = 0    # rows skipped: already stored unchanged (or, for insert-only specs, already present)
+    error_count: int = 0
+    errors: List[Dict] = field(default_factory=list)  # first MAX_ERRORS: {"line": ..., "error": reason, ...}
+    seconds: float = 0.0
+
+    def errors_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.errors) if self.errors else pd.DataFrame(columns=["line", "error"])
+
+
+@dataclass
+class ImportSpec:
+    table: str
+    columns: List[str]                                      # written columns, "id" first
+    normalize: Callable[[pd.DataFrame], Tuple[pd.DataFrame, List[Dict]]]
+    key: Callable[[pd.DataFrame], pd.Series]                # natural dedupe key per normalized row
+    integer_ids: bool = False                               # INTEGER PRIMARY KEY tables get a 63-bit hash id
+    on_conflict: str = "DO NOTHING"
+    prepare: Optional[Callable] = None                      # fn(conn, rows) -> rows still worth writing
+    after_write: Optional[Callable] = None                  # fn(conn, written rows)
+
+
+def resolve_columns(columns, aliases: Dict[str, List[str]]) -> Dict[str, str]:
+    """dst -> source header for the first alias present (case/whitespace-insensitive)."""
+    by_key = {}
+    for c in columns: by_key.setdefault(str(c).strip().lower(), c)
+    out = {}
+    for dst, names in aliases.items():
+        hit = next((by_key[a] for a in names if a in by_key), None)
+        if hit is not None: out[dst] = hit
+    return out
+
+
+def _text(df: pd.DataFrame, src: Optional[str]) -> pd.Series:
+    if src is None: return pd.Series("", index=df.index, dtype=object)
+    return df[src].fillna("").astype(str).str.strip()
+
+
+def _number(raw: pd.Series) -> pd.Series:
+    return pd.to_numeric(raw.str.replace(r"[$,\s]", "", regex=True), errors="coerce")
+
+
+def _digits(s: pd.Series) -> pd.Series:
+    return s.str.replace(r"\D", "", regex=True)
+
+
+def _norm_part(s: pd.Series) -> pd.Series:
+    # Vectorized twin of w2f_datagen.normalize_address for one part
+    return (s.str.lower().str.replace(".", "", regex=False).str.replace(",", " ", regex=False)
+             .str.replace(r"\s+", " ", regex=True).str.strip())
+
+
+class _Problems:
+    """Per-row validation messages for one chunk."""
+
+    def __init__(self, index):
+        self.msg = pd.Series("", index=index, dtype=object)
+
+    def flag(self, mask: pd.Series, message: str):
+        self.msg = self.msg.where(~mask, self.msg + np.where(self.msg == "", "", "; ") + message)
+
+    def split(self, std: pd.DataFrame, show: List[str]):
+        bad = (self.msg != "").to_numpy()
+        errors = []
+        if bad.any():
+            lines = std.index[bad] + 2  # index is the 0-based data row; line 1 is the header
+            cols = [std[c][bad] for c in show]
+            errors = [{"line": int(ln), "error": m, **dict(zip(show, vals))}
+                      for ln, m, *vals in zip(lines, self.msg[bad], *cols)]
+        return std.loc[~bad], errors
+
+
+def normalize_buyers(df: pd.DataFrame):
+    """Vectorized alias mapping + cleanup for one chunk. Returns (rows to write, error dicts);
+    df's index must be the 0-based data row number (what chunked `read_csv` yields) for error line numbers."""
+    src = resolve_columns(df.columns, BUYER_ALIASES)
+    std = pd.DataFrame(index=df.index)
+    problems = _Problems(df.index)
+    std["id"] = ""
+    for c in ("name", "email", "phone"): std[c] = _text(df, src.get(c))
+    for c in ("states", "cities", "property_types", "deal_types"):
+        std[c] = _text(df, src.get(c)).str.replace(";", ",", regex=False)
+    for c in ("verified", "proof_of_funds"):
+        std[c] = _text(df, src.get(c)).str.lower().isin(TRUTHY).astype(int)
+    for c in ("cash_available", "min_price", "max_price"):
+        raw = _text(df, src.get(c))
+        num = _number(raw)
+        problems.flag((raw != "") & num.isna(), f"{c} is not a number")
+        std[c] = num.fillna(0.0)
+
+    problems.flag((std["name"] == "") & (std["email"] == "") & (std["phone"] == ""), "no name, email or phone")
+    problems.flag((std["min_price"] > 0) & (std["max_price"] > 0) & (std["min_price"] > std["max_price"]),
+                  "min_price greater than max_price")
+    return problems.split(std, ["name", "email"])
+
+
+def normalize_leads(df: pd.DataFrame):
+    src = resolve_columns(df.columns, LEAD_ALIASES)
+    std = pd.DataFrame(index=df.index)
+    problems = _Problems(df.index)
+    std["id"] = 0
+    name = _text(df, src.get("name"))
+    full = (_text(df, src.get("first_name")) + " " + _text(df, src.get("last_name"))).str.strip()
+    std["name"] = name.where(name != "", full)
+    for c in ("phone", "email", "address", "city", "zip", "notes"): std[c] = _text(df, src.get(c))
+    std["state"] = _text(df, src.get("state")).str.upper()
+    status, source = _text(df, src.get("status")), _text(df, src.get("source"))
+    std["status"] = status.where(status != "", "New")
+    std["source"] = source.where(source != "", "Import")
+    raw = _text(df, src.get("score"))
+    score = _number(raw)
+    problems.flag((raw != "") & score.isna(), "score is not a number")
+    std["score"] = score.round().astype("Int64").astype(object).where(score.notna(), None)
+    std["created_at"] = datetime.now().isoformat()
+
+    problems.flag((std["address"] == "") & (std["phone"] == "") & (std["email"] == ""), "no address, phone or email")
+    return problems.split(std, ["name", "address"])
+
+
+def lead_key(std: pd.DataFrame) -> pd.Series:
+    addr = _norm_part(std["address"])
+    by_addr = "a:" + addr + ", " + _norm_part(std["city"]) + ", " + _norm_part(std["state"])
+    phone = _digits(std["phone"]).str[-10:]
+    return by_addr.where(addr != "", ("p:" + phone).where(phone != "", "e:" + std["email"].str.lower()))
+
+
+def _prepare_buyers(conn, std: pd.DataFrame) -> pd.DataFrame:
+    std = resolve_buyers(conn, std)  # a known email/phone/name lands on its buyer even if the key class changed
+    std["content_hash"] = content_hash(std)
+    return skip_unchanged(conn, std)
+
+
+def _after_buyers(conn, std: pd.DataFrame):
+    sync_areas(conn, std)
+    record_keys(conn, std)
+
+
+BUYER_IMPORT = ImportSpec("buyers", BUYER_WRITE_COLUMNS, normalize_buyers, buyer_key, on_conflict=BUYER_MERGE,
+                          prepare=_prepare_buyers, after_write=_after_buyers)
+LEAD_IMPORT = ImportSpec("leads", LEAD_WRITE_COLUMNS, normalize_leads, lead_key, integer_ids=True)
+
+
+def _assign_ids(std: pd.DataFrame, spec: ImportSpec) -> pd.DataFrame:
+    key = spec.key(std)
+    h = pd.util.hash_pandas_object(key, index=False).to_numpy()
+    if spec.integer_ids:
+        std["id"] = (h & np.uint64(0x7FFF_FFFF_FFFF_FFFF)).astype(np.int64)
+    else:
+        std["id"] = pd.Series([f"{v:016x}" for v in h.tolist()], index=std.index, dtype=object)
+    if "dedupe_key" in spec.columns: std["dedupe_key"] = key
+    return std
+
+
+def write_rows(conn, std: pd.DataFrame, spec: ImportSpec) -> int:
+    """Upsert normalized rows on `conn` (caller owns the transaction); returns rows inserted/updated."""
+    if std.empty: return 0
+    cols = spec.columns
+    cur = conn.executemany(f"INSERT INTO {spec.table} ({','.join(cols)}) VALUES ({','.join(['?'] * len(cols))}) "
+                           f"ON CONFLICT(id) {spec.on_conflict}", zip(*(std[c].tolist() for c in cols)))
+    if spec.after_write: spec.after_write(conn, std)
+    return max(cur.rowcount, 0)
+
+
+def _sniff(source, name: Optional[str]) -> str:
+    n = (name or getattr(source, "name", None) or "").lower()
+    if n.endswith((".parquet", ".pq")): return "parquet"
+    if n.endswith(".gz"): return "csv.gz"
+    if n.endswith(".csv"): return "csv"
+    if hasattr(source, "read") and hasattr(source, "seek"):
+        pos = source.tell(); head = source.read(4); source.seek(pos)
+        if isinstance(head, bytes):
+            if head == b"PAR1": return "parquet"
+            if head[:2] == b"\x1f\x8b": return "csv.gz"
+    return "csv"
+
+
+def iter_chunks(source, chunksize: int = DEFAULT_CHUNKSIZE, name: Optional[str] = None,
+                fmt: Optional[str] = None) -> Iterator[Tuple[pd.DataFrame, Optional[float]]]:
+    """(chunk, fraction done or None) from a CSV / gzip CSV / Parquet file-like; chunks are all-string frames."""
+    fmt = fmt or _sniff(source, name)
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ValueError("Parquet import needs pyarrow (pip install pyarrow)") from e
+        pf = pq.ParquetFile(source)
+        total, done = pf.metadata.num_rows or 1, 0
+        for batch in pf.iter_batches(batch_size=chunksize):
+            df = batch.to_pandas()
+            chunk = df.astype(str).where(df.notna(), "")
+            chunk.index = pd.RangeIndex(done, done + len(chunk))
+            done += len(chunk)
+            yield chunk, min(1.0, done / total)
+        return
+    size = getattr(source, "size", None)
+    if size is None and hasattr(source, "seek"):
+        pos = source.tell(); size = source.seek(0, os.SEEK_END); source.seek(pos)
+    reader = pd.read_csv(source, chunksize=chunksize, dtype=str, keep_default_na=False, skipinitialspace=True,
+                         compression="gzip" if fmt == "csv.gz" else None)
+    for chunk in reader:
+        yield chunk, (min(1.0, source.tell() / size) if size and hasattr(source, "tell") else None)
+
+
+def import_frame(conn, chunk: pd.DataFrame, spec: ImportSpec, report: ImportReport) -> ImportReport:
+    """Normalize, dedupe and upsert one all-string frame of raw rows on `conn`, accumulating into `report`."""
+    std, errors = spec.normalize(chunk)
+    report.rows += len(chunk)
+    report.error_count += len(errors)
+    report.errors += errors[:max(0, MAX_ERRORS - len(report.errors))]
+    std = _assign_ids(std, spec)
+    unique = std.drop_duplicates("id", keep="last")
+    report.duplicates += len(std) - len(unique)
+    todo = spec.prepare(conn, unique) if spec.prepare else unique
+    written = write_rows(conn, todo, spec)
+    report.imported += written
+    report.unchanged += len(unique) - written
+    return report
+
+
+def stream_import(connect: Callable, source, spec: ImportSpec, chunksize: int = DEFAULT_CHUNKSIZE,
+                  name: Optional[str] = None, commit_every: Optional[int] = None,
+                  on_progress: Optional[Callable[[int, Optional[float]], None]] = None) -> ImportReport:
+    """Import `source` into `spec.table`. `connect()` returns a connection context manager that commits on success
+    (e.g. `w2f_db.get_pool(path).connection`); with `commit_every=None` the whole file is one transaction and any
+    exception rolls it all back. `on_progress(rows_done, fraction or None)` is called after each chunk."""
+    started = time.perf_counter()
+    report = ImportReport()
+    with connect() as conn:
+        for i, (chunk, frac) in enumerate(iter_chunks(source, chunksize, name), 1):
+            import_frame(conn, chunk, spec, report)
+            if commit_every and i % commit_every == 0 and conn.in_transaction: conn.commit()
+            if on_progress: on_progress(report.rows, frac)
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def bulk_import_buyers(connect: Callable, source, **kwargs) -> ImportReport:
+    return stream_import(connect, source, BUYER_IMPORT, **kwargs)
+
+
+def import_file(db_path: str, path, spec: ImportSpec, chunksize: int = DEFAULT_CHUNKSIZE,
+                on_progress: Optional[Callable[[int, Optional[float]], None]] = None) -> ImportReport:
+    """Headless entry point for vendor dumps on disk (any size): batched commits every `COMMIT_EVERY` chunks."""
+    with open(path, "rb") as fh:
+        return stream_import(get_pool(db_path).connection, fh, spec, chunksize, name=Path(path).name,
+                             commit_every=COMMIT_EVERY, on_progress=on_progress)
@@ -0,0 +1,91 @@
+"""
+WTF (Wholesale2Flip) — Dashboard KPIs
+- `kpis(path, group)`: aggregate-only queries (COUNT/SUM/AVG/GROUP BY run in SQLite, never full-table reads)
+- Results are cached process-wide, so every session shares them; the cache key carries the pool's write version
+  of each table the group reads, so writing `leads` invalidates lead KPIs only (`KPI_TTL` bounds staleness from
+  writers outside this process)
+- `summarize(deals, leads)`: the same tiles for the session-state apps (app.py, streamlit_app_main.py)
+"""
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from w2f_cache import TTLCache
+from w2f_db import get_pool
+
+KPI_TTL = float(os.environ.get("WTF_KPI_TTL", 60))
+HOT_SCORE = 85
+CLOSED_STAGES = ("Closed",)
+INACTIVE_STAGES = ("Closed", "Dead", "Lost")
+
+# group -> (tables read, SQL); each query returns one row (or a GROUP BY result for *_by_* groups)
+FIXED_KPIS: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    "leads": (("leads",), f"""
+        SELECT (SELECT COUNT(*) FROM leads) AS leads,
+               (SELECT COUNT(*) FROM leads WHERE score >= {HOT_SCORE}) AS hot_leads,
+               (SELECT AVG(score) FROM leads WHERE score >= {HOT_SCORE}) AS hot_avg_score"""),
+    "deals": (("deals",), """
+        SELECT (SELECT COUNT(*) FROM deals) AS deals,
+               (SELECT COUNT(*) FROM deals WHERE grade = 'A') AS grade_a,
+               (SELECT TOTAL(offer_cash) FROM deals) AS pipeline_value,
+               (SELECT TOTAL(MAX(mao75 - mao70, 0)) FROM deals WHERE grade IN ('A', 'B')) AS projected_spread"""),
+    "buyers": (("buyers",), """
+        SELECT COUNT(*) AS buyers, TOTAL(verified) AS verified, TOTAL(cash_available) AS buyer_cash FROM buyers"""),
+    "lead_scores_by_bucket": (("leads",), """
+        SELECT (score / 10) * 10 AS bucket, COUNT(*) AS leads FROM leads
+        WHERE score IS NOT NULL GROUP BY bucket ORDER BY bucket"""),
+}
+
+_cache = TTLCache(max_size=512, ttl=KPI_TTL)
+
+
+def kpis(path: str, group: str, queries: Dict[str, Tuple[Tuple[str, ...], str]] = FIXED_KPIS):
+    """One KPI group for the DB at `path`: a dict for single-row groups, a list of dicts for `*_by_*` groups."""
+    tables, sql = queries[group]
+    pool = get_pool(path)
+    key = (os.path.abspath(path), group, pool.table_versions(*tables))
+    value = _cache.get(key)
+    if value is None:
+        with pool.connection() as conn:
+            cur = conn.execute(sql)
+            cols = [d[0] for d in cur.description]
+            rows = [dict(zip(cols, r)) for r in cur.fetchall()]
+        value = rows if "_by_" in group else rows[0]
+        _cache.set(key, value)
+    return value
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _cache.stats()
+
+
+def money(value: Optional[float]) -> str:
+    """$950 / $125K / $1.2M tiles."""
+    v = float(value or 0)
+    if abs(v) >= 1e6: return f"${v / 1e6:.1f}M"
+    if abs(v) >= 1e3: return f"${v / 1e3:.0f}K"
+    return f"${v:,.0f}"
+
+
+def summarize(deals: Iterable[Dict], leads: Iterable[Dict], revenue: Callable[[Dict], float],
+              pipeline: Callable[[Dict], float], status_key: str = "status") -> Dict[str, Any]:
+    """Dashboard tiles from in-memory deal/lead records, one pass each. `revenue(d)` is counted for closed deals,
+    `pipeline(d)` for active ones."""
+    out = {"revenue": 0.0, "closed": 0, "pipeline_value": 0.0, "active": 0, "deals": 0, "grade_a": 0,
+           "leads": 0, "hot_leads": 0, "hot_avg_score": None, "conversion": None}
+    for d in deals:
+        out["deals"] += 1
+        out["grade_a"] += d.get("grade") == "A"
+        status = d.get(status_key)
+        if status in CLOSED_STAGES:
+            out["closed"] += 1; out["revenue"] += float(revenue(d) or 0)
+        elif status not in INACTIVE_STAGES:
+            out["active"] += 1; out["pipeline_value"] += float(pipeline(d) or 0)
+    hot: List[float] = []
+    for lead in leads:
+        out["leads"] += 1
+        score = lead.get("score")
+        if score is not None and score >= HOT_SCORE: hot.append(score)
+    out["hot_leads"] = len(hot)
+    if hot: out["hot_avg_score"] = sum(hot) / len(hot)
+    if out["deals"]: out["conversion"] = out["closed"] / out["deals"] * 100
+    return out
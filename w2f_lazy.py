@@ -0,0 +1,104 @@
+"""
+WTF (Wholesale2Flip) — Lazy Imports & Startup Profile
+- `lazy(name)`: a module proxy that imports `name` on first attribute access, so heavy optional packages (plotly,
+  reportlab, PyPDF2) cost nothing on a cold start until a page actually charts or renders a PDF
+- `available(name)`: whether the top-level package is installed, via `importlib.util.find_spec` (no import); use it
+  for the `*_OK` flags that used to come from a try/except import
+- `profile_imports()` / `end_profile()`: with `WTF_IMPORT_PROFILE` set, times every module imported between the two
+  calls (cumulative and self ms, like `python -X importtime`); `import_report()` lists them, slowest first, together
+  with the time each `lazy` module took on first use
+"""
+import builtins
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+PROFILE = bool(os.environ.get("WTF_IMPORT_PROFILE"))
+
+_lazy_loads: Dict[str, float] = {}   # module -> ms spent importing it on first use
+_imports: Dict[str, List[float]] = {}  # module -> [cumulative ms, self ms] while profiling
+_startup: Dict[str, Optional[float]] = {"started": None, "ms": None}
+_lock = threading.Lock()
+_local = threading.local()
+_real_import = builtins.__import__
+
+
+@lru_cache(maxsize=None)
+def available(name: str) -> bool:
+    return importlib.util.find_spec(name.partition(".")[0]) is not None
+
+
+class LazyModule:
+    """Stands in for a module until an attribute is read; the import error (if any) surfaces at that point."""
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self):
+        mod = self._module
+        if mod is None:
+            t = time.perf_counter()
+            mod = importlib.import_module(self._name)
+            _lazy_loads.setdefault(self._name, (time.perf_counter() - t) * 1000)
+            object.__setattr__(self, "_module", mod)
+        return mod
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r} ({'loaded' if self._module is not None else 'not loaded'})>"
+
+
+def lazy(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _real_import(name, globals, locals, fromlist, level)
+    stack = getattr(_local, "stack", None)
+    if stack is None: stack = _local.stack = []
+    stack.append(0.0)  # time spent in nested first imports
+    t = time.perf_counter()
+    try:
+        return _real_import(name, globals, locals, fromlist, level)
+    finally:
+        ms = (time.perf_counter() - t) * 1000
+        nested = stack.pop()
+        if stack: stack[-1] += ms
+        with _lock: _imports.setdefault(name, [ms, ms - nested])
+
+
+def profile_imports():
+    """Start timing first imports (no-op unless WTF_IMPORT_PROFILE is set, or once a profile was taken)."""
+    if not PROFILE or _startup["started"] is not None: return
+    _startup["started"] = time.perf_counter()
+    builtins.__import__ = _timed_import
+
+
+def end_profile():
+    """Stop timing; the first call records the startup time since `profile_imports()`."""
+    if builtins.__import__ is _timed_import: builtins.__import__ = _real_import
+    if _startup["started"] is not None and _startup["ms"] is None:
+        _startup["ms"] = (time.perf_counter() - _startup["started"]) * 1000
+
+
+def startup_ms() -> Optional[float]:
+    return _startup["ms"]
+
+
+def import_report(top: int = 15) -> List[Dict[str, Any]]:
+    """Slowest imports first: {"module", "cumulative_ms", "self_ms", "lazy"}; lazy rows are first-use loads."""
+    rows = [{"module": m, "cumulative_ms": round(c, 1), "self_ms": round(s, 1), "lazy": False}
+            for m, (c, s) in _imports.items()]
+    rows += [{"module": m, "cumulative_ms": round(ms, 1), "self_ms": round(ms, 1), "lazy": True}
+             for m, ms in _lazy_loads.items()]
+    return sorted(rows, key=lambda r: -r["cumulative_ms"])[:top]
@@ -0,0 +1,123 @@
+"""
+WTF (Wholesale2Flip) — Property Lookup Pipeline
+- Pluggable providers: subclass `LookupProvider` and implement `async fetch(address, city, state)`
+- `lookup_many` fans lookups out on asyncio with bounded concurrency, per-call timeout and retries
+- `run_lookups` is the sync entry point for Streamlit script threads and headless jobs
+- `cached_lookups` puts a `w2f_cache.TTLCache` in front of it: hits return immediately, misses are fetched once
+  even when several sessions ask for the same address at the same time
+- `StubLookupProvider` wraps a local generator (no network) for dev and tests
+"""
+import asyncio
+import concurrent.futures
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+LookupRequest = Tuple[str, str, str]  # (address, city, state)
+ProgressFn = Callable[[int, int], None]  # (done, total)
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.25
+
+
+class LookupProvider:
+    """Base provider. `fetch` returns the property dict used by the analyzer (must include `found`)."""
+    name = "base"
+
+    async def fetch(self, address: str, city: str, state: str) -> Dict:
+        raise NotImplementedError
+
+
+class StubLookupProvider(LookupProvider):
+    """Local provider around a `generate(address, city, state)` function; `latency` simulates a vendor for load tests."""
+    name = "stub"
+
+    def __init__(self, generate: Callable[[str, str, str], Dict], latency: float = 0.0):
+        self.generate = generate
+        self.latency = latency
+
+    async def fetch(self, address, city, state):
+        if self.latency: await asyncio.sleep(self.latency)
+        return self.generate(address, city, state)
+
+
+class ThreadedLookupProvider(LookupProvider):
+    """Adapter for blocking vendor SDKs: runs `fn(address, city, state)` on the default executor."""
+    name = "threaded"
+
+    def __init__(self, fn: Callable[[str, str, str], Dict]):
+        self.fn = fn
+
+    async def fetch(self, address, city, state):
+        return await asyncio.get_running_loop().run_in_executor(None, self.fn, address, city, state)
+
+
+_provider: Optional[LookupProvider] = None
+
+
+def set_provider(provider: LookupProvider):
+    global _provider
+    _provider = provider
+
+
+def get_provider() -> Optional[LookupProvider]:
+    return _provider
+
+
+def _not_found(req: LookupRequest, err: Exception) -> Dict:
+    address, city, state = req
+    return {"found": False, "address": address, "city": city, "state": state,
+            "error": f"{type(err).__name__}: {err}" if str(err) else type(err).__name__}
+
+
+async def _fetch_with_retry(provider, req, sem, timeout, retries, backoff) -> Dict:
+    async with sem:
+        for attempt in range(retries + 1):
+            try:
+                return await asyncio.wait_for(provider.fetch(*req), timeout)
+            except Exception as e:  # timeouts and provider errors are retried alike
+                if attempt == retries: return _not_found(req, e)
+                await asyncio.sleep(backoff * (2 ** attempt))
+
+
+async def lookup_many(provider: LookupProvider, requests: Sequence[LookupRequest],
+                      concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT,
+                      retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                      on_progress: Optional[ProgressFn] = None) -> List[Dict]:
+    """Run every lookup concurrently (at most `concurrency` in flight). Results keep input order;
+    failures come back as `{"found": False, "error": ...}` instead of raising."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+    total, done = len(requests), 0
+    tasks = [asyncio.ensure_future(_fetch_with_retry(provider, r, sem, timeout, retries, backoff)) for r in requests]
+    if on_progress:
+        for fut in asyncio.as_completed(tasks):
+            await fut
+            done += 1
+            on_progress(done, total)
+    return list(await asyncio.gather(*tasks))
+
+
+def run_lookups(requests: Iterable[LookupRequest], provider: Optional[LookupProvider] = None, **kwargs) -> List[Dict]:
+    """Sync wrapper around `lookup_many`; uses the registered provider when none is passed."""
+    provider = provider or get_provider()
+    if provider is None: raise RuntimeError("No property lookup provider registered (call set_provider)")
+    requests = list(requests)
+    if not requests: return []
+    coro = lookup_many(provider, requests, **kwargs)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Already inside an event loop (e.g. notebooks): run on a private loop in a worker thread
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, coro).result()
+
+
+def cached_lookups(cache, requests: Sequence[LookupRequest], key: Callable[..., Hashable],
+                   provider: Optional[LookupProvider] = None, **kwargs) -> List[Dict]:
+    """`run_lookups` through `cache` (a `TTLCache`), keyed on `key(address, city, state)`; only found
+    properties are cached. Concurrent callers missing the same key share one fetch."""
+    by_key = {key(*r): r for r in requests}
+    return cache.get_or_load([key(*r) for r in requests],
+                             lambda miss: run_lookups([by_key[k] for k in miss], provider, **kwargs),
+                             store=lambda p: bool(p.get("found")))
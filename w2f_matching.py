@@ -0,0 +1,297 @@
+"""
+WTF (Wholesale2Flip) — Buyer Matching Engine
+- `BuyerIndex`: inverted (state, city) buckets + property-type bitmasks, built once and updated per upsert
+- Each bucket keeps its buyers sorted by min_price (NumPy arrays) so a price query is a searchsorted + mask;
+  upserts are queued per bucket and spliced into the sorted arrays on the next query that reads the bucket
+- Results come back ranked by verified, then cash_available (same order as the old DataFrame sort)
+- `shared_index(key, loader)`: process-wide instance that survives Streamlit reruns and sessions
+"""
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+ANY = "*"            # bucket for buyers with no city restriction
+NO_MAX_PRICE = 1e9   # same open-ended cap the old `match_buyers` used
+
+
+def tokens(value) -> Set[str]:
+    """Normalize a comma/semicolon-joined string or a list into an upper-cased token set."""
+    if value is None or (isinstance(value, float) and math.isnan(value)): return set()
+    items = value if isinstance(value, (list, tuple, set)) else str(value).replace(";", ",").split(",")
+    return {str(x).strip().upper() for x in items if str(x).strip()}
+
+
+def _num(value, default: float) -> float:
+    try: v = float(value)
+    except (TypeError, ValueError): return default
+    return default if math.isnan(v) else v
+
+
+REBUILD_FRACTION = 0.25  # a bucket with more queued changes than this share of its members is rebuilt instead
+
+
+class _Bucket:
+    __slots__ = ("ids", "arrays", "pending")
+
+    def __init__(self):
+        self.ids: Set = set()
+        self.arrays = None  # built on first query, then patched from `pending`
+        self.pending: Dict = {}  # id -> min_price it has in `arrays` (None if it is not in them yet)
+
+
+class BuyerIndex:
+    """Index over buyer records (dicts with id, states, cities, property_types|types, min/max_price,
+    verified, cash_available|cash). Records are returned as stored."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.records: Dict = {}
+        self._norm: Dict = {}       # id -> (min, max, verified, cash, type mask)
+        self._keys: Dict = {}       # id -> bucket keys it lives in
+        self._buckets: Dict = {}    # (state, city) -> _Bucket
+        self._type_bits: Dict[str, int] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "BuyerIndex":
+        idx = cls()
+        for r in records: idx.upsert(r)
+        return idx
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _type_mask(self, types: Set[str], create: bool) -> int:
+        mask = 0
+        for t in types:
+            if t not in self._type_bits:
+                if not create: continue
+                self._type_bits[t] = 1 << len(self._type_bits)
+            mask |= self._type_bits[t]
+        return mask
+
+    def upsert(self, rec: Dict):
+        bid = rec["id"]
+        cities = tokens(rec.get("cities")) or {ANY}
+        keys = [(s, c) for s in tokens(rec.get("states")) for c in cities]
+        types = tokens(rec.get("property_types", rec.get("types")))
+        with self._lock:
+            self._remove(bid)
+            self.records[bid] = rec
+            self._norm[bid] = (
+                _num(rec.get("min_price"), 0.0), _num(rec.get("max_price"), NO_MAX_PRICE),
+                1 if _num(rec.get("verified"), 0.0) else 0, _num(rec.get("cash_available", rec.get("cash")), 0.0),
+                self._type_mask(types, create=True),
+            )
+            self._keys[bid] = keys
+            for k in keys:
+                b = self._buckets.setdefault(k, _Bucket())
+                b.ids.add(bid)
+                if b.arrays is not None: b.pending.setdefault(bid, None)
+
+    def remove(self, bid):
+        with self._lock:
+            self._remove(bid)
+
+    def _remove(self, bid):
+        for k in self._keys.pop(bid, ()):
+            b = self._buckets[k]
+            b.ids.discard(bid)
+            if not b.ids: del self._buckets[k]
+            elif b.arrays is not None: b.pending.setdefault(bid, self._norm[bid][0])
+        self.records.pop(bid, None); self._norm.pop(bid, None)
+
+    def _columns(self, ids: List):
+        """(ids, min, max, rank, type mask) arrays for `ids`, sorted by min_price."""
+        norm = np.array([self._norm[i][:4] for i in ids], dtype="float64").reshape(-1, 4)
+        masks = np.array([self._norm[i][4] for i in ids], dtype="int64")
+        order = np.argsort(norm[:, 0], kind="stable")
+        # One sortable rank key: verified first, then cash (ascending key == best first)
+        rank = -(norm[order, 2] * 1e15 + norm[order, 3])
+        return np.array(ids, dtype=object)[order], norm[order, 0], norm[order, 1], rank, masks[order]
+
+    def _arrays(self, b: _Bucket):
+        if b.arrays is None or len(b.pending) > REBUILD_FRACTION * len(b.ids):
+            b.arrays, b.pending = self._columns(list(b.ids)), {}
+        elif b.pending:
+            # Drop the stale rows (located by their old min_price), then insert current members at their
+            # searchsorted positions; one O(bucket) copy per array instead of a Python-level rebuild
+            ids, mins = b.arrays[0], b.arrays[1]
+            drop = []
+            for bid, old_min in b.pending.items():
+                if old_min is None: continue
+                lo, hi = np.searchsorted(mins, old_min, side="left"), np.searchsorted(mins, old_min, side="right")
+                drop.append(lo + int(np.flatnonzero(ids[lo:hi] == bid)[0]))
+            cols = [np.delete(a, drop) for a in b.arrays]
+            add = [bid for bid in b.pending if bid in b.ids]
+            if add:
+                new = self._columns(add)
+                at = np.searchsorted(cols[1], new[1], side="right")
+                cols = [np.insert(a, at, v) for a, v in zip(cols, new)]
+            b.arrays, b.pending = tuple(cols), {}
+        return b.arrays
+
+    def match_ids(self, state: str, city: str = "", price: Optional[float] = None,
+                  property_type: Optional[str] = None, limit: Optional[int] = None) -> List:
+        return self._select(state, city, price, property_type, limit)[0]
+
+    def _select(self, state: str, city: str, price: Optional[float], property_type: Optional[str],
+                limit: Optional[int]) -> Tuple[List, int]:
+        st_ = state.strip().upper(); ct = city.strip().upper()
+        keys = [(st_, ANY)] + ([(st_, ct)] if ct and ct != ANY else [])
+        parts = []
+        with self._lock:
+            for k in keys:
+                b = self._buckets.get(k)
+                if b is None: continue
+                ids, mins, maxs, rank, masks = self._arrays(b)
+                n = len(ids) if price is None else int(np.searchsorted(mins, price, side="right"))
+                sel = np.ones(n, dtype=bool) if price is None else (maxs[:n] >= price)
+                if property_type:
+                    bit = self._type_mask({property_type.strip().upper()}, create=False)
+                    sel &= (masks[:n] == 0) | ((masks[:n] & bit) != 0)
+                parts.append((ids[:n][sel], rank[:n][sel]))
+        if not parts: return [], 0
+        ids = np.concatenate([p[0] for p in parts])
+        rank = np.concatenate([p[1] for p in parts])
+        if limit is not None and limit < len(rank):
+            top = np.argpartition(rank, limit)[:limit]
+            return ids[top[np.argsort(rank[top], kind="stable")]].tolist(), len(rank)
+        return ids[np.argsort(rank, kind="stable")].tolist(), len(rank)
+
+    def match(self, state: str, city: str = "", price: Optional[float] = None,
+              property_type: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Buyers whose states include `state`, whose cities include `city` (or are unrestricted), whose
+        buy box contains `price` and who take `property_type` (or list no types); best-ranked first."""
+        ids = self.match_ids(state, city, price, property_type, limit)
+        return [self.records[i] for i in ids]
+
+    def match_top(self, state: str, city: str = "", price: Optional[float] = None,
+                  property_type: Optional[str] = None, limit: int = 10) -> Tuple[List[Dict], int]:
+        """Best `limit` matches and the total number of matching buyers, without materializing the rest."""
+        ids, total = self._select(state, city, price, property_type, limit)
+        return [self.records[i] for i in ids], total
+
+
+_indexes: Dict[str, BuyerIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def shared_index(key: str, loader: Callable[[], Iterable[Dict]]) -> BuyerIndex:
+    """Process-wide index for `key` (e.g. the DB path), built from `loader()` on first use."""
+    idx = _indexes.get(key)
+    if idx is None:
+        with _indexes_lock:
+            idx = _indexes.get(key)
+            if idx is None:
+                idx = _indexes[key] = BuyerIndex.from_records(loader())
+    return idx
+
+
+def drop_shared_index(key: str):
+    with _indexes_lock:
+        _indexes.pop(key, None)
+
+
+# ---------- Bulk (many deals x many buyers) ----------
+DEAL_PRICE_COLUMNS = ["price", "offer_price", "purchase_price", "mao70", "mao_70", "list_price"]
+DEAL_TYPE_COLUMNS = ["property_type", "type"]
+BULK_CELL_BUDGET = 8_000_000  # deals x buyers cells evaluated per chunk (bounds peak memory)
+
+
+def _eligibility_table(buyer_col, deal_values: List[str], empty_matches_all: bool):
+    """One boolean buyer row per distinct deal value (+ each deal's row code). Buyers whose token set
+    contains the value pass; with `empty_matches_all`, buyers with no tokens pass every row.
+    Only distinct cell strings are tokenized; buyer lists repeat the same few state/city strings."""
+    import pandas as pd
+
+    cells = buyer_col.map(lambda v: ",".join(map(str, v)) if isinstance(v, (list, tuple, set)) else v)
+    codes, uniques = pd.factorize(cells, use_na_sentinel=True)
+    by_token: Dict[str, List[int]] = {}
+    empty = [u for u, cell in enumerate(uniques) if not tokens(cell)]
+    for u, cell in enumerate(uniques):
+        for t in tokens(cell): by_token.setdefault(t, []).append(u)
+    base = (np.isin(codes, empty) | (codes < 0)) if empty_matches_all else np.zeros(len(codes), bool)
+    row_of: Dict[str, int] = {}; rows = []
+    out = np.empty(len(deal_values), dtype=np.int64)
+    for i, v in enumerate(deal_values):
+        if v not in row_of:
+            r = base | np.isin(codes, by_token[v]) if v in by_token else base.copy()
+            row_of[v] = len(rows); rows.append(r)
+        out[i] = row_of[v]
+    return np.vstack(rows), out
+
+
+def _first_token(value) -> str:
+    return next(iter(sorted(tokens(value))), "")
+
+
+def match_deals(deals, buyers, top_k: int = 5, price_col: Optional[str] = None):
+    """Match every deal against every buyer at once and return the top-K buyers per deal.
+
+    `deals` needs state, optional city / property_type and a price column (first of DEAL_PRICE_COLUMNS
+    unless `price_col` is given). `buyers` uses the buyers-table columns (states, cities, property_types,
+    min_price, max_price, verified, cash_available). Eligibility is the same rule as `BuyerIndex.match`,
+    evaluated as chunked NumPy matrices; the result is one row per (deal, rank).
+    """
+    import pandas as pd
+
+    deals = deals.reset_index(drop=True); buyers = buyers.reset_index(drop=True)
+    cols = {c.lower(): c for c in deals.columns}
+    price_col = price_col or next((cols[c] for c in DEAL_PRICE_COLUMNS if c in cols), None)
+    if price_col is None: raise ValueError(f"deals frame needs a price column (one of {DEAL_PRICE_COLUMNS})")
+    type_col = next((cols[c] for c in DEAL_TYPE_COLUMNS if c in cols), None)
+    nd, nb = len(deals), len(buyers)
+    if nd == 0 or nb == 0 or top_k <= 0: return pd.DataFrame(columns=["deal_row", "rank", "buyer_id"])
+
+    def bcol(name, alt=None):
+        c = name if name in buyers else alt
+        return buyers[c] if c in buyers else pd.Series([None] * nb)
+
+    def dcol(name):
+        return [_first_token(v) for v in deals[cols[name]]] if name in cols else [""] * nd
+
+    # Per-distinct-value eligibility rows: deals share a handful of states/cities/types
+    state_t, state_c = _eligibility_table(bcol("states"), dcol("state"), empty_matches_all=False)
+    city_t, city_c = _eligibility_table(bcol("cities"), dcol("city"), empty_matches_all=True)
+    if type_col:
+        type_t, type_c = _eligibility_table(bcol("property_types", "types"), [_first_token(v) for v in deals[type_col]],
+                                            empty_matches_all=True)
+
+    b_min = pd.to_numeric(bcol("min_price"), errors="coerce").fillna(0).to_numpy("float64")
+    b_max = pd.to_numeric(bcol("max_price"), errors="coerce").fillna(NO_MAX_PRICE).to_numpy("float64")
+    ver = pd.to_numeric(bcol("verified"), errors="coerce").fillna(0).to_numpy("float64") != 0
+    cash = pd.to_numeric(bcol("cash_available", "cash"), errors="coerce").fillna(0).to_numpy("float64")
+    rank = -(ver * 1e15 + cash)
+    d_price = pd.to_numeric(deals[price_col], errors="coerce").to_numpy("float64")
+
+    # Columns pre-sorted best-first, so a deal's top-K is just its first K eligible columns
+    order = np.argsort(rank, kind="stable")
+    state_t, city_t, b_min, b_max = state_t[:, order], city_t[:, order], b_min[order], b_max[order]
+    if type_col: type_t = type_t[:, order]
+
+    k = min(top_k, nb)
+    top_idx = np.zeros((nd, k), dtype=np.int64); top_ok = np.zeros((nd, k), dtype=bool)
+    step = max(1, BULK_CELL_BUDGET // nb)
+    for s in range(0, nd, step):
+        e = min(nd, s + step)
+        p = d_price[s:e, None]
+        ok = state_t[state_c[s:e]] & city_t[city_c[s:e]] & (b_min[None, :] <= p) & (p <= b_max[None, :])
+        if type_col: ok &= type_t[type_c[s:e]]
+        for i, row in enumerate(ok, start=s):
+            hit = np.flatnonzero(row)[:k]
+            top_idx[i, :len(hit)] = order[hit]; top_ok[i, :len(hit)] = True
+
+    deal_row, r = np.nonzero(top_ok)
+    buyer_row = top_idx[deal_row, r]
+    out = pd.DataFrame({"deal_row": deal_row, "rank": r + 1})
+    for c in [c for c in ("address", "title", "city", "state") if c in cols]:
+        out[f"deal_{c}"] = deals[cols[c]].to_numpy()[deal_row]
+    out["deal_price"] = d_price[deal_row]
+    out["buyer_id"] = buyers["id"].to_numpy()[buyer_row] if "id" in buyers else buyer_row
+    for c in [c for c in ("name", "email", "phone") if c in buyers]:
+        out[f"buyer_{c}"] = buyers[c].to_numpy()[buyer_row]
+    for c in [c for c in ("verified", "cash_available", "min_price", "max_price") if c in buyers]:
+        out[c] = buyers[c].to_numpy()[buyer_row]
+    return out
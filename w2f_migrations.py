@@ -0,0 +1,274 @@
+"""
+WTF (Wholesale2Flip) — Versioned SQLite Migrations
+- `migrate(conn, MIGRATIONS)` applies pending steps in order, one transaction each, recorded in `schema_migrations`
+- Steps are SQL scripts or `fn(conn)` callables; baselines use IF NOT EXISTS so existing DB files upgrade in place
+- `PLATFORM_MIGRATIONS` (wtf_app.py / wtf_platform.db) and `FIXED_MIGRATIONS` (wtf_app_fixed.py / wtf.db)
+- Buyer states/cities are mirrored into indexed join tables; keep them current with `sync_buyer_areas`
+- `sheet_sync_state` / `sheet_row_hashes` hold the last Google Sheets revision and per-row checksums (w2f_sheets)
+- Buyers carry `dedupe_key` + `content_hash`; existing duplicates are compacted once before the unique index (w2f_dedupe)
+- `buyer_keys` maps every email / phone / name key a buyer was imported with to its id (w2f_dedupe.resolve_buyers)
+- Deal stage changes are logged by trigger to the append-only `deal_stage_events`, and `deal_stage_counts` holds a
+  live per-stage count, so the funnel never scans `deals` (w2f_pipeline)
+- Every column a grid can sort on has an index, so keyset pages never sort the whole table (w2f_grid)
+"""
+import sqlite3
+from datetime import datetime
+from typing import Callable, Iterable, List, Sequence, Tuple, Union
+
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+Migration = Tuple[int, str, Step]
+
+
+def _split(value) -> List[str]:
+    if value is None: return []
+    return sorted({t.strip().upper() for t in str(value).replace(";", ",").split(",") if t.strip()})
+
+
+def sync_buyer_areas(conn: sqlite3.Connection, rows: Iterable[Tuple[str, str, str]]):
+    """Rewrite buyer_states / buyer_cities for (buyer_id, states, cities) rows — call after writing buyers."""
+    rows = list(rows)
+    ids = [(r[0],) for r in rows]
+    conn.executemany("DELETE FROM buyer_states WHERE buyer_id=?", ids)
+    conn.executemany("DELETE FROM buyer_cities WHERE buyer_id=?", ids)
+    conn.executemany("INSERT OR IGNORE INTO buyer_states (state, buyer_id) VALUES (?,?)",
+                     [(s, bid) for bid, states, _ in rows for s in _split(states)])
+    conn.executemany("INSERT OR IGNORE INTO buyer_cities (city, buyer_id) VALUES (?,?)",
+                     [(c, bid) for bid, _, cities in rows for c in _split(cities)])
+
+
+def _backfill_buyer_areas(conn: sqlite3.Connection):
+    cur = conn.execute("SELECT id, states, cities FROM buyers")
+    while True:
+        batch = cur.fetchmany(5000)
+        if not batch: break
+        sync_buyer_areas(conn, batch)
+
+
+def _compact_buyers(conn: sqlite3.Connection):
+    from w2f_dedupe import compact_buyers  # w2f_dedupe imports this module
+    compact_buyers(conn)
+
+
+def _backfill_buyer_keys(conn: sqlite3.Connection):
+    import pandas as pd
+    from w2f_dedupe import record_keys
+    cur = conn.execute("SELECT id, name, email, phone FROM buyers")
+    while True:
+        batch = cur.fetchmany(5000)
+        if not batch: break
+        record_keys(conn, pd.DataFrame(batch, columns=["id", "name", "email", "phone"]).fillna(""))
+
+
+PLATFORM_MIGRATIONS: List[Migration] = [
+    (1, "baseline", """
+        CREATE TABLE IF NOT EXISTS properties (
+            id TEXT PRIMARY KEY, address TEXT, city TEXT, state TEXT, zip_code TEXT,
+            property_type TEXT, bedrooms INTEGER, bathrooms REAL, square_feet INTEGER,
+            year_built INTEGER, list_price REAL, arv REAL DEFAULT 0, rehab_cost REAL DEFAULT 0,
+            max_offer REAL DEFAULT 0, profit_potential REAL DEFAULT 0, condition TEXT DEFAULT 'fair',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE IF NOT EXISTS leads (
+            id TEXT PRIMARY KEY, first_name TEXT, last_name TEXT, phone TEXT, email TEXT,
+            property_address TEXT, motivation TEXT, timeline TEXT, source TEXT,
+            status TEXT DEFAULT 'new', score INTEGER DEFAULT 0, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE IF NOT EXISTS buyers (
+            id TEXT PRIMARY KEY, name TEXT, email TEXT, phone TEXT,
+            property_types TEXT, min_price REAL, max_price REAL, states TEXT, cities TEXT, deal_types TEXT,
+            verified BOOLEAN DEFAULT 0, proof_of_funds BOOLEAN DEFAULT 0, cash_available REAL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE IF NOT EXISTS deals (
+            id TEXT PRIMARY KEY, title TEXT, property_id TEXT, buyer_id TEXT, lead_id TEXT,
+            purchase_price REAL, assignment_fee REAL, status TEXT DEFAULT 'lead',
+            stage TEXT DEFAULT 'Prospecting', probability INTEGER DEFAULT 10,
+            contract_date TIMESTAMP, closing_date TIMESTAMP, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE IF NOT EXISTS contracts (
+            id TEXT PRIMARY KEY, deal_id TEXT, contract_type TEXT, purchase_price REAL, earnest_money REAL,
+            closing_date TIMESTAMP, buyer_name TEXT, seller_name TEXT, property_address TEXT, state TEXT,
+            status TEXT DEFAULT 'draft', pdf_path TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE IF NOT EXISTS lois (
+            id TEXT PRIMARY KEY, lead_id TEXT, property_address TEXT, offer_price REAL, state TEXT, terms TEXT,
+            status TEXT DEFAULT 'draft', pdf_path TEXT, sent_date TIMESTAMP, response_date TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    """),
+    (2, "secondary_indexes", """
+        CREATE INDEX IF NOT EXISTS ix_properties_created ON properties(created_at);
+        CREATE INDEX IF NOT EXISTS ix_properties_state_city ON properties(state, city);
+        CREATE INDEX IF NOT EXISTS ix_leads_created ON leads(created_at);
+        CREATE INDEX IF NOT EXISTS ix_leads_status_score ON leads(status, score);
+        CREATE INDEX IF NOT EXISTS ix_leads_score ON leads(score);
+        CREATE INDEX IF NOT EXISTS ix_buyers_created ON buyers(created_at);
+        CREATE INDEX IF NOT EXISTS ix_buyers_rank ON buyers(verified DESC, cash_available DESC);
+        CREATE INDEX IF NOT EXISTS ix_buyers_price ON buyers(min_price, max_price);
+        CREATE INDEX IF NOT EXISTS ix_deals_created ON deals(created_at);
+        CREATE INDEX IF NOT EXISTS ix_deals_stage_created ON deals(stage, created_at);
+        CREATE INDEX IF NOT EXISTS ix_contracts_created ON contracts(created_at);
+        CREATE INDEX IF NOT EXISTS ix_contracts_deal ON contracts(deal_id);
+        CREATE INDEX IF NOT EXISTS ix_lois_created ON lois(created_at);
+        CREATE INDEX IF NOT EXISTS ix_lois_lead ON lois(lead_id);
+    """),
+    (3, "buyer_area_tables", """
+        CREATE TABLE IF NOT EXISTS buyer_states (
+            state TEXT NOT NULL, buyer_id TEXT NOT NULL, PRIMARY KEY (state, buyer_id)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS buyer_cities (
+            city TEXT NOT NULL, buyer_id TEXT NOT NULL, PRIMARY KEY (city, buyer_id)) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS ix_buyer_states_buyer ON buyer_states(buyer_id);
+        CREATE INDEX IF NOT EXISTS ix_buyer_cities_buyer ON buyer_cities(buyer_id);
+        CREATE TRIGGER IF NOT EXISTS trg_buyers_delete_areas AFTER DELETE ON buyers BEGIN
+            DELETE FROM buyer_states WHERE buyer_id = OLD.id;
+            DELETE FROM buyer_cities WHERE buyer_id = OLD.id;
+        END;
+    """),
+    (4, "buyer_area_backfill", _backfill_buyer_areas),
+    (5, "sheet_sync", """
+        CREATE TABLE IF NOT EXISTS sheet_sync_state (
+            sheet TEXT PRIMARY KEY, revision TEXT, header TEXT, rows INTEGER DEFAULT 0, synced_at TEXT);
+        CREATE TABLE IF NOT EXISTS sheet_row_hashes (
+            sheet TEXT NOT NULL, row INTEGER NOT NULL, hash INTEGER NOT NULL, PRIMARY KEY (sheet, row)) WITHOUT ROWID;
+    """),
+    (6, "buyer_dedupe_columns", """
+        ALTER TABLE buyers ADD COLUMN dedupe_key TEXT;
+        ALTER TABLE buyers ADD COLUMN content_hash INTEGER;
+    """),
+    (7, "buyer_compaction", _compact_buyers),
+    (8, "buyer_dedupe_index", "CREATE UNIQUE INDEX IF NOT EXISTS ux_buyers_dedupe_key ON buyers(dedupe_key);"),
+    (9, "deal_stage_history", """
+        CREATE TABLE IF NOT EXISTS deal_stage_events (
+            id INTEGER PRIMARY KEY, deal_id TEXT NOT NULL, from_stage TEXT, to_stage TEXT NOT NULL,
+            moved_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP);
+        CREATE INDEX IF NOT EXISTS ix_stage_events_deal ON deal_stage_events(deal_id, moved_at);
+        CREATE INDEX IF NOT EXISTS ix_stage_events_moved ON deal_stage_events(moved_at);
+        CREATE INDEX IF NOT EXISTS ix_stage_events_to ON deal_stage_events(to_stage, moved_at);
+        CREATE TABLE IF NOT EXISTS deal_stage_counts (stage TEXT PRIMARY KEY, deals INTEGER NOT NULL DEFAULT 0);
+        INSERT INTO deal_stage_events (deal_id, from_stage, to_stage, moved_at)
+            SELECT id, NULL, stage, COALESCE(created_at, CURRENT_TIMESTAMP) FROM deals WHERE stage IS NOT NULL;
+        INSERT OR REPLACE INTO deal_stage_counts (stage, deals)
+            SELECT stage, COUNT(*) FROM deals WHERE stage IS NOT NULL GROUP BY stage;
+        CREATE TRIGGER IF NOT EXISTS trg_deals_stage_insert AFTER INSERT ON deals WHEN NEW.stage IS NOT NULL BEGIN
+            INSERT INTO deal_stage_events (deal_id, from_stage, to_stage, moved_at)
+                VALUES (NEW.id, NULL, NEW.stage, COALESCE(NEW.created_at, CURRENT_TIMESTAMP));
+            INSERT INTO deal_stage_counts (stage, deals) VALUES (NEW.stage, 1)
+                ON CONFLICT(stage) DO UPDATE SET deals = deals + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_deals_stage_update AFTER UPDATE OF stage ON deals
+        WHEN OLD.stage IS NOT NEW.stage BEGIN
+            INSERT INTO deal_stage_events (deal_id, from_stage, to_stage) VALUES (NEW.id, OLD.stage, NEW.stage);
+            UPDATE deal_stage_counts SET deals = deals - 1 WHERE stage = OLD.stage;
+            INSERT INTO deal_stage_counts (stage, deals) SELECT NEW.stage, 1 WHERE NEW.stage IS NOT NULL
+                ON CONFLICT(stage) DO UPDATE SET deals = deals + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_deals_stage_delete AFTER DELETE ON deals BEGIN
+            UPDATE deal_stage_counts SET deals = deals - 1 WHERE stage = OLD.stage;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_stage_events_no_update BEFORE UPDATE ON deal_stage_events BEGIN
+            SELECT RAISE(ABORT, 'deal_stage_events is append-only');
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_stage_events_no_delete BEFORE DELETE ON deal_stage_events BEGIN
+            SELECT RAISE(ABORT, 'deal_stage_events is append-only');
+        END;
+    """),
+    (10, "buyer_keys", """
+        CREATE TABLE IF NOT EXISTS buyer_keys (key TEXT PRIMARY KEY, buyer_id TEXT NOT NULL) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS ix_buyer_keys_buyer ON buyer_keys(buyer_id);
+        CREATE TRIGGER IF NOT EXISTS trg_buyers_delete_keys AFTER DELETE ON buyers BEGIN
+            DELETE FROM buyer_keys WHERE buyer_id = OLD.id;
+        END;
+    """),
+    (11, "buyer_keys_backfill", _backfill_buyer_keys),
+    (12, "deal_stage_clear", """
+        DROP TRIGGER IF EXISTS trg_deals_stage_update;
+        CREATE TRIGGER trg_deals_stage_update AFTER UPDATE OF stage ON deals
+        WHEN OLD.stage IS NOT NEW.stage BEGIN
+            INSERT INTO deal_stage_events (deal_id, from_stage, to_stage)
+                SELECT NEW.id, OLD.stage, NEW.stage WHERE NEW.stage IS NOT NULL;
+            UPDATE deal_stage_counts SET deals = deals - 1 WHERE stage = OLD.stage;
+            INSERT INTO deal_stage_counts (stage, deals) SELECT NEW.stage, 1 WHERE NEW.stage IS NOT NULL
+                ON CONFLICT(stage) DO UPDATE SET deals = deals + 1;
+        END;
+    """),
+    # w2f_grid pages with ORDER BY col, rowid; a one-column index already ends in rowid, so it serves both the
+    # sort and the keyset cursor. ix_buyers_price (min_price, max_price) breaks min_price ties on max_price.
+    (13, "grid_sort_indexes", """
+        CREATE INDEX IF NOT EXISTS ix_buyers_name ON buyers(name);
+        CREATE INDEX IF NOT EXISTS ix_buyers_cash ON buyers(cash_available);
+        CREATE INDEX IF NOT EXISTS ix_buyers_min_price ON buyers(min_price);
+        CREATE INDEX IF NOT EXISTS ix_buyers_max_price ON buyers(max_price);
+    """),
+]
+
+FIXED_MIGRATIONS: List[Migration] = [
+    (1, "baseline", """
+        CREATE TABLE IF NOT EXISTS users(
+            id INTEGER PRIMARY KEY, username TEXT UNIQUE, password TEXT, role TEXT);
+        CREATE TABLE IF NOT EXISTS leads(
+            id INTEGER PRIMARY KEY, name TEXT, phone TEXT, email TEXT,
+            address TEXT, city TEXT, state TEXT, zip TEXT,
+            status TEXT, source TEXT, score INTEGER, notes TEXT, created_at TEXT);
+        CREATE TABLE IF NOT EXISTS deals(
+            id INTEGER PRIMARY KEY, address TEXT, arv REAL, rehab REAL, offer_cash REAL,
+            offer_subto REAL, offer_seller_fin REAL, mao70 REAL, mao75 REAL,
+            grade TEXT, strategy TEXT, created_at TEXT);
+        CREATE TABLE IF NOT EXISTS buyers(
+            id INTEGER PRIMARY KEY, name TEXT, email TEXT, phone TEXT,
+            cash_available REAL, verified INTEGER, preferences TEXT, areas TEXT, created_at TEXT);
+        CREATE TABLE IF NOT EXISTS rvm_campaigns(
+            id INTEGER PRIMARY KEY, name TEXT, audio TEXT, recipients INTEGER,
+            cost REAL, response_rate REAL, sent_at TEXT);
+    """),
+    (2, "secondary_indexes", """
+        CREATE INDEX IF NOT EXISTS ix_leads_created ON leads(created_at);
+        CREATE INDEX IF NOT EXISTS ix_leads_score ON leads(score);
+        CREATE INDEX IF NOT EXISTS ix_leads_status ON leads(status);
+        CREATE INDEX IF NOT EXISTS ix_deals_created ON deals(created_at);
+        CREATE INDEX IF NOT EXISTS ix_deals_grade ON deals(grade);
+        CREATE INDEX IF NOT EXISTS ix_buyers_created ON buyers(created_at);
+        CREATE INDEX IF NOT EXISTS ix_rvm_sent ON rvm_campaigns(sent_at);
+    """),
+    (3, "grid_sort_indexes", """
+        CREATE INDEX IF NOT EXISTS ix_leads_name ON leads(name);
+        CREATE INDEX IF NOT EXISTS ix_deals_arv ON deals(arv);
+        CREATE INDEX IF NOT EXISTS ix_deals_grade_created ON deals(grade, created_at);
+        CREATE INDEX IF NOT EXISTS ix_buyers_name ON buyers(name);
+        CREATE INDEX IF NOT EXISTS ix_buyers_cash ON buyers(cash_available);
+    """),
+]
+
+
+def _statements(script: str) -> List[str]:
+    """Split a migration script into statements (sqlite3.complete_statement keeps trigger bodies whole)."""
+    out, buf = [], ""
+    for line in script.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            if buf.strip(): out.append(buf.strip())
+            buf = ""
+    if buf.strip(): out.append(buf.strip())
+    return out
+
+
+def applied_versions(conn: sqlite3.Connection) -> List[int]:
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT)")
+    return [r[0] for r in conn.execute("SELECT version FROM schema_migrations ORDER BY version")]
+
+
+def migrate(conn: sqlite3.Connection, migrations: Sequence[Migration]) -> List[int]:
+    """Apply pending migrations; returns the versions applied this call. Each step commits on its own
+    (executescript is avoided because it commits mid-step)."""
+    done = set(applied_versions(conn))
+    if conn.in_transaction: conn.commit()
+    applied = []
+    for version, name, step in sorted(migrations, key=lambda m: m[0]):
+        if version in done: continue
+        try:
+            conn.execute("BEGIN")
+            if callable(step): step(conn)
+            else:
+                for stmt in _statements(step): conn.execute(stmt)
+            conn.execute("INSERT INTO schema_migrations (version, name, applied_at) VALUES (?,?,?)",
+                         (version, name, datetime.now().isoformat(timespec="seconds")))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+    if applied: conn.execute("PRAGMA optimize")  # refresh planner stats so the new indexes get used
+    return applied
@@ -0,0 +1,112 @@
+"""
+WTF (Wholesale2Flip) — Deal Pipeline Board
+- Per-stage counts come from the trigger-maintained `deal_stage_counts` (one row per stage, see w2f_migrations),
+  never from `deals`; cards are read a bounded page per column (`stage_cards`, keyset pages on the
+  (stage, created_at) index) instead of loading every deal
+- Stage moves are applied as one batch in one transaction (`move_deals`; `apply_board` for a board submit); a row
+  only moves if it is still in the stage the board showed, so two people moving one card do not clobber each other
+- Each stage has a process-wide version bumped by moves into or out of it; cached pages are keyed on it, so a
+  move re-reads only the columns involved (`CARDS_TTL` bounds staleness from other writers)
+- Analytics from the append-only `deal_stage_events` log: time in stage, weekly transitions, days to close
+"""
+import os
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from w2f_cache import TTLCache
+from w2f_db import get_pool
+from w2f_grid import GridSpec, fetch_page
+from w2f_kpi import kpis
+
+KANBAN_STAGES = ["Prospecting", "Negotiating", "Under Contract", "Due Diligence", "Closed"]
+CARD_PAGE = 25  # cards per column before "show more"
+CARDS_TTL = float(os.environ.get("WTF_BOARD_TTL", 30))
+
+BOARD_GRID = GridSpec("deals", ["id", "title", "purchase_price", "assignment_fee", "probability", "stage"],
+                      sortable=["created_at"], equals={"stage": KANBAN_STAGES})
+VELOCITY_WEEKS = 12
+
+# Stage tables are written by triggers on `deals`, so the cache key tracks `deals` writes
+PIPELINE_KPIS = {
+    "deals_by_stage": (("deals",), "SELECT stage, deals FROM deal_stage_counts"),
+    "days_in_stage_by_stage": (("deals",), """
+        WITH stays AS (
+            SELECT to_stage AS stage, moved_at,
+                   LEAD(moved_at) OVER (PARTITION BY deal_id ORDER BY moved_at, id) AS left_at
+            FROM deal_stage_events)
+        SELECT stage, COUNT(*) AS stays, SUM(left_at IS NULL) AS current,
+               AVG(julianday(COALESCE(left_at, CURRENT_TIMESTAMP)) - julianday(moved_at)) AS avg_days,
+               AVG(CASE WHEN left_at IS NOT NULL THEN julianday(left_at) - julianday(moved_at) END) AS avg_days_completed
+        FROM stays GROUP BY stage"""),
+    "moves_by_week": (("deals",), f"""
+        SELECT strftime('%Y-%W', moved_at) AS week, to_stage AS stage, COUNT(*) AS moves
+        FROM deal_stage_events
+        WHERE from_stage IS NOT NULL AND moved_at >= datetime('now', '-{VELOCITY_WEEKS * 7} days')
+        GROUP BY week, stage ORDER BY week"""),
+    "close_velocity": (("deals",), """
+        SELECT COUNT(*) AS closed, AVG(days) AS avg_days_to_close FROM (
+            SELECT julianday(MIN(CASE WHEN to_stage = 'Closed' THEN moved_at END)) - julianday(MIN(moved_at)) AS days
+            FROM deal_stage_events GROUP BY deal_id HAVING MAX(to_stage = 'Closed'))"""),
+}
+
+_versions: Dict[Tuple[str, str], int] = {}
+_cards = TTLCache(max_size=256, ttl=CARDS_TTL)
+
+
+def stage_version(path: str, stage: str) -> int:
+    return _versions.get((os.path.abspath(path), stage), 0)
+
+
+def _bump(path: str, stages):
+    for s in stages:
+        key = (os.path.abspath(path), s)
+        _versions[key] = _versions.get(key, 0) + 1
+
+
+def stage_counts(path: str) -> Dict[str, int]:
+    rows = kpis(path, "deals_by_stage", PIPELINE_KPIS)
+    counts = {r["stage"]: r["deals"] for r in rows}
+    return {s: counts.get(s, 0) for s in KANBAN_STAGES}
+
+
+def stage_cards(path: str, stage: str, limit: int = CARD_PAGE) -> pd.DataFrame:
+    """Newest `limit` deals in `stage` (cached until a move touches the stage)."""
+    key = (os.path.abspath(path), stage, int(limit), stage_version(path, stage))
+    df = _cards.get(key)
+    if df is None:
+        with get_pool(path).connection() as conn:
+            df, _ = fetch_page(conn, BOARD_GRID, "created_at", True, [("stage", "=", stage)], page_size=limit)
+        _cards.set(key, df)
+    return df.copy()
+
+
+def board_moves(edits: Dict[str, Dict], ids: Dict[str, List[str]]) -> Dict[str, Tuple[str, str]]:
+    """{deal_id: (from_stage, to_stage)} from each column's data_editor `edited_rows` ({row: {"stage": ...}}) and the
+    card ids the column was rendered with."""
+    moves = {}
+    for stage, rows in edits.items():
+        shown = ids.get(stage, [])
+        for row, change in rows.items():
+            to = change.get("stage")
+            if to and to != stage and int(row) < len(shown): moves[shown[int(row)]] = (stage, to)
+    return moves
+
+
+def apply_board(path: str, edits: Dict[str, Dict], ids: Dict[str, List[str]]) -> Tuple[int, int]:
+    """Commit a board submit in one transaction; returns (moved, requested). Moves of cards that already left the
+    column they were shown in are skipped."""
+    moves = board_moves(edits, ids)
+    return move_deals(path, moves), len(moves)
+
+
+def move_deals(path: str, moves: Dict[str, Tuple[str, str]]) -> int:
+    """Apply {deal_id: (from_stage, to_stage)} in one transaction; returns the number of deals moved."""
+    moves = {d: (a, b) for d, (a, b) in moves.items() if a != b}
+    if not moves: return 0
+    rows: List[Tuple[str, str, str]] = [(b, d, a) for d, (a, b) in moves.items()]
+    with get_pool(path).connection() as conn:
+        # rowcount counts only the deals rows; total_changes would also count the stage-log trigger's writes
+        moved = conn.executemany("UPDATE deals SET stage=? WHERE id=? AND stage=?", rows).rowcount
+    _bump(path, {s for pair in moves.values() for s in pair})
+    return moved
@@ -0,0 +1,53 @@
+"""
+WTF (Wholesale2Flip) — Shared Process Pool
+- `pool_map(fn, chunks, workers)`: maps over one long-lived `ProcessPoolExecutor` per worker count, created on
+  first use and reused by every batch (document rendering, Monte Carlo pipelines), so worker startup is paid once
+- Workers are started with "spawn", never fork: the Streamlit server is multi-threaded, and a forked child can
+  deadlock on a lock (import lock, logging) another thread held at fork time
+- A pool whose worker died is discarded and rebuilt on the next call
+- Spawned workers import the entry script as `__mp_main__`, so the apps keep `main()` behind their
+  `if __name__ == "__main__"` guard
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    pool = _pools.get(workers)
+    if pool is None:
+        with _lock:
+            pool = _pools.get(workers)
+            if pool is None:
+                pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers,
+                                                             mp_context=multiprocessing.get_context("spawn"))
+    return pool
+
+
+def _discard(workers: int, pool: ProcessPoolExecutor):
+    with _lock:
+        if _pools.get(workers) is pool: del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def pool_map(fn: Callable[..., T], chunks: Iterable, workers: int) -> Iterator[T]:
+    """`fn(chunk)` for every chunk on the shared pool, results in input order."""
+    pool = process_pool(workers)
+    try:
+        yield from pool.map(fn, chunks)
+    except BrokenProcessPool:
+        _discard(workers, pool)
+        raise
+
+
+def shutdown_pools():
+    with _lock:
+        pools = list(_pools.values()); _pools.clear()
+    for pool in pools: pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,118 @@
+"""
+WTF (Wholesale2Flip) — Monte Carlo Deal Risk
+- Samples ARV, rehab overrun, days on market and financing-rate changes from configurable distributions (`Dist`,
+  `RiskConfig`) and prices every draw as a flip bought at the offer price — one NumPy pass per deal, no Python loop
+- `simulate_deal`: 100k draws in a few milliseconds; returns profit percentiles, mean and probability of loss
+- `simulate_pipeline`: many deals, fanned out to the shared spawn process pool (w2f_procs) above `POOL_THRESHOLD` deals
+"""
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from w2f_procs import pool_map
+
+DEFAULT_DRAWS = 100_000
+PERCENTILES = (5, 25, 50, 75, 95)
+POOL_THRESHOLD = 20  # deals; below this the pool's startup costs more than it saves
+MAX_WORKERS = int(os.environ.get("WTF_RISK_WORKERS", min(8, os.cpu_count() or 1)))
+
+
+@dataclass(frozen=True)
+class Dist:
+    """A sampling distribution. kind: "fixed" (a), "uniform" (a..b), "normal" (mean a, sd b),
+    "triangular" (min a, mode b, max c) or "lognormal" (median a, sigma b)."""
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+    c: float = 0.0
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        if self.kind == "fixed": return np.full(n, self.a)
+        if self.kind == "uniform": return rng.uniform(self.a, self.b, n)
+        if self.kind == "normal": return rng.normal(self.a, self.b, n)
+        if self.kind == "triangular":
+            return rng.triangular(self.a, self.b, self.c, n) if self.c > self.a else np.full(n, self.b)
+        if self.kind == "lognormal": return self.a * rng.lognormal(0.0, self.b, n)
+        raise ValueError(f"unknown distribution kind: {self.kind!r}")
+
+
+@dataclass(frozen=True)
+class RiskConfig:
+    arv_factor: Dist = Dist("normal", 1.0, 0.08)              # realized ARV / estimated ARV
+    rehab_overrun: Dist = Dist("triangular", -0.05, 0.10, 0.50)  # fraction over (under) the rehab budget
+    days_on_market: Dist = Dist("triangular", 30, 75, 210)      # purchase to sale closing, incl. rehab
+    rate_change: Dist = Dist("normal", 0.0, 0.01)               # shift in the financing rate over the hold
+    rate: float = 0.11            # hard-money rate (APR)
+    loan_to_cost: float = 0.85    # financed share of purchase + rehab
+    selling_cost: float = 0.06    # agent + closing, share of sale price
+    closing_cost: float = 0.02    # acquisition closing, share of purchase price
+    annual_carry: float = 3000.0  # taxes + insurance + utilities per year
+
+
+DEFAULT_RISK = RiskConfig()
+
+
+@dataclass
+class RiskResult:
+    draws: int
+    mean: float
+    prob_loss: float
+    percentiles: Dict[int, float] = field(default_factory=dict)
+    roi_median: float = 0.0
+    hist: Optional[np.ndarray] = None   # sampled profits (only when keep_samples=True)
+
+    def as_row(self) -> Dict[str, float]:
+        row = {k: v for k, v in asdict(self).items() if k not in ("percentiles", "hist")}
+        row.update({f"p{p}": v for p, v in self.percentiles.items()})
+        return row
+
+
+def simulate_profits(arv: float, rehab: float, purchase: float, fee: float = 0.0, config: RiskConfig = DEFAULT_RISK,
+                     draws: int = DEFAULT_DRAWS, seed: Optional[int] = None) -> np.ndarray:
+    """Flip profit per draw for a deal bought at `purchase` (e.g. MAO 70%) with `fee` paid on top."""
+    rng = np.random.default_rng(seed)
+    sale = arv * np.maximum(config.arv_factor.sample(rng, draws), 0.0)
+    rehab_cost = rehab * (1 + np.maximum(config.rehab_overrun.sample(rng, draws), -1.0))
+    years = np.maximum(config.days_on_market.sample(rng, draws), 0.0) / 365
+    rate = np.maximum(config.rate + config.rate_change.sample(rng, draws), 0.0)
+    loan = config.loan_to_cost * (purchase + rehab_cost)
+    carry = loan * rate * years + config.annual_carry * years
+    return (sale * (1 - config.selling_cost) - purchase * (1 + config.closing_cost) - fee - rehab_cost - carry)
+
+
+def summarize_profits(profits: np.ndarray, invested: float, keep_samples: bool = False) -> RiskResult:
+    pct = np.percentile(profits, PERCENTILES)
+    median = float(pct[PERCENTILES.index(50)])
+    return RiskResult(draws=len(profits), mean=float(profits.mean()), prob_loss=float((profits < 0).mean()),
+                      percentiles={p: float(v) for p, v in zip(PERCENTILES, pct)},
+                      roi_median=median / invested * 100 if invested > 0 else 0.0,
+                      hist=profits if keep_samples else None)
+
+
+def simulate_deal(arv: float, rehab: float, purchase: float, fee: float = 0.0, config: RiskConfig = DEFAULT_RISK,
+                  draws: int = DEFAULT_DRAWS, seed: Optional[int] = None, keep_samples: bool = False) -> RiskResult:
+    profits = simulate_profits(arv, rehab, purchase, fee, config, draws, seed)
+    return summarize_profits(profits, purchase + rehab + fee, keep_samples)
+
+
+def _simulate_chunk(args) -> List[Dict[str, float]]:
+    deals, config, draws, seed = args
+    return [simulate_deal(d["arv"], d["rehab"], d["purchase"], d.get("fee", 0.0), config, draws,
+                          None if seed is None else seed + d["_i"]).as_row() for d in deals]
+
+
+def simulate_pipeline(deals: Sequence[Dict], config: RiskConfig = DEFAULT_RISK, draws: int = DEFAULT_DRAWS,
+                      seed: Optional[int] = None, workers: Optional[int] = None) -> List[Dict[str, float]]:
+    """One `RiskResult.as_row()` per deal dict (keys arv, rehab, purchase, optional fee), in input order.
+    With a `seed`, each deal's draws are reproducible regardless of how the work is split."""
+    deals = [dict(d, _i=i) for i, d in enumerate(deals)]
+    workers = MAX_WORKERS if workers is None else workers
+    if len(deals) < POOL_THRESHOLD or workers <= 1:
+        return _simulate_chunk((deals, config, draws, seed))
+    size = max(1, -(-len(deals) // (workers * 4)))
+    chunks = [(deals[i:i + size], config, draws, seed) for i in range(0, len(deals), size)]
+    out: List[Dict[str, float]] = []
+    for rows in pool_map(_simulate_chunk, chunks, workers): out += rows
+    return out
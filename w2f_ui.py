@@ -0,0 +1,20 @@
+"""
+WTF (Wholesale2Flip) — Streamlit UI Helpers
+- `fragment`: `st.fragment` (or `st.experimental_fragment` on Streamlit 1.33-1.36). A decorated panel reruns on
+  its own when one of its widgets changes, instead of re-executing the whole script (page CSS, bootstrap check,
+  sidebar, every other DB read on the page); `st.rerun()` inside it still reruns the full app, e.g. to navigate
+- Panels that must survive their own reruns keep their last result in `st.session_state`
+- `import_profile_panel`: sidebar table of the slowest startup imports (w2f_lazy), only with WTF_IMPORT_PROFILE set
+"""
+import streamlit as st
+
+from w2f_lazy import PROFILE, import_report, startup_ms
+
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda fn: fn)
+
+
+def import_profile_panel(top: int = 15):
+    if not PROFILE: return
+    ms = startup_ms()
+    with st.sidebar.expander(f"⏱️ Startup imports: {ms:,.0f} ms" if ms is not None else "⏱️ Startup imports"):
+        st.dataframe(import_report(top), hide_index=True, use_container_width=True)
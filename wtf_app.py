@@ -5,33 +5,40 @@ WTF (Wholesale2Flip) — Incremental Upgrades (Patched)
 - Google Sheets importer updated to use google.oauth2.service_account (no oauth2client)
 - Adds Streamlit server file watcher guidance via config.toml (see supplied config)
 """
-import os, io, json, uuid, math, sqlite3, datetime as dt
+from w2f_lazy import end_profile, profile_imports
+profile_imports()  # times the imports below when WTF_IMPORT_PROFILE is set
+import os, io, json, uuid, math, datetime as dt
 from pathlib import Path
 from typing import Dict, Optional
 
 import streamlit as st
 import pandas as pd
-
-# Try Plotly (optional). If missing, we fallback to st.bar_chart.
-try:
-    import plotly.graph_objects as go
-    PLOTLY_OK = True
-except Exception:
-    PLOTLY_OK = False
-
-# Optional PDF libs (graceful fallback to .txt if missing)
-try:
-    from reportlab.lib.pagesizes import LETTER
-    from reportlab.pdfgen import canvas as rl_canvas
-    REPORTLAB_OK = True
-except Exception:
-    REPORTLAB_OK = False
-
-try:
-    from PyPDF2 import PdfReader, PdfWriter
-    PYPDF2_OK = True
-except Exception:
-    PYPDF2_OK = False
+import numpy as np
+
+from w2f_analysis import analyze_frame
+from w2f_boot import bootstrap, describe
+from w2f_db import begin_rerun, get_pool, rerun_stats
+from w2f_grid import GridSpec, render_grid
+from w2f_calc import brrrr_calc, memo_stats, subto_calc
+from w2f_dedupe import buyer_key
+from w2f_finance import SWEEP_AXES, SWEEP_METRICS, amortization_schedule, brrrr_sensitivity, heatmap_frame, yearly_schedule
+from w2f_import import BUYER_IMPORT, ImportReport, bulk_import_buyers, import_frame, normalize_buyers
+from w2f_matching import drop_shared_index, match_deals, shared_index
+from w2f_migrations import PLATFORM_MIGRATIONS, migrate
+from w2f_kpi import kpis
+from w2f_lazy import available, lazy
+from w2f_pipeline import (CARD_PAGE, KANBAN_STAGES, PIPELINE_KPIS, VELOCITY_WEEKS, apply_board, stage_cards, stage_counts,
+                         stage_version)
+from w2f_sheets import GspreadSheetClient, get_sheet_client, set_sheet_client, sync_sheet
+from w2f_ui import fragment, import_profile_panel
+
+# Plotly (optional, loaded on the first chart). If missing, we fallback to st.bar_chart.
+go = lazy("plotly.graph_objects")
+PLOTLY_OK = available("plotly")
+
+# LOI / contract rendering (graceful fallback to .txt if reportlab is missing)
+from w2f_docs import document_mime, document_name, payloads_from_analysis, persist, render_batch, render_document
+end_profile()
 
 st.set_page_config(page_title="WTF — Wholesale2Flip", page_icon="🏠", layout="wide", initial_sidebar_state="expanded")
 
@@ -52,54 +59,24 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 DB_PATH = os.environ.get("WTF_DB", "wtf_platform.db")
-KANBAN_STAGES = ["Prospecting","Negotiating","Under Contract","Due Diligence","Closed"]
+BUYER_COLUMNS = ["id","name","email","phone","property_types","min_price","max_price","states","cities","deal_types",
+                 "verified","proof_of_funds","cash_available","created_at"]
+MATCH_PAGE = 10  # buyers shown per "Find Matches", more on request
+BUYERS_GRID = GridSpec("buyers", BUYER_COLUMNS, sortable=["created_at","cash_available","name","min_price","max_price"],
+                       equals={"verified": [1, 0]}, search=["name","email","phone","states","cities"])
 
-def db(): return sqlite3.connect(DB_PATH, check_same_thread=False)
+def db(): return get_pool(DB_PATH).connection()  # pooled; commits on exit and returns the connection
 
 def init_db():
+    # Versioned schema: creates tables on a fresh DB, upgrades existing wtf_platform.db files in place
     with db() as conn:
-        c = conn.cursor()
-        c.execute("""CREATE TABLE IF NOT EXISTS properties (
-            id TEXT PRIMARY KEY, address TEXT, city TEXT, state TEXT, zip_code TEXT,
-            property_type TEXT, bedrooms INTEGER, bathrooms REAL, square_feet INTEGER,
-            year_built INTEGER, list_price REAL, arv REAL DEFAULT 0, rehab_cost REAL DEFAULT 0,
-            max_offer REAL DEFAULT 0, profit_potential REAL DEFAULT 0, condition TEXT DEFAULT 'fair',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
-        c.execute("""CREATE TABLE IF NOT EXISTS leads (
-            id TEXT PRIMARY KEY, first_name TEXT, last_name TEXT, phone TEXT, email TEXT,
-            property_address TEXT, motivation TEXT, timeline TEXT, source TEXT,
-            status TEXT DEFAULT 'new', score INTEGER DEFAULT 0, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
-        c.execute("""CREATE TABLE IF NOT EXISTS buyers (
-            id TEXT PRIMARY KEY, name TEXT, email TEXT, phone TEXT,
-            property_types TEXT, min_price REAL, max_price REAL, states TEXT, cities TEXT, deal_types TEXT,
-            verified BOOLEAN DEFAULT 0, proof_of_funds BOOLEAN DEFAULT 0, cash_available REAL DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
-        c.execute("""CREATE TABLE IF NOT EXISTS deals (
-            id TEXT PRIMARY KEY, title TEXT, property_id TEXT, buyer_id TEXT, lead_id TEXT,
-            purchase_price REAL, assignment_fee REAL, status TEXT DEFAULT 'lead',
-            stage TEXT DEFAULT 'Prospecting', probability INTEGER DEFAULT 10,
-            contract_date TIMESTAMP, closing_date TIMESTAMP, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
-        c.execute("""CREATE TABLE IF NOT EXISTS contracts (
-            id TEXT PRIMARY KEY, deal_id TEXT, contract_type TEXT, purchase_price REAL, earnest_money REAL,
-            closing_date TIMESTAMP, buyer_name TEXT, seller_name TEXT, property_address TEXT, state TEXT,
-            status TEXT DEFAULT 'draft', pdf_path TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
-        c.execute("""CREATE TABLE IF NOT EXISTS lois (
-            id TEXT PRIMARY KEY, lead_id TEXT, property_address TEXT, offer_price REAL, state TEXT, terms TEXT,
-            status TEXT DEFAULT 'draft', pdf_path TEXT, sent_date TIMESTAMP, response_date TIMESTAMP,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
-        conn.commit()
-
-def list_deals():
-    with db() as conn:
-        return pd.read_sql_query("SELECT * FROM deals ORDER BY created_at DESC", conn)
-
-def update_deal_stage(deal_id, stage):
-    with db() as conn:
-        conn.execute("UPDATE deals SET stage=? WHERE id=?", (stage, deal_id)); conn.commit()
+        migrate(conn, PLATFORM_MIGRATIONS)
 
 def create_dummy_deals():
-    df = list_deals()
-    if df.empty:
+    # Bootstrap step: seeds a fresh DB once per process, not on every pipeline render
+    with db() as conn:
+        empty = conn.execute("SELECT 1 FROM deals LIMIT 1").fetchone() is None
+    if empty:
         with db() as conn:
             conn.execute("INSERT INTO deals (id,title,stage,purchase_price,assignment_fee,probability,status) VALUES (?,?,?,?,?,?,?)",
                          (uuid.uuid4().hex,"123 Main St, Dallas TX","Prospecting",165000,12000,35,"lead"))
@@ -107,113 +84,57 @@ def create_dummy_deals():
                          (uuid.uuid4().hex,"456 Oak Ave, Houston TX","Negotiating",210000,15000,55,"active"))
             conn.commit()
 
+def boot():
+    # Once per server process and DB file; later reruns return the recorded state without touching the DB
+    return bootstrap(f"wtf_app:{os.path.abspath(DB_PATH)}", [("migrate", init_db), ("demo_deals", create_dummy_deals)])
+
 def buyers_df():
     with db() as conn:
         return pd.read_sql_query("SELECT * FROM buyers ORDER BY created_at DESC", conn)
 
 def upsert_buyer(row: Dict):
-    row = row.copy()
-    row["id"] = row.get("id") or uuid.uuid4().hex
-    for k in ["states","cities","property_types","deal_types"]:
-        v = row.get(k,"")
-        if isinstance(v, list): row[k] = ",".join([str(x).strip() for x in v if str(x).strip()])
-    cols = ["id","name","email","phone","property_types","min_price","max_price","states","cities","deal_types","verified","proof_of_funds","cash_available"]
-    vals = [row.get(c) for c in cols]
+    # Same normalize/dedupe/merge path as the importers: one row per email/phone/name, unchanged rows are skipped
+    row = {k: ",".join(str(x).strip() for x in v if str(x).strip()) if isinstance(v, list) else v for k, v in row.items()}
+    frame = pd.DataFrame([{k: "" if v is None else str(v) for k, v in row.items()}])
     with db() as conn:
-        conn.execute(f"INSERT OR REPLACE INTO buyers ({','.join(cols)}) VALUES ({','.join(['?']*len(cols))})", vals)
-        conn.commit()
-
-def match_buyers(city, state, price):
-    df = buyers_df()
-    if df.empty: return df
-    def ok_states(s): return state.upper() in str(s).upper().split(",") if pd.notna(s) else False
-    def ok_cities(s):
-        if pd.isna(s) or not str(s).strip(): return True
-        return city.upper() in [t.strip().upper() for t in str(s).split(",")]
-    m = df[df["states"].apply(ok_states) & df["cities"].apply(ok_cities)]
-    m = m[(m["min_price"].fillna(0) <= price) & (price <= m["max_price"].fillna(10**9))]
-    return m.sort_values(["verified","cash_available"], ascending=[False,False])
+        report = import_frame(conn, frame, BUYER_IMPORT, ImportReport())
+        if report.imported:
+            key = buyer_key(normalize_buyers(frame)[0]).iloc[0]
+            stored = pd.read_sql_query("SELECT b.* FROM buyers b JOIN buyer_keys k ON k.buyer_id = b.id WHERE k.key=?",
+                                       conn, params=(key,))
+            for rec in stored.to_dict(orient="records"): buyer_index().upsert(rec)
+    return report
+
+def buyer_index():
+    # Built once per process from the buyers table, kept current by upsert_buyer, dropped after bulk imports
+    return shared_index(DB_PATH, lambda: buyers_df().to_dict(orient="records"))
+
+def match_buyers(city, state, price, limit: int = MATCH_PAGE):
+    # Top `limit` buyers plus the total match count; the rest are never materialized
+    hits, total = buyer_index().match_top(state, city, price, limit=limit)
+    return pd.DataFrame(hits, columns=BUYER_COLUMNS), total
 
 # PDF helpers
-def _write_text_pdf(lines, out_path: Path):
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    if REPORTLAB_OK and str(out_path).lower().endswith(".pdf"):
-        c = rl_canvas.Canvas(str(out_path), pagesize=LETTER)
-        width, height = LETTER; y = height - 72
-        for line in lines:
-            c.setFont("Times-Roman", 11); c.drawString(60, y, str(line)[:110]); y -= 16
-            if y < 72: c.showPage(); y = height - 72
-        c.save(); return out_path
-    else:
-        txt = Path(str(out_path).replace(".pdf",".txt"))
-        txt.write_text("\n".join(lines), encoding="utf-8")
-        return txt
-
-def _merge_with_template(gen_pdf: Path, tmpl: Optional[Path]):
-    if not (PYPDF2_OK and tmpl and tmpl.exists() and gen_pdf.suffix.lower()==".pdf"): return gen_pdf
-    out = gen_pdf.parent / f"{gen_pdf.stem}_merged.pdf"
-    w = PdfWriter()
-    for p in [gen_pdf, tmpl]:
-        try:
-            r = PdfReader(str(p))
-            for page in r.pages: w.add_page(page)
-        except Exception: pass
-    with open(out, "wb") as f: w.write(f)
-    return out
-
+# Rendered in memory; returns (bytes, download file name)
 def generate_loi_pdf(payload: Dict):
-    state = (payload.get("state") or "TX").upper()
-    lines = [
-        "LETTER OF INTENT (LOI)",
-        f"Date: {dt.date.today():%Y-%m-%d}",
-        f"Property: {payload.get('property_address','')}",
-        f"Offer Price: ${payload.get('offer_price',0):,.2f}",
-        f"Buyer: {payload.get('buyer_name','')}",
-        f"Seller: {payload.get('seller_name','')}",
-        f"Earnest Money: ${payload.get('earnest_money',0):,.2f}",
-        f"Inspection: {payload.get('inspection_days',7)} days",
-        f"Closing: on/before {payload.get('closing_date','TBD')}",
-        f"State: {state}",
-        "Terms:", payload.get("terms","(none)")
-    ]
-    tmp = _write_text_pdf(lines, Path("exports/loi") / f"LOI_{uuid.uuid4().hex}.pdf")
-    return _merge_with_template(tmp, Path(f"templates/loi/{state}.pdf"))
+    return render_document("loi", payload), document_name("loi", payload)
 
 def generate_contract_pdf(payload: Dict):
-    state = (payload.get("state") or "TX").upper()
-    lines = [
-        "PURCHASE & SALE AGREEMENT",
-        f"Date: {dt.date.today():%Y-%m-%d}",
-        f"Property: {payload.get('property_address','')}",
-        f"Purchase Price: ${payload.get('purchase_price',0):,.2f}",
-        f"Buyer: {payload.get('buyer_name','')}",
-        f"Seller: {payload.get('seller_name','')}",
-        f"Earnest: ${payload.get('earnest_money',0):,.2f}",
-        f"Closing: on/before {payload.get('closing_date','TBD')}",
-        f"State: {state}", "Terms:", payload.get("terms","(standard)")
-    ]
-    tmp = _write_text_pdf(lines, Path("exports/contracts") / f"CONTRACT_{uuid.uuid4().hex}.pdf")
-    return _merge_with_template(tmp, Path(f"templates/contracts/{state}.pdf"))
+    return render_document("contract", payload), document_name("contract", payload)
+
+def _download(slot: str, label: str):
+    # Last generated document per tab, kept in session so the button survives the rerun its own click triggers
+    doc = st.session_state.get(slot)
+    if doc: st.download_button(label, doc[0], file_name=doc[1], mime=document_mime(doc[1]), key=f"{slot}_btn")
 
 # Calculators
-def brrrr_calc(purchase, rehab, arv, ltv=0.75, closing_costs=6000, rate=0.07, rent=0, taxes=0, ins=0, mgmt=0.08, maint=0.05):
-    total_cost = purchase + rehab + closing_costs
-    new_loan = arv * ltv
-    pmt = (rate/12 * new_loan) / (1 - (1+rate/12)**(-360)) if new_loan>0 else 0
-    noi = rent - (rent*mgmt) - (rent*maint) - taxes/12 - ins/12
-    cashflow = noi - pmt
-    cash_out = max(0, new_loan - total_cost)
-    coc = (cashflow*12) / max(1, total_cost - new_loan) * 100
-    equity = max(0, arv - new_loan)
-    return {"total_cost":total_cost,"new_loan":new_loan,"cash_out":cash_out,"monthly_pmt":pmt,"noi":noi,"cashflow":cashflow,"coc":coc,"equity":equity}
-
-def subto_calc(arv, balance, existing_rate, piti, arrears=0, down=10000, assign_fee=0, wrap_rate=0.085, exit_rent=0):
-    invest = down + assign_fee + arrears
-    wrap_pmt = (wrap_rate/12 * balance) / (1 - (1+wrap_rate/12)**(-360)) if balance>0 else 0
-    monthly_cf = exit_rent - max(piti, wrap_pmt)
-    equity = max(0, arv - balance)
-    roi = (monthly_cf*12) / max(1, invest) * 100
-    return {"buyer_investment":invest,"wrap_pmt":wrap_pmt,"monthly_cashflow":monthly_cf,"equity":equity,"roi":roi}
+def _heatmap(df: pd.DataFrame, title: str):
+    if PLOTLY_OK:
+        fig = go.Figure(go.Heatmap(z=df.to_numpy(), x=df.columns, y=df.index, colorscale="RdYlGn", colorbar=dict(title=title)))
+        fig.update_layout(xaxis_title=df.columns.name, yaxis_title=df.index.name, height=420, margin=dict(t=20, b=20))
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.dataframe(df.round(2), use_container_width=True)
 
 # UI
 def sidebar_nav():
@@ -224,161 +145,264 @@ def sidebar_nav():
                 st.session_state.page = key; st.experimental_rerun()
         st.caption("DB + Theme preserved.")
 
+def _board_key(stage: str, version: int) -> str:
+    # Editor state is tied to the column's version, so a column that changed starts with a clean editor
+    return f"board_{stage}_{version}"
+
+def _apply_board_moves():
+    # Runs before the rerun renders, so the board drawn next already shows the moves (no extra rerun).
+    # Edits are read back with the version and ids the column was rendered with: another session may have moved
+    # deals since, and move_deals' stage guard rejects moves of cards that already left the column.
+    edits, ids = {}, {}
+    for stage in KANBAN_STAGES:
+        version = st.session_state.get(f"board_ver_{stage}")
+        if version is None: continue
+        edits[stage] = st.session_state.get(_board_key(stage, version), {}).get("edited_rows", {})
+        ids[stage] = st.session_state.get(f"board_ids_{stage}", [])
+    st.session_state.board_moved = apply_board(DB_PATH, edits, ids)
+
+def _show_more(stage: str):
+    limits = st.session_state.setdefault("board_limits", {})
+    limits[stage] = limits.get(stage, CARD_PAGE) + CARD_PAGE
+
 def page_pipeline():
     st.markdown('<div class="main-header">Deal Pipeline</div>', unsafe_allow_html=True)
-    create_dummy_deals()
-    import numpy as np
-    df = list_deals()
-    stage_counts = df["stage"].value_counts().reindex(KANBAN_STAGES, fill_value=0)
+    counts = stage_counts(DB_PATH)
     cols = st.columns(len(KANBAN_STAGES))
     colors = ["#6B7280","#F59E0B","#8B5CF6","#3B82F6","#10B981"]
-    for i,(stage,count) in enumerate(stage_counts.items()):
+    for i,(stage,count) in enumerate(counts.items()):
         with cols[i]:
             st.markdown(f"<div class='metric-card'><h4 style='margin:0;color:{colors[i]}'>{stage}</h4><div style='font-size:28px;font-weight:800;color:white'>{int(count)}</div></div>", unsafe_allow_html=True)
     if PLOTLY_OK:
-        fig = go.Funnel(y=KANBAN_STAGES, x=[stage_counts.get(s,0) for s in KANBAN_STAGES], textinfo="value+percent initial", marker_color=colors)
+        fig = go.Funnel(y=KANBAN_STAGES, x=[counts[s] for s in KANBAN_STAGES], textinfo="value+percent initial", marker_color=colors)
         fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font_color="#fff")
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.warning("Plotly not installed; showing fallback bar chart. Add `plotly` to requirements.txt for the funnel.")
-        st.bar_chart(pd.DataFrame({"count": [stage_counts.get(s,0) for s in KANBAN_STAGES]}, index=KANBAN_STAGES))
-
-    # Kanban
-    kcols = st.columns(len(KANBAN_STAGES))
+        st.bar_chart(pd.DataFrame({"count": [counts[s] for s in KANBAN_STAGES]}, index=KANBAN_STAGES))
+
+    with st.expander("⏱️ Stage analytics"):
+        velocity = kpis(DB_PATH, "close_velocity", PIPELINE_KPIS)
+        v1, v2 = st.columns(2)
+        v1.metric("Deals Closed", f"{velocity['closed'] or 0:,}")
+        v2.metric("Avg Days to Close", f"{velocity['avg_days_to_close']:.1f}" if velocity["avg_days_to_close"] is not None else "—")
+        stays = pd.DataFrame(kpis(DB_PATH, "days_in_stage_by_stage", PIPELINE_KPIS))
+        if not stays.empty:
+            stays = stays.set_index("stage").reindex(KANBAN_STAGES).dropna(how="all")
+            st.dataframe(stays.rename(columns={"stays": "Entries", "current": "In Stage Now", "avg_days": "Avg Days (incl. open)",
+                                               "avg_days_completed": "Avg Days (completed)"}).round(1), use_container_width=True)
+        moves = pd.DataFrame(kpis(DB_PATH, "moves_by_week", PIPELINE_KPIS))
+        if not moves.empty:
+            st.caption(f"Stage moves per week (last {VELOCITY_WEEKS} weeks)")
+            st.bar_chart(moves.pivot(index="week", columns="stage", values="moves").fillna(0))
+
+    # Kanban: one editable grid per column, a bounded page of cards each; all moves commit together
+    moved, requested = st.session_state.pop("board_moved", (0, 0))
+    if moved: st.success(f"Moved {moved} deal{'s' if moved != 1 else ''}.")
+    if requested > moved:
+        st.warning(f"{requested - moved} move{'s' if requested - moved != 1 else ''} skipped: the deal was already "
+                   "moved by someone else. The board below is current.")
+    limits = st.session_state.setdefault("board_limits", {})
+    with st.form("board"):
+        kcols = st.columns(len(KANBAN_STAGES))
+        for i, stage in enumerate(KANBAN_STAGES):
+            with kcols[i]:
+                limit = limits.get(stage, CARD_PAGE)
+                st.markdown(f"### {stage}")
+                version = stage_version(DB_PATH, stage)
+                cards = stage_cards(DB_PATH, stage, limit)
+                st.session_state[f"board_ver_{stage}"] = version  # what _apply_board_moves reads edits back with
+                st.session_state[f"board_ids_{stage}"] = cards["id"].tolist()
+                if cards.empty: st.caption("No deals."); continue
+                st.caption(f"{len(cards)} of {counts[stage]:,}")
+                st.data_editor(cards, key=_board_key(stage, version), hide_index=True, use_container_width=True,
+                               disabled=["title","purchase_price","assignment_fee","probability"],
+                               column_config={"id": None, "assignment_fee": None,
+                                              "title": st.column_config.TextColumn("Deal"),
+                                              "purchase_price": st.column_config.NumberColumn("Price", format="$%d"),
+                                              "probability": st.column_config.NumberColumn("Prob %", format="%d"),
+                                              "stage": st.column_config.SelectboxColumn("Move to", options=KANBAN_STAGES, required=True)})
+        st.form_submit_button("Apply moves", on_click=_apply_board_moves, use_container_width=True)
+    more = st.columns(len(KANBAN_STAGES))
     for i, stage in enumerate(KANBAN_STAGES):
-        with kcols[i]:
-            st.markdown(f"### {stage}")
-            st.markdown("<div class='kanban-col'>", unsafe_allow_html=True)
-            rows = df[df["stage"]==stage]
-            if rows.empty: st.caption("No deals.")
-            for _, r in rows.iterrows():
-                st.markdown("<div class='deal-card'>", unsafe_allow_html=True)
-                st.write(f"**{r['title']}**")
-                st.caption(f"Price ${r.get('purchase_price') or 0:,.0f} | Fee ${r.get('assignment_fee') or 0:,.0f} | Prob {int(r.get('probability') or 0)}%")
-                new_stage = st.selectbox("Move to…", KANBAN_STAGES, index=KANBAN_STAGES.index(stage), key=f"move_{r['id']}")
-                if st.button("Move", key=f"btn_{r['id']}", use_container_width=True):
-                    update_deal_stage(r["id"], new_stage); st.success(f"Moved to {new_stage}"); st.experimental_rerun()
-                st.markdown("</div>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-
-def _parse_bool(x):
-    if isinstance(x,(int,float)): return int(x)==1
-    if isinstance(x,str): return x.strip().lower() in ["1","true","yes","y"]
-    return False
-
-def importer_from_csv(file):
-    df = pd.read_csv(file)
-    mapping = {"name":["name","buyer","company","buyer_name"],"email":["email","e-mail"],"phone":["phone","mobile","cell"],
-               "min_price":["min_price","min","minimum"],"max_price":["max_price","max","maximum"],
-               "states":["states","state"],"cities":["cities","city","markets"],"property_types":["property_types","types","asset_types"],
-               "deal_types":["deal_types","strategy","strategies"],"verified":["verified","is_verified"],
-               "proof_of_funds":["proof_of_funds","pof"],"cash_available":["cash","cash_available","capital"]}
-    std = pd.DataFrame()
-    for dst, aliases in mapping.items():
-        for a in aliases:
-            if a in df.columns: std[dst] = df[a]; break
-        if dst not in std: std[dst] = None
-    for col in ["states","cities","property_types","deal_types"]:
-        std[col] = std[col].fillna("").astype(str).str.replace(";", ",")
-    std["verified"] = std["verified"].map(_parse_bool).fillna(False)
-    std["proof_of_funds"] = std["proof_of_funds"].map(_parse_bool).fillna(False)
-    for col in ["cash_available","min_price","max_price"]:
-        std[col] = pd.to_numeric(std[col], errors="coerce").fillna(0)
-    for rec in std.to_dict(orient="records"): upsert_buyer(rec)
-    return len(std)
-
-def importer_from_google_sheet(sheet_url: str) -> int:
+        if counts[stage] > limits.get(stage, CARD_PAGE):
+            more[i].button("Show more", key=f"board_more_{stage}", on_click=_show_more, args=(stage,), use_container_width=True)
+
+def importer_from_csv(file, on_progress=None):
+    # Streams CSV / .csv.gz / Parquet in chunks, one transaction for the whole file; bad rows come back in report.errors
+    report = bulk_import_buyers(db, file, name=getattr(file, "name", None), on_progress=on_progress)
+    if report.imported: drop_shared_index(DB_PATH)  # rebuilt from the table on the next match
+    return report
+
+def _sheet_client():
     """
-    Uses google.oauth2.service_account (no oauth2client).
+    Injected client (w2f_sheets.set_sheet_client) if any, else gspread via google.oauth2.service_account.
     Put service account JSON in .streamlit/secrets.toml under [gcp_service_account].
     Share the sheet with that service account email.
     """
-    try:
+    client = get_sheet_client()
+    if client is None:
         import gspread
         from google.oauth2.service_account import Credentials
         scopes = ['https://www.googleapis.com/auth/spreadsheets','https://www.googleapis.com/auth/drive']
         creds = Credentials.from_service_account_info(dict(st.secrets["gcp_service_account"]), scopes=scopes)
-        client = gspread.authorize(creds)
-        sh = client.open_by_url(sheet_url); ws = sh.sheet1
-        records = ws.get_all_records()
-        if not records: return 0
-        df = pd.DataFrame(records); buf = io.StringIO(); df.to_csv(buf, index=False); buf.seek(0)
-        return importer_from_csv(buf)
+        client = GspreadSheetClient(gspread.authorize(creds)); set_sheet_client(client)
+    return client
+
+def importer_from_google_sheet(sheet_url: str, force: bool = False):
+    # Skips the sheet when its revision is unchanged; otherwise only rows whose checksum changed are upserted
+    try:
+        report = sync_sheet(db, sheet_url, client=_sheet_client(), force=force)
     except Exception as e:
-        st.error(f"Google Sheets import failed: {e}"); return 0
+        st.error(f"Google Sheets import failed: {e}"); return None
+    if report.imported: drop_shared_index(DB_PATH)
+    return report
 
 def page_buyers():
     st.markdown('<div class="main-header">Buyer & Lender Network</div>', unsafe_allow_html=True)
-    tab1, tab2, tab3 = st.tabs(["Directory","Import (CSV/Sheets)","Auto-Match"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Directory","Import (CSV/Sheets)","Auto-Match","Bulk Match"])
     with tab1:
-        st.subheader("All Buyers/Lenders"); st.dataframe(buyers_df(), use_container_width=True, hide_index=True)
+        st.subheader("All Buyers/Lenders"); render_grid("buyers_grid", db, BUYERS_GRID)
     with tab2:
         c1,c2 = st.columns(2)
         with c1:
-            up = st.file_uploader("Upload CSV", type=["csv"])
-            if up is not None:
-                n = importer_from_csv(up); st.success(f"Imported/updated {n} buyers.")
+            up = st.file_uploader("Upload buyer list", type=["csv","gz","parquet"])
+            if up is not None and st.button("Import File", use_container_width=True):
+                bar = st.progress(0.0, text="Importing…")
+                report = importer_from_csv(up, on_progress=lambda n, frac: bar.progress(frac or 0.0, text=f"{n:,} rows read"))
+                bar.empty()
+                st.success(f"Imported/updated {report.imported:,} of {report.rows:,} buyers in {report.seconds:.1f}s "
+                           f"({report.duplicates:,} duplicates merged).")
+                if report.errors:
+                    errs = report.errors_frame()
+                    st.warning(f"{report.error_count:,} rows skipped.")
+                    st.dataframe(errs.head(500), use_container_width=True, hide_index=True)
+                    st.download_button("Download error report (.csv)", errs.to_csv(index=False), file_name="buyer_import_errors.csv")
         with c2:
             url = st.text_input("Google Sheet URL")
+            force = st.checkbox("Full re-import", help="Ignore the stored revision and row checksums")
             if st.button("Import from Google Sheet", use_container_width=True):
-                n = importer_from_google_sheet(url)
-                if n>0: st.success(f"Imported/updated {n} buyers from Google Sheet.")
+                report = importer_from_google_sheet(url, force=force)
+                if report is not None:
+                    st.success(f"Imported/updated {report.imported:,} buyers from Google Sheet "
+                               f"({report.unchanged:,} unchanged rows skipped, {report.seconds:.1f}s).")
+                    if report.errors:
+                        st.warning(f"{report.error_count:,} rows skipped.")
+                        st.dataframe(report.errors_frame().head(500), use_container_width=True, hide_index=True)
     with tab3:
         colA,colB,colC = st.columns(3)
         city = colA.text_input("City","Dallas"); state = colB.text_input("State","TX")
         price = colC.number_input("Target Price",0.0, value=250000.0, step=1000.0)
         if st.button("Find Matches", use_container_width=True):
-            m = match_buyers(city, state, price)
+            st.session_state.match_query, st.session_state.match_limit = (city, state, price), MATCH_PAGE
+        if st.session_state.get("match_query") == (city, state, price):  # kept across "Show more" reruns
+            m, total = match_buyers(city, state, price, st.session_state.match_limit)
             if m.empty: st.info("No matches yet. Try importing your buyer list.")
-            else: st.success(f"Found {len(m)} matching buyers."); st.dataframe(m, use_container_width=True, hide_index=True)
+            else:
+                st.success(f"Found {total:,} matching buyers; showing the top {len(m):,}.")
+                st.dataframe(m, use_container_width=True, hide_index=True)
+                if len(m) < total and st.button(f"Show {min(MATCH_PAGE, total - len(m)):,} more", key="match_more"):
+                    st.session_state.match_limit += MATCH_PAGE; st.rerun()
+    with tab4:
+        st.caption("Upload a deals list (CSV/Parquet) with state, city, a price column (price / purchase_price / mao70) and optional property_type.")
+        up = st.file_uploader("Deals", type=["csv","parquet"], key="bulk_match_upload")
+        top_k = st.number_input("Buyers per deal (top K)", 1, 50, 5)
+        if up is not None and st.button("Match All Deals", use_container_width=True):
+            deals = pd.read_parquet(up) if up.name.lower().endswith(".parquet") else pd.read_csv(up)
+            try:
+                res = match_deals(deals, buyers_df(), top_k=int(top_k))
+            except ValueError as e:
+                st.error(str(e)); res = None
+            if res is not None:
+                st.success(f"{res['deal_row'].nunique():,} of {len(deals):,} deals matched · {len(res):,} buyer slots.")
+                st.dataframe(res.head(1000), use_container_width=True, hide_index=True)
+                st.download_button("Download matches (.csv)", res.to_csv(index=False), file_name="bulk_matches.csv")
 
 def page_calculators():
     st.markdown('<div class="main-header">BRRRR & SubTo Calculators</div>', unsafe_allow_html=True)
     tb1, tb2 = st.tabs(["BRRRR Calculator","SubTo / Wrap"])
-    with tb1:
-        c1,c2,c3 = st.columns(3)
-        purchase = c1.number_input("Purchase Price",0.0,value=180000.0,step=5000.0)
-        rehab    = c2.number_input("Rehab Budget",0.0,value=35000.0,step=1000.0)
-        arv      = c3.number_input("ARV",0.0,value=260000.0,step=5000.0)
-        c4,c5,c6 = st.columns(3)
-        rent = c4.number_input("Market Rent (monthly)",0.0,value=1900.0,step=50.0)
-        taxes = c5.number_input("Annual Taxes",0.0,value=4200.0,step=100.0)
-        ins   = c6.number_input("Annual Insurance",0.0,value=1600.0,step=50.0)
-        c7,c8,c9 = st.columns(3)
-        ltv = c7.slider("Refi LTV",0.5,0.85,0.75,0.01)
-        rate = c8.slider("Refi Rate (APR)",0.03,0.12,0.07,0.005)
-        closing = c9.number_input("Closing Costs (acq+refi)",0.0,value=6000.0,step=500.0)
-        if st.button("Calculate BRRRR", use_container_width=True):
-            r = brrrr_calc(purchase, rehab, arv, ltv, closing, rate, rent, taxes, ins)
-            st.metric("Cash Out at Refi", f"${r['cash_out']:,.0f}")
-            st.metric("Monthly Cashflow", f"${r['cashflow']:,.0f}")
-            st.metric("Cash-on-Cash", f"{r['coc']:.1f}%")
-            st.metric("Equity After Refi", f"${r['equity']:,.0f}")
-            st.json(r)
-    with tb2:
-        c1,c2,c3 = st.columns(3)
-        arv = c1.number_input("ARV",0.0,value=300000.0,step=5000.0, key="s_arv")
-        balance = c2.number_input("Existing Loan Balance",0.0,value=240000.0,step=5000.0)
-        existing_rate = c3.slider("Existing Loan Rate (APR)",0.01,0.12,0.035,0.005)
-        c4,c5,c6 = st.columns(3)
-        piti = c4.number_input("Existing PITI (monthly)",0.0,value=1700.0,step=50.0)
-        arrears = c5.number_input("Seller Arrears",0.0,value=0.0,step=500.0)
-        down = c6.number_input("Down Payment",0.0,value=10000.0,step=1000.0)
-        c7,c8,c9 = st.columns(3)
-        assign_fee = c7.number_input("Assignment/Acq Fee",0.0,value=5000.0,step=500.0)
-        wrap_rate = c8.slider("Wrap Rate (APR)",0.04,0.12,0.085,0.005)
-        exit_rent = c9.number_input("Exit Rent (monthly)",0.0,value=2000.0,step=50.0)
-        if st.button("Calculate SubTo", use_container_width=True):
-            r = subto_calc(arv, balance, existing_rate, piti, arrears, down, assign_fee, wrap_rate, exit_rent)
-            st.metric("Investor Cash In", f"${r['buyer_investment']:,.0f}")
-            st.metric("Monthly Cashflow", f"${r['monthly_cashflow']:,.0f}")
-            st.metric("ROI (annualized)", f"{r['roi']:.1f}%")
-            st.metric("Equity Position", f"${r['equity']:,.0f}")
-            st.json(r)
+    # Each calculator is a fragment: changing an input reruns only that panel, not the page, sidebar or DB reads
+    with tb1: _brrrr_panel()
+    with tb2: _subto_panel()
+
+@fragment
+def _brrrr_panel():
+    c1,c2,c3 = st.columns(3)
+    purchase = c1.number_input("Purchase Price",0.0,value=180000.0,step=5000.0)
+    rehab    = c2.number_input("Rehab Budget",0.0,value=35000.0,step=1000.0)
+    arv      = c3.number_input("ARV",0.0,value=260000.0,step=5000.0)
+    c4,c5,c6 = st.columns(3)
+    rent = c4.number_input("Market Rent (monthly)",0.0,value=1900.0,step=50.0)
+    taxes = c5.number_input("Annual Taxes",0.0,value=4200.0,step=100.0)
+    ins   = c6.number_input("Annual Insurance",0.0,value=1600.0,step=50.0)
+    c7,c8,c9 = st.columns(3)
+    ltv = c7.slider("Refi LTV",0.5,0.85,0.75,0.01)
+    rate = c8.slider("Refi Rate (APR)",0.03,0.12,0.07,0.005)
+    closing = c9.number_input("Closing Costs (acq+refi)",0.0,value=6000.0,step=500.0)
+    if st.button("Calculate BRRRR", use_container_width=True):
+        r = brrrr_calc(purchase, rehab, arv, ltv, closing, rate, rent, taxes, ins)
+        st.metric("Cash Out at Refi", f"${r['cash_out']:,.0f}")
+        st.metric("Monthly Cashflow", f"${r['cashflow']:,.0f}")
+        st.metric("Cash-on-Cash", f"{r['coc']:.1f}%")
+        st.metric("Equity After Refi", f"${r['equity']:,.0f}")
+        st.metric("DSCR", f"{r['dscr']:.2f}")
+        st.json(r)
+    # Code in a collapsed expander still runs, so the heavy parts are opt-in and cached on their inputs:
+    # editing an unrelated field reruns the fragment without recomputing them
+    with st.expander("📉 Refi amortization schedule"):
+        if st.checkbox("Show schedule", key="brrrr_show_sched"):
+            sched = _refi_schedule(arv * ltv, rate)
+            st.dataframe(sched.round(0), use_container_width=True, height=260)
+            st.line_chart(sched[["interest","principal"]])
+    with st.expander("🔥 Sensitivity (rate × LTV × rent × rehab)"):
+        base = dict(purchase=purchase, rehab=rehab, arv=arv, ltv=ltv, closing_costs=closing, rate=rate, rent=rent, taxes=taxes, ins=ins)
+        labels = {"rate": "Refi Rate", "ltv": "Refi LTV", "rent": "Rent", "rehab": "Rehab"}
+        s1,s2,s3 = st.columns(3)
+        metric = s1.selectbox("Metric", list(SWEEP_METRICS), format_func=SWEEP_METRICS.get)
+        x = s2.selectbox("X axis", SWEEP_AXES, index=1, format_func=labels.get)
+        y = s3.selectbox("Y axis", [a for a in SWEEP_AXES if a != x], format_func=labels.get)
+        s4,s5 = st.columns(2)
+        steps = s4.slider("Grid points per axis", 10, 100, 50, 10)
+        hold = s5.slider("Hold period (years, IRR)", 1, 30, 5)
+        spans = {"rate": (0.03, 0.12), "ltv": (0.5, 0.85), "rent": (rent * 0.7, rent * 1.3), "rehab": (rehab * 0.5, rehab * 1.5)}
+        if st.checkbox("Compute sensitivity", key="brrrr_show_sweep"):
+            _heatmap(_sensitivity_frame(base, metric, x, y, spans[x], spans[y], steps, hold), SWEEP_METRICS[metric])
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _refi_schedule(principal: float, rate: float) -> pd.DataFrame:
+    return yearly_schedule(amortization_schedule(principal, rate))
+
+@st.cache_data(max_entries=32, show_spinner="Computing sensitivity…")
+def _sensitivity_frame(base: Dict, metric: str, x: str, y: str, x_span, y_span, steps: int, hold: int) -> pd.DataFrame:
+    axes = {x: np.linspace(*x_span, steps), y: np.linspace(*y_span, steps)}
+    return heatmap_frame(brrrr_sensitivity(base, **axes, metrics=(metric,), hold_years=hold), metric, x, y)
+
+@fragment
+def _subto_panel():
+    c1,c2,c3 = st.columns(3)
+    arv = c1.number_input("ARV",0.0,value=300000.0,step=5000.0, key="s_arv")
+    balance = c2.number_input("Existing Loan Balance",0.0,value=240000.0,step=5000.0)
+    existing_rate = c3.slider("Existing Loan Rate (APR)",0.01,0.12,0.035,0.005)
+    c4,c5,c6 = st.columns(3)
+    piti = c4.number_input("Existing PITI (monthly)",0.0,value=1700.0,step=50.0)
+    arrears = c5.number_input("Seller Arrears",0.0,value=0.0,step=500.0)
+    down = c6.number_input("Down Payment",0.0,value=10000.0,step=1000.0)
+    c7,c8,c9 = st.columns(3)
+    assign_fee = c7.number_input("Assignment/Acq Fee",0.0,value=5000.0,step=500.0)
+    wrap_rate = c8.slider("Wrap Rate (APR)",0.04,0.12,0.085,0.005)
+    exit_rent = c9.number_input("Exit Rent (monthly)",0.0,value=2000.0,step=50.0)
+    if st.button("Calculate SubTo", use_container_width=True):
+        r = subto_calc(arv, balance, existing_rate, piti, arrears, down, assign_fee, wrap_rate, exit_rent)
+        st.metric("Investor Cash In", f"${r['buyer_investment']:,.0f}")
+        st.metric("Monthly Cashflow", f"${r['monthly_cashflow']:,.0f}")
+        st.metric("ROI (annualized)", f"{r['roi']:.1f}%")
+        st.metric("Equity Position", f"${r['equity']:,.0f}")
+        st.metric("DSCR (rent / payment owed)", f"{r['dscr']:.2f}")
+        st.json(r)
 
 def page_docs():
     st.markdown('<div class="main-header">LOI & Contracts</div>', unsafe_allow_html=True)
-    t1, t2 = st.tabs(["Generate LOI","Generate Contract"])
+    t1, t2, t3 = st.tabs(["Generate LOI","Generate Contract","Batch (Bulk Analysis)"])
     with t1:
         with st.form("loi_form"):
             address = st.text_input("Property Address")
@@ -394,13 +418,14 @@ def page_docs():
         if submit:
             payload = dict(property_address=address, offer_price=offer, buyer_name=buyer, seller_name=seller,
                            earnest_money=earnest, inspection_days=insp, closing_date=closing, state=state, terms=terms)
-            pdf = generate_loi_pdf(payload)
+            data, _ = st.session_state["doc_loi"] = generate_loi_pdf(payload)
             with db() as conn:
                 conn.execute("""INSERT INTO lois (id, lead_id, property_address, offer_price, state, terms, status, pdf_path, sent_date)
                                 VALUES (?,?,?,?,?,?,?,?,?)""",
-                             (uuid.uuid4().hex,"",address,offer,state,terms,"generated",str(pdf),dt.datetime.now()))
+                             (uuid.uuid4().hex,"",address,offer,state,terms,"generated",persist(data),dt.datetime.now()))
                 conn.commit()
-            st.success("LOI generated."); st.markdown(f"[Download LOI]({pdf})")
+            st.success("LOI generated.")
+        _download("doc_loi", "Download LOI")
     with t2:
         with st.form("contract_form"):
             address = st.text_input("Property Address", key="c_addr")
@@ -415,16 +440,45 @@ def page_docs():
         if submit:
             payload = dict(property_address=address, purchase_price=price, buyer_name=buyer,
                            seller_name=seller, earnest_money=earnest, closing_date=closing, state=state, terms=terms)
-            pdf = generate_contract_pdf(payload)
+            data, _ = st.session_state["doc_contract"] = generate_contract_pdf(payload)
             with db() as conn:
                 conn.execute("""INSERT INTO contracts (id, deal_id, contract_type, purchase_price, earnest_money, closing_date, buyer_name, seller_name, property_address, state, status, pdf_path)
                                 VALUES (?,?,?,?,?,?,?,?,?,?,?,?)""",
-                             (uuid.uuid4().hex,"","PSA",price,earnest,closing,buyer,seller,address,state,"generated",str(pdf)))
+                             (uuid.uuid4().hex,"","PSA",price,earnest,closing,buyer,seller,address,state,"generated",persist(data)))
                 conn.commit()
-            st.success("Contract generated."); st.markdown(f"[Download Contract]({pdf})")
+            st.success("Contract generated.")
+        _download("doc_contract", "Download Contract")
+    with t3:
+        st.caption("Upload a lead list (CSV/Parquet with address, city, state, ARV, rehab); every deal in the selected grades gets a document at MAO 70%.")
+        up = st.file_uploader("Lead list", type=["csv","parquet"], key="batch_docs_upload")
+        c1,c2,c3 = st.columns(3)
+        kind = c1.selectbox("Document", ["loi","contract"], format_func=lambda k: "LOI" if k=="loi" else "Purchase Contract")
+        grades = c2.multiselect("Grades", ["A","B","C","D"], default=["A","B"])
+        fmt = c3.selectbox("Output", ["zip","pdf"], format_func=lambda f: "Zip (one file each)" if f=="zip" else "Single combined PDF")
+        c4,c5,c6 = st.columns(3)
+        buyer = c4.text_input("Buyer Name", key="b_buyer")
+        earnest = c5.number_input("Earnest Money",0.0,step=500.0,value=1000.0, key="b_em")
+        closing = c6.text_input("Closing Date","TBD", key="b_close")
+        terms = st.text_area("Terms","(as-is, buyer pays all closing costs, assignable)", key="b_terms")
+        if up is not None and st.button("Generate All", use_container_width=True):
+            deals = analyze_frame(pd.read_parquet(up) if up.name.lower().endswith(".parquet") else pd.read_csv(up))
+            payloads = payloads_from_analysis(deals, kind, grades, buyer_name=buyer, earnest_money=earnest,
+                                              closing_date=closing, terms=terms, inspection_days=7)
+            if not payloads: st.info("No deals in the selected grades.")
+            else:
+                bar = st.progress(0.0, text="Rendering…")
+                st.session_state["doc_batch"] = render_batch(kind, payloads, fmt, on_progress=lambda d, n: bar.progress(d / n, text=f"{d:,}/{n:,} documents"))
+                bar.empty()
+                st.success(f"Generated {len(payloads):,} documents.")
+        _download("doc_batch", "Download batch")
 
 def main():
-    init_db()
+    begin_rerun()
+    try:
+        state = boot()
+    except Exception as e:
+        st.error(f"Startup failed, retrying on the next rerun: {e}")
+        st.stop()
     if "page" not in st.session_state: st.session_state.page = "pipeline"
     sidebar_nav()
     page = st.session_state.page
@@ -433,6 +487,13 @@ def main():
     elif page=="calculators": page_calculators()
     elif page=="docs": page_docs()
     else: page_pipeline()
+    if os.environ.get("WTF_DB_STATS"):
+        st.sidebar.caption("DB this rerun: {connections_opened} conn · {statements} stmts · {elapsed_ms} ms".format(**rerun_stats()))
+        st.sidebar.caption(f"Ready since {state.finished_at} · {describe(state)}")
+    if os.environ.get("WTF_CALC_STATS"):
+        for name, s in memo_stats().items():
+            st.sidebar.caption(f"{name}: {s['hits']:,} hits / {s['misses']:,} misses ({s['hit_rate']:.0%})")
+    import_profile_panel()
 
 if __name__ == "__main__":
     main()
@@ -5,10 +5,24 @@
 #
 # Run: streamlit run wtf_app_fixed.py
 
+from w2f_lazy import end_profile, profile_imports
+profile_imports()  # times the imports below when WTF_IMPORT_PROFILE is set
 import streamlit as st
-import sqlite3, math, time, random, json, io
+import math, time, random, json, io, os
 from datetime import datetime, timedelta
 import pandas as pd
+import numpy as np
+from dataclasses import replace
+
+from w2f_boot import bootstrap, describe
+from w2f_db import begin_rerun, get_pool, rerun_stats
+from w2f_grid import GridSpec, render_grid
+from w2f_import import LEAD_IMPORT, stream_import
+from w2f_kpi import kpis, money
+from w2f_migrations import FIXED_MIGRATIONS, migrate
+from w2f_risk import DEFAULT_RISK, Dist, simulate_deal, simulate_pipeline
+from w2f_ui import fragment, import_profile_panel
+end_profile()
 
 APP_TITLE = "Wholesale2Flip Platform"
 THEME_GRADIENT = "linear-gradient(135deg, #0a0a0a 0%, #1a1a2e 50%, #16213e 100%)"
@@ -36,51 +50,32 @@ SAMPLE_PROPERTY = {
 
 DB_PATH = "wtf.db"
 
+LEADS_GRID = GridSpec("leads", ["id","name","phone","email","address","city","state","zip","status","source","score","created_at"],
+                      sortable=["created_at","score","name"], equals={"status": ["New","Warm","Hot","Cold"]},
+                      search=["name","phone","email","address"], min_filters=["score"])
+DEALS_GRID = GridSpec("deals", ["id","address","arv","rehab","grade","strategy","created_at"],
+                      sortable=["created_at","arv","grade"], equals={"grade": ["A","B","C","D"]}, search=["address"])
+BUYERS_GRID = GridSpec("buyers", ["id","name","email","phone","cash_available","verified","preferences","areas","created_at"],
+                       sortable=["created_at","cash_available","name"], equals={"verified": [1, 0]},
+                       search=["name","email","phone","areas"])
+
 # ---------- Utility ----------
 def get_conn():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    # Pooled connection context manager: `with get_conn() as conn:` commits on exit and returns it to the pool
+    return get_pool(DB_PATH).connection()
 
 def init_db():
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("""CREATE TABLE IF NOT EXISTS users(
-        id INTEGER PRIMARY KEY,
-        username TEXT UNIQUE,
-        password TEXT,
-        role TEXT
-    )""")
-    c.execute("""CREATE TABLE IF NOT EXISTS leads(
-        id INTEGER PRIMARY KEY,
-        name TEXT, phone TEXT, email TEXT,
-        address TEXT, city TEXT, state TEXT, zip TEXT,
-        status TEXT, source TEXT, score INTEGER,
-        notes TEXT, created_at TEXT
-    )""")
-    c.execute("""CREATE TABLE IF NOT EXISTS deals(
-        id INTEGER PRIMARY KEY,
-        address TEXT, arv REAL, rehab REAL, offer_cash REAL,
-        offer_subto REAL, offer_seller_fin REAL, mao70 REAL, mao75 REAL,
-        grade TEXT, strategy TEXT, created_at TEXT
-    )""")
-    c.execute("""CREATE TABLE IF NOT EXISTS buyers(
-        id INTEGER PRIMARY KEY,
-        name TEXT, email TEXT, phone TEXT,
-        cash_available REAL, verified INTEGER,
-        preferences TEXT, areas TEXT, created_at TEXT
-    )""")
-    c.execute("""CREATE TABLE IF NOT EXISTS rvm_campaigns(
-        id INTEGER PRIMARY KEY,
-        name TEXT, audio TEXT, recipients INTEGER,
-        cost REAL, response_rate REAL, sent_at TEXT
-    )""")
-    # seed demo users
-    for u, meta in DEMO_USERS.items():
-        try:
-            c.execute("INSERT INTO users(username,password,role) VALUES(?,?,?)", (u, meta["password"], meta["role"]))
-        except sqlite3.IntegrityError:
-            pass
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        migrate(conn, FIXED_MIGRATIONS)
+
+def seed_demo_users():
+    with get_conn() as conn:
+        conn.executemany("INSERT OR IGNORE INTO users(username,password,role) VALUES(?,?,?)",
+                         [(u, meta["password"], meta["role"]) for u, meta in DEMO_USERS.items()])
+
+def boot():
+    # Schema + demo users once per server process and DB file, not on every rerun
+    return bootstrap(f"wtf_app_fixed:{os.path.abspath(DB_PATH)}", [("migrate", init_db), ("demo_users", seed_demo_users)])
 
 def save_file_download(name: str, text: str, mime="text/plain"):
     st.download_button("Download", text, file_name=name, mime=mime)
@@ -132,17 +127,14 @@ def landing_page():
 # ---------- Dashboard ----------
 def dashboard():
     st.subheader("📊 Dashboard")
-    conn = get_conn()
-    df_leads = pd.read_sql_query("SELECT * FROM leads", conn)
-    df_deals = pd.read_sql_query("SELECT * FROM deals", conn)
-    df_buyers = pd.read_sql_query("SELECT * FROM buyers", conn)
-    conn.close()
+    lk, dk = kpis(DB_PATH, "leads"), kpis(DB_PATH, "deals")
 
     k1, k2, k3, k4 = st.columns(4)
-    k1.metric("Total Revenue", "$125K")
-    k2.metric("Pipeline Value", "$485K")
-    k3.metric("Hot Leads", f"{len(df_leads[df_leads['score'] >= 85])}")
-    k4.metric("Grade A Deals", f"{len(df_deals[df_deals['grade']=='A'])}")
+    k1.metric("Projected Spread", money(dk["projected_spread"]), help="MAO 75% - MAO 70% across Grade A/B deals")
+    k2.metric("Pipeline Value", money(dk["pipeline_value"]), help="Sum of cash offers")
+    k3.metric("Hot Leads", f"{lk['hot_leads']}",
+              f"{lk['hot_avg_score']:.0f} avg score" if lk["hot_avg_score"] else None, delta_color="off")
+    k4.metric("Grade A Deals", f"{dk['grade_a']}", f"{dk['deals']} analyzed", delta_color="off")
 
     st.divider()
     col = st.columns(4)
@@ -158,6 +150,12 @@ def dashboard():
 # ---------- Deal Analyzer ----------
 def analyze_deal_ui():
     st.subheader("🧮 Deal Analyzer")
+    _deal_analyzer_panel()
+
+@fragment
+def _deal_analyzer_panel():
+    # Reruns on its own: submitting the form or typing in the LOI fields below does not re-run the bootstrap check, the sidebar or
+    # other pages. The last analysis is kept in session state so the LOI widgets survive their own reruns.
     with st.form("deal_form"):
         address = st.text_input("Property Address", value=SAMPLE_PROPERTY["address"])
         arv = st.number_input("ARV (Estimated After Repair Value)", value=float(SAMPLE_PROPERTY["est_value"]), step=1000.0)
@@ -169,12 +167,16 @@ def analyze_deal_ui():
         vacancy = st.slider("Vacancy %", 0, 20, 6)
         mgmt = st.slider("Property Management %", 0, 12, 8)
         capex = st.slider("CapEx %", 0, 15, 5)
+        with st.expander("🎲 Monte Carlo risk (100k draws)"):
+            run_risk = st.checkbox("Simulate outcomes", value=True)
+            r1, r2 = st.columns(2)
+            arv_sd = r1.slider("ARV uncertainty (± sd %)", 0, 25, 8)
+            rate_sd = r2.slider("Rate change (± sd, pts)", 0.0, 3.0, 1.0, 0.25)
+            over_mode, over_max = r1.slider("Rehab overrun (likely / worst %)", -10, 100, (10, 50))
+            dom_mode, dom_max = r2.slider("Days to sell (likely / worst)", 15, 365, (75, 210))
         submitted = st.form_submit_button("Run Analysis")
 
     if submitted:
-        st.info("Running valuations, comping, and strategies...")
-        time.sleep(0.6)
-
         mao70 = 0.70 * arv - rehab - wholesale_fee
         mao75 = 0.75 * arv - rehab - wholesale_fee
 
@@ -201,32 +203,57 @@ def analyze_deal_ui():
         subto_offer = round(min(arv*0.85, arv - SAMPLE_PROPERTY["mortgage_balance"]), 2)
         seller_fin = round(arv*0.88, 2)
 
-        st.success("Analysis Complete")
-        col1, col2, col3 = st.columns(3)
-        col1.metric("MAO (70%)", f"${mao70:,.0f}")
-        col2.metric("MAO (75%)", f"${mao75:,.0f}")
-        col3.metric("Cap Rate", f"{cap_rate:.2f}%")
-        st.metric("Projected Profit (70% rule)", f"${resale_profit:,.0f}")
-        st.write(f"**Grade:** {grade}  |  **Strategies:** {', '.join(strategies) if strategies else 'Wholesale'}")
+        risk, risk_hist = None, None
+        if run_risk:
+            config = replace(DEFAULT_RISK, arv_factor=Dist("normal", 1.0, arv_sd / 100),
+                             rehab_overrun=Dist("triangular", min(-0.05, over_mode / 100), over_mode / 100, max(over_mode, over_max) / 100),
+                             days_on_market=Dist("triangular", min(30, dom_mode), dom_mode, max(dom_mode, dom_max)),
+                             rate_change=Dist("normal", 0.0, rate_sd / 100))
+            risk = simulate_deal(arv, rehab, max(mao70, 0.0), wholesale_fee, config, keep_samples=True)
+            counts, edges = np.histogram(risk.hist, bins=60)
+            risk.hist = None  # keep only the histogram in session state
+            risk_hist = pd.DataFrame({"draws": counts}, index=pd.Index(np.round(edges[:-1], -2), name="profit"))
 
         # Save deal
-        conn = get_conn()
-        c = conn.cursor()
-        c.execute("""INSERT INTO deals(address,arv,rehab,offer_cash,offer_subto,offer_seller_fin,mao70,mao75,grade,strategy,created_at)
-                     VALUES(?,?,?,?,?,?,?,?,?,?,?)""",
-                  (address, arv, rehab, offer_cash, subto_offer, seller_fin, mao70, mao75, grade, ",".join(strategies), datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
-
-        st.divider()
-        st.subheader("📄 Generate LOI / Contract")
-        seller_name = st.text_input("Seller Name", value=SAMPLE_PROPERTY["owner"])
-        buyer_name = st.text_input("Buyer/Entity", value="JB Housing Investments")
-        offer_type = st.selectbox("Offer Type", ["Cash (MAO 70%)", "SubTo (0% interest)", "Seller Finance (0% interest)"])
-        closing_days = st.number_input("Closing in (days)", 7, 60, 14)
-        if st.button("Generate LOI"):
-            amount = offer_cash if offer_type.startswith("Cash") else (subto_offer if offer_type.startswith("SubTo") else seller_fin)
-            loi = f"""LETTER OF INTENT
+        with get_conn() as conn:
+            conn.execute("""INSERT INTO deals(address,arv,rehab,offer_cash,offer_subto,offer_seller_fin,mao70,mao75,grade,strategy,created_at)
+                            VALUES(?,?,?,?,?,?,?,?,?,?,?)""",
+                         (address, arv, rehab, offer_cash, subto_offer, seller_fin, mao70, mao75, grade, ",".join(strategies), datetime.now().isoformat()))
+        st.session_state.analysis = dict(address=address, mao70=mao70, mao75=mao75, cap_rate=cap_rate, resale_profit=resale_profit,
+                                         grade=grade, strategies=strategies, offer_cash=offer_cash, subto_offer=subto_offer,
+                                         seller_fin=seller_fin, risk=risk, risk_hist=risk_hist)
+        st.success("Analysis Complete")
+
+    a = st.session_state.get("analysis")
+    if a is None: return
+    address, offer_cash, subto_offer, seller_fin = a["address"], a["offer_cash"], a["subto_offer"], a["seller_fin"]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("MAO (70%)", f"${a['mao70']:,.0f}")
+    col2.metric("MAO (75%)", f"${a['mao75']:,.0f}")
+    col3.metric("Cap Rate", f"{a['cap_rate']:.2f}%")
+    st.metric("Projected Profit (70% rule)", f"${a['resale_profit']:,.0f}")
+    st.write(f"**Grade:** {a['grade']}  |  **Strategies:** {', '.join(a['strategies']) if a['strategies'] else 'Wholesale'}")
+
+    risk = a["risk"]
+    if risk is not None:
+        st.markdown("#### 🎲 Risk (flip at MAO 70%)")
+        q = risk.percentiles
+        r1, r2, r3, r4 = st.columns(4)
+        r1.metric("Median Profit", f"${q[50]:,.0f}", f"{risk.roi_median:.1f}% ROI", delta_color="off")
+        r2.metric("P5 / P95", f"${q[5]:,.0f}", f"P95 ${q[95]:,.0f}", delta_color="off")
+        r3.metric("Probability of Loss", f"{risk.prob_loss:.1%}")
+        r4.metric("Expected Profit", f"${risk.mean:,.0f}")
+        st.bar_chart(a["risk_hist"])
+
+    st.divider()
+    st.subheader("📄 Generate LOI / Contract")
+    seller_name = st.text_input("Seller Name", value=SAMPLE_PROPERTY["owner"])
+    buyer_name = st.text_input("Buyer/Entity", value="JB Housing Investments")
+    offer_type = st.selectbox("Offer Type", ["Cash (MAO 70%)", "SubTo (0% interest)", "Seller Finance (0% interest)"])
+    closing_days = st.number_input("Closing in (days)", 7, 60, 14)
+    if st.button("Generate LOI"):
+        amount = offer_cash if offer_type.startswith("Cash") else (subto_offer if offer_type.startswith("SubTo") else seller_fin)
+        loi = f"""LETTER OF INTENT
 Date: {datetime.now().date()}
 Buyer: {buyer_name}
 Seller: {seller_name}
@@ -239,11 +266,11 @@ Contingencies: Inspection, Clear Title, Partner Approval
 
 This LOI is non-binding and for negotiation purposes only.
 """
-            st.code(loi, language="markdown")
-            st.download_button("⬇️ Download LOI (.txt)", loi, file_name="LOI.txt")
+        st.code(loi, language="markdown")
+        st.download_button("⬇️ Download LOI (.txt)", loi, file_name="LOI.txt")
 
-        if st.button("Generate Purchase Agreement"):
-            pa = f"""PURCHASE AGREEMENT (Simplified)
+    if st.button("Generate Purchase Agreement"):
+        pa = f"""PURCHASE AGREEMENT (Simplified)
 Buyer: {buyer_name}
 Seller: {seller_name}
 Property: {address}
@@ -254,8 +281,8 @@ Closing: {closing_days} days
 Assignments: Allowed
 Disclosures: Standard; wholesaling intent may be disclosed
 """
-            st.code(pa, language="markdown")
-            st.download_button("⬇️ Download Contract (.txt)", pa, file_name="Purchase_Agreement.txt")
+        st.code(pa, language="markdown")
+        st.download_button("⬇️ Download Contract (.txt)", pa, file_name="Purchase_Agreement.txt")
 
 # ---------- Lead Manager ----------
 def lead_manager():
@@ -278,26 +305,33 @@ def lead_manager():
         notes = st.text_area("Notes")
         submitted = st.form_submit_button("Add Lead")
         if submitted:
-            conn = get_conn()
-            conn.execute("""INSERT INTO leads(name,phone,email,address,city,state,zip,status,source,score,notes,created_at)
-                            VALUES(?,?,?,?,?,?,?,?,?,?,?,?)""",
-                         (name,phone,email,address,city,state,zipc,status,source,score,notes,datetime.now().isoformat()))
-            conn.commit(); conn.close()
+            with get_conn() as conn:
+                conn.execute("""INSERT INTO leads(name,phone,email,address,city,state,zip,status,source,score,notes,created_at)
+                                VALUES(?,?,?,?,?,?,?,?,?,?,?,?)""",
+                             (name,phone,email,address,city,state,zipc,status,source,score,notes,datetime.now().isoformat()))
             st.success("Lead added")
 
+    with st.expander("📥 Import leads (CSV / CSV.gz / Parquet)"):
+        up = st.file_uploader("Lead list or skip-trace export", type=["csv","gz","parquet"], key="lead_import_upload")
+        if up is not None and st.button("Import Leads"):
+            bar = st.progress(0.0, text="Importing…")
+            report = stream_import(get_conn, up, LEAD_IMPORT, name=up.name,
+                                   on_progress=lambda n, frac: bar.progress(frac or 0.0, text=f"{n:,} rows read"))
+            bar.empty()
+            st.success(f"Imported {report.imported:,} new leads from {report.rows:,} rows in {report.seconds:.1f}s "
+                       f"({report.duplicates:,} duplicates skipped).")
+            if report.errors:
+                errs = report.errors_frame()
+                st.warning(f"{report.error_count:,} rows skipped.")
+                st.download_button("Download error report (.csv)", errs.to_csv(index=False), file_name="lead_import_errors.csv")
+
     st.divider()
-    conn = get_conn()
-    df = pd.read_sql_query("SELECT * FROM leads ORDER BY created_at DESC", conn)
-    conn.close()
-    st.dataframe(df, use_container_width=True)
+    render_grid("leads_grid", get_conn, LEADS_GRID)
 
 # ---------- Pipeline ----------
 def pipeline():
     st.subheader("🛠️ Deal Pipeline")
-    conn = get_conn()
-    df = pd.read_sql_query("SELECT id,address,arv,rehab,grade,strategy,created_at FROM deals ORDER BY created_at DESC", conn)
-    conn.close()
-    st.dataframe(df, use_container_width=True)
+    render_grid("deals_grid", get_conn, DEALS_GRID)
     st.caption("Stages: Prospecting → Negotiating → Under Contract → Due Diligence → Closed (managed via notes/status in Leads + Deals).")
 
 # ---------- Buyers ----------
@@ -313,18 +347,14 @@ def buyer_network():
         areas = st.text_input("Target Areas", value="Houston TX, Harris County, Montgomery County")
         submitted = st.form_submit_button("Add Buyer")
         if submitted:
-            conn = get_conn()
-            conn.execute("""INSERT INTO buyers(name,email,phone,cash_available,verified,preferences,areas,created_at)
-                            VALUES(?,?,?,?,?,?,?,?)""",
-                         (name,email,phone,cash,1 if verified else 0,prefs,areas,datetime.now().isoformat()))
-            conn.commit(); conn.close()
+            with get_conn() as conn:
+                conn.execute("""INSERT INTO buyers(name,email,phone,cash_available,verified,preferences,areas,created_at)
+                                VALUES(?,?,?,?,?,?,?,?)""",
+                             (name,email,phone,cash,1 if verified else 0,prefs,areas,datetime.now().isoformat()))
             st.success("Buyer added")
 
     st.divider()
-    conn = get_conn()
-    df = pd.read_sql_query("SELECT * FROM buyers ORDER BY created_at DESC", conn)
-    conn.close()
-    st.dataframe(df, use_container_width=True)
+    render_grid("buyers_grid", get_conn, BUYERS_GRID)
 
 # ---------- RVM ----------
 def rvm_campaigns():
@@ -337,37 +367,47 @@ def rvm_campaigns():
         if submitted:
             cost = round(recipients * 0.15, 2)
             response_rate = 18.0 + random.random()*4.0
-            conn = get_conn()
-            conn.execute("""INSERT INTO rvm_campaigns(name,audio,recipients,cost,response_rate,sent_at)
-                            VALUES(?,?,?,?,?,?)""",
-                         (name, audio, recipients, cost, response_rate, datetime.now().isoformat()))
-            conn.commit(); conn.close()
+            with get_conn() as conn:
+                conn.execute("""INSERT INTO rvm_campaigns(name,audio,recipients,cost,response_rate,sent_at)
+                                VALUES(?,?,?,?,?,?)""",
+                             (name, audio, recipients, cost, response_rate, datetime.now().isoformat()))
             st.success(f"Launched! Estimated cost ${cost:,.2f} with {response_rate:.1f}% response.")
 
     st.divider()
-    conn = get_conn()
-    df = pd.read_sql_query("SELECT * FROM rvm_campaigns ORDER BY sent_at DESC", conn)
-    conn.close()
+    with get_conn() as conn:
+        df = pd.read_sql_query("SELECT * FROM rvm_campaigns ORDER BY sent_at DESC", conn)
     st.dataframe(df, use_container_width=True)
 
 # ---------- Analytics ----------
 def analytics():
     st.subheader("📈 Analytics")
-    conn = get_conn()
-    leads = pd.read_sql_query("SELECT * FROM leads", conn)
-    deals = pd.read_sql_query("SELECT * FROM deals", conn)
-    buyers = pd.read_sql_query("SELECT * FROM buyers", conn)
-    rvm = pd.read_sql_query("SELECT * FROM rvm_campaigns", conn)
-    conn.close()
+    with get_conn() as conn:
+        rvm = pd.read_sql_query("SELECT recipients, cost FROM rvm_campaigns ORDER BY sent_at", conn)
 
     col1, col2, col3 = st.columns(3)
-    col1.metric("Leads", len(leads))
-    col2.metric("Deals", len(deals))
-    col3.metric("Buyers", len(buyers))
+    col1.metric("Leads", kpis(DB_PATH, "leads")["leads"])
+    col2.metric("Deals", kpis(DB_PATH, "deals")["deals"])
+    col3.metric("Buyers", kpis(DB_PATH, "buyers")["buyers"])
 
     st.markdown("#### Lead Performance")
-    if not leads.empty:
-        st.bar_chart(leads["score"])
+    buckets = kpis(DB_PATH, "lead_scores_by_bucket")
+    if buckets:
+        st.bar_chart(pd.DataFrame(buckets).set_index("bucket")["leads"])
+
+    st.markdown("#### 🎲 Pipeline Risk")
+    if st.button("Simulate all deals (100k draws each)"):
+        with get_conn() as conn:
+            deals = pd.read_sql_query("SELECT id, address, grade, arv, rehab, mao70 FROM deals WHERE arv > 0", conn)
+        if deals.empty:
+            st.info("No analyzed deals yet.")
+        else:
+            with st.spinner(f"Simulating {len(deals):,} deals…"):
+                # NULL/NaN rehab or MAO would propagate into every draw; NaN is truthy, so `or 0.0` does not catch it
+                inputs = deals[["arv", "rehab", "mao70"]].astype(float).fillna(0.0)
+                rows = simulate_pipeline([{"arv": a, "rehab": r, "purchase": max(m, 0.0)}
+                                          for a, r, m in inputs.itertuples(index=False)])
+            risk = pd.concat([deals[["address", "grade"]], pd.DataFrame(rows)[["p5", "p50", "p95", "prob_loss"]]], axis=1)
+            st.dataframe(risk.sort_values("prob_loss", ascending=False), use_container_width=True, hide_index=True)
 
     st.markdown("#### RVM Spend vs Recipients")
     if not rvm.empty:
@@ -377,7 +417,12 @@ def analytics():
 # ---------- App ----------
 def main():
     st.set_page_config(page_title=APP_TITLE, layout="wide")
-    init_db()
+    begin_rerun()
+    try:
+        state = boot()
+    except Exception as e:
+        st.error(f"Startup failed, retrying on the next rerun: {e}")
+        st.stop()
 
     # Sidebar nav
     st.sidebar.image("https://placehold.co/240x80/0a0a0a/ffffff?text=W2F", use_column_width=True)
@@ -406,6 +451,10 @@ def main():
         rvm_campaigns()
     elif page == "Analytics":
         analytics()
+    if os.environ.get("WTF_DB_STATS"):
+        st.sidebar.caption("DB this rerun: {connections_opened} conn · {statements} stmts · {elapsed_ms} ms".format(**rerun_stats()))
+        st.sidebar.caption(f"Ready since {state.finished_at} · {describe(state)}")
+    import_profile_panel()
 
 if __name__ == "__main__":
     main()